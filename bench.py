@@ -0,0 +1,12 @@
+#!/usr/bin/python3
+
+import os
+import sys
+
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import bmp.bench
+
+if __name__ == "__main__":
+    sys.exit(bmp.bench.main(sys.argv[1:]))
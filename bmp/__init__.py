@@ -19,16 +19,20 @@
 
 import bmp.audio as audio
 import bmp.base as base
+import bmp.bench as bench
+import bmp.binary as binary
 import bmp.color as color
 import bmp.editor as editor
 import bmp.execute as execute
 import bmp.game as game
+import bmp.history as history
 import bmp.lang as lang
 import bmp.level as level
 import bmp.levelpack as levelpack
 import bmp.loc as loc
 import bmp.obj as obj
 import bmp.opt as opt
+import bmp.perf as perf
 import bmp.ref as ref
 import bmp.render as render
 import bmp.rule as rule
@@ -36,7 +40,7 @@ import bmp.space as space
 import bmp.sub as sub
                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                           # monika was there ;)
 __all__ = [
-    "audio", "base", "color", "editor",
-    "execute", "game", "lang", "level", "levelpack",
-    "loc", "obj", "opt", "ref", "render", "rule", "space", "sub",
+    "audio", "base", "bench", "binary", "color", "editor",
+    "execute", "game", "history", "lang", "level", "levelpack",
+    "loc", "obj", "opt", "perf", "ref", "render", "rule", "space", "sub",
 ]
\ No newline at end of file
@@ -0,0 +1,421 @@
+from typing import NotRequired, Optional, TypedDict
+import argparse
+import copy
+import gc
+import json
+import os
+import random
+import time
+import tracemalloc
+
+import bmp.base
+import bmp.binary
+import bmp.lang
+import bmp.level
+import bmp.levelpack
+import bmp.loc
+import bmp.obj
+import bmp.opt
+import bmp.perf
+import bmp.ref
+import bmp.space
+
+char_to_orient: dict[str, Optional[bmp.loc.Orient]] = {
+    "W": bmp.loc.Orient.W,
+    "S": bmp.loc.Orient.S,
+    "A": bmp.loc.Orient.A,
+    "D": bmp.loc.Orient.D,
+    "_": None,
+}
+
+default_inputs: str = "DDDDSSSSAAAAWWWW_DSAW_WASD__"
+default_ticks: int = 64
+default_sizes: list[int] = [16, 32]
+default_rule_sizes: list[int] = [100]
+default_rule_parses: int = 4
+default_query_sizes: list[int] = [64]
+default_queries: int = 100
+default_serialize_sizes: list[int] = [64]
+default_serializations: int = 2
+default_object_counts: list[int] = [20000]
+default_seed: int = 0
+default_tolerance: float = 0.25
+
+filler_list: list[str] = ["baba", "keke", "rock", "rock", "wall", "wall", "wall", "skull", "water", "box", "grass", "grass"]
+
+class BenchResult(TypedDict):
+    name: str
+    objects: int
+    ticks: int
+    seconds: float
+    ticks_per_second: float
+    peak_memory: int
+    phases: dict[str, float]
+    counters: NotRequired[dict[str, int]]
+
+def str_to_inputs(inputs: str) -> list[Optional[bmp.loc.Orient]]:
+    return [char_to_orient[c] for c in inputs.upper() if c in char_to_orient.keys()]
+
+def count_objects(levelpack: bmp.levelpack.Levelpack) -> int:
+    return sum(len(s.object_list) for s in levelpack.current_level.space_list)
+
+def run_ticks(levelpack: bmp.levelpack.Levelpack, inputs: list[Optional[bmp.loc.Orient]], ticks: int) -> None:
+    for tick in range(ticks):
+        levelpack.tick(inputs[tick % len(inputs)])
+
+def bench_levelpack(
+    name: str,
+    levelpack: bmp.levelpack.Levelpack,
+    inputs: list[Optional[bmp.loc.Orient]],
+    ticks: int,
+    seed: int = default_seed,
+) -> BenchResult:
+    profiler = bmp.perf.TickProfiler(ticks)
+    timed_levelpack = copy.deepcopy(levelpack)
+    timed_levelpack.profiler = profiler
+    objects = count_objects(timed_levelpack)
+    random.seed(seed)
+    gc.collect()
+    start_time = time.perf_counter()
+    run_ticks(timed_levelpack, inputs, ticks)
+    seconds = time.perf_counter() - start_time
+    traced_levelpack = copy.deepcopy(levelpack)
+    random.seed(seed)
+    gc.collect()
+    tracemalloc.start()
+    start_memory = tracemalloc.get_traced_memory()[0]
+    run_ticks(traced_levelpack, inputs, ticks)
+    peak_memory = tracemalloc.get_traced_memory()[1] - start_memory
+    tracemalloc.stop()
+    return {
+        "name": name,
+        "objects": objects,
+        "ticks": ticks,
+        "seconds": seconds,
+        "ticks_per_second": ticks / seconds if seconds > 0 else float("inf"),
+        "peak_memory": peak_memory,
+        "phases": {k: v * ticks for k, v in profiler.average_time().items()},
+        "counters": profiler.total_counters(),
+    }
+
+def synthetic_levelpack(size: int, seed: int = default_seed, density: float = 0.25) -> bmp.levelpack.Levelpack:
+    rng = random.Random(seed)
+    rule_text_list: list[list[str]] = [
+        ["text_baba", "text_is", "text_you"],
+        ["text_keke", "text_is", "text_move"],
+        ["text_rock", "text_is", "text_push"],
+        ["text_wall", "text_is", "text_stop"],
+        ["text_skull", "text_is", "text_defeat"],
+        ["text_water", "text_is", "text_sink"],
+        ["text_box", "text_is", "text_push", "text_and", "text_shift"],
+        ["text_flag", "text_is", "text_win"],
+    ]
+    space_id = bmp.ref.SpaceID(f"synthetic{size}")
+    inner_space_id = bmp.ref.SpaceID(f"synthetic{size}inner")
+    space = bmp.space.Space(space_id, (size, size))
+    inner_space = bmp.space.Space(inner_space_id, (7, 7))
+    for y, rule_text in enumerate(rule_text_list[:size // 4]):
+        for x, json_name in enumerate(rule_text):
+            space.new_obj(bmp.obj.name_to_class[json_name]((x + 1, y * 2 + 1)))
+    rule_height = min(len(rule_text_list), size // 4) * 2 + 1
+    for x in range(size):
+        for y in range(rule_height, size):
+            if rng.random() < density:
+                object_type = bmp.obj.name_to_class[rng.choice(filler_list)]
+                space.new_obj(object_type((x, y), rng.choice(list(bmp.loc.Orient))))
+    space.new_obj(bmp.obj.Space((size - 1, size - 1), space_id=inner_space_id))
+    for x in range(1, 6):
+        inner_space.new_obj(bmp.obj.name_to_class["rock"]((x, 3)))
+    level = bmp.level.Level(bmp.ref.LevelID(f"synthetic{size}"), [space_id, inner_space_id], space_id)
+    return bmp.levelpack.Levelpack(
+        {level.level_id: level},
+        {space_id: space, inner_space_id: inner_space},
+        level.level_id,
+        name = f"synthetic{size}",
+    )
+
+def crowded_space(size: int, seed: int = default_seed, density: float = 0.75) -> bmp.space.Space:
+    rng = random.Random(seed)
+    object_list: list[str] = filler_list + ["text_baba", "text_is", "text_you", "level", "space"]
+    space_id = bmp.ref.SpaceID(f"objects{size}")
+    space = bmp.space.Space(space_id, (size, size))
+    for x in range(size):
+        for y in range(size):
+            if rng.random() < density:
+                json_name = rng.choice(object_list)
+                if json_name == "space":
+                    space.new_obj(bmp.obj.Space((x, y), space_id=space_id))
+                elif json_name == "level":
+                    space.new_obj(bmp.obj.Level((x, y), level_id=bmp.ref.LevelID(f"objects{size}")))
+                else:
+                    space.new_obj(bmp.obj.name_to_class[json_name]((x, y), rng.choice(list(bmp.loc.Orient))))
+    return space
+
+def dense_text_space(size: int, seed: int = default_seed, density: float = 0.75) -> bmp.space.Space:
+    rng = random.Random(seed)
+    text_list: list[str] = [
+        "text_baba", "text_keke", "text_rock", "text_wall", "text_text",
+        "text_is", "text_is", "text_is", "text_and", "text_often",
+        "text_you", "text_push", "text_stop", "text_win", "text_move",
+    ]
+    space = bmp.space.Space(bmp.ref.SpaceID(f"rules{size}"), (size, size))
+    for x in range(size):
+        for y in range(size):
+            if rng.random() < density:
+                space.new_obj(bmp.obj.name_to_class[rng.choice(text_list)]((x, y)))
+    return space
+
+def bench_set_rule(name: str, space: bmp.space.Space, parses: int) -> BenchResult:
+    gc.collect()
+    start_time = time.perf_counter()
+    for _ in range(parses):
+        space.refresh_index()
+        space.set_rule()
+    seconds = time.perf_counter() - start_time
+    gc.collect()
+    tracemalloc.start()
+    start_memory = tracemalloc.get_traced_memory()[0]
+    space.refresh_index()
+    space.set_rule()
+    peak_memory = tracemalloc.get_traced_memory()[1] - start_memory
+    tracemalloc.stop()
+    return {
+        "name": name,
+        "objects": len(space.object_list),
+        "ticks": parses,
+        "seconds": seconds,
+        "ticks_per_second": parses / seconds if seconds > 0 else float("inf"),
+        "peak_memory": peak_memory,
+        "phases": {"set_rule": seconds},
+    }
+
+def bench_type_query(name: str, space: bmp.space.Space, queries: int) -> BenchResult:
+    object_types: list[type[bmp.obj.Object]] = [bmp.obj.name_to_class[n] for n in sorted(set(filler_list))]
+    noun_list: list[bmp.obj.Noun] = [bmp.obj.get_noun_from_type(t)() for t in object_types]
+    object_types += [bmp.obj.Text, bmp.obj.SpaceObject, bmp.obj.LevelObject]
+    phases: dict[str, float] = {}
+    gc.collect()
+    start_time = time.perf_counter()
+    for _ in range(queries):
+        for object_type in object_types:
+            space.get_objs_from_type(object_type)
+    phases["get_objs_from_type"] = time.perf_counter() - start_time
+    start_time = time.perf_counter()
+    for _ in range(queries):
+        for noun in noun_list:
+            space.get_objs_from_noun(noun)
+    phases["get_objs_from_noun"] = time.perf_counter() - start_time
+    start_time = time.perf_counter()
+    for _ in range(queries):
+        for object_type in object_types:
+            [o for o in space.object_list if isinstance(o, object_type)]
+    phases["linear_scan"] = time.perf_counter() - start_time
+    seconds = sum(phases.values())
+    return {
+        "name": name,
+        "objects": len(space.object_list),
+        "ticks": queries,
+        "seconds": seconds,
+        "ticks_per_second": queries / seconds if seconds > 0 else float("inf"),
+        "peak_memory": 0,
+        "phases": phases,
+    }
+
+def bench_serialize(name: str, levelpack: bmp.levelpack.Levelpack, rounds: int) -> BenchResult:
+    phases: dict[str, float] = {"json_save": 0.0, "json_load": 0.0, "binary_save": 0.0, "binary_load": 0.0}
+    gc.collect()
+    for _ in range(rounds):
+        start_time = time.perf_counter()
+        json_str = json.dumps(levelpack.to_json(), **bmp.opt.get_json_dump_kwds())
+        phases["json_save"] += time.perf_counter() - start_time
+        start_time = time.perf_counter()
+        bmp.levelpack.json_to_levelpack(json.loads(json_str))
+        phases["json_load"] += time.perf_counter() - start_time
+        start_time = time.perf_counter()
+        data = bmp.binary.levelpack_to_bytes(levelpack)
+        phases["binary_save"] += time.perf_counter() - start_time
+        start_time = time.perf_counter()
+        bmp.binary.bytes_to_levelpack(data)
+        phases["binary_load"] += time.perf_counter() - start_time
+    bmp.lang.fprint("bench.result.size", json=len(json_str.encode("utf-8")), binary=len(data))
+    seconds = sum(phases.values())
+    return {
+        "name": name,
+        "objects": count_objects(levelpack),
+        "ticks": rounds,
+        "seconds": seconds,
+        "ticks_per_second": rounds / seconds if seconds > 0 else float("inf"),
+        "peak_memory": 0,
+        "phases": phases,
+    }
+
+def bench_objects(name: str, count: int) -> BenchResult:
+    object_types: list[type[bmp.obj.Object]] = [bmp.obj.name_to_class[n] for n in filler_list + ["text_baba", "text_is", "text_you"]]
+    phases: dict[str, float] = {}
+    gc.collect()
+    start_time = time.perf_counter()
+    object_list = [object_types[i % len(object_types)]((i % 64, i // 64)) for i in range(count)]
+    phases["construct"] = time.perf_counter() - start_time
+    start_time = time.perf_counter()
+    [o.clone() for o in object_list]
+    phases["clone"] = time.perf_counter() - start_time
+    json_list = [o.to_json() for o in object_list]
+    start_time = time.perf_counter()
+    [bmp.obj.json_to_object(j) for j in json_list]
+    phases["json_to_object"] = time.perf_counter() - start_time
+    del object_list
+    gc.collect()
+    tracemalloc.start()
+    start_memory = tracemalloc.get_traced_memory()[0]
+    object_list = [object_types[i % len(object_types)]((i % 64, i // 64)) for i in range(count)]
+    object_memory = tracemalloc.get_traced_memory()[0] - start_memory
+    tracemalloc.stop()
+    seconds = sum(phases.values())
+    bmp.lang.fprint(
+        "bench.result.object",
+        rate = f"{count / phases['construct'] if phases['construct'] > 0 else float('inf'):.0f}",
+        bytes = f"{object_memory / count:.1f}",
+    )
+    return {
+        "name": name,
+        "objects": count,
+        "ticks": count,
+        "seconds": seconds,
+        "ticks_per_second": count / seconds if seconds > 0 else float("inf"),
+        "peak_memory": object_memory,
+        "phases": phases,
+    }
+
+def load_levelpack(path: str) -> Optional[bmp.levelpack.Levelpack]:
+    with open(path, "r", encoding="utf-8") as file:
+        levelpack_json = json.load(file)
+    try:
+        return bmp.levelpack.json_to_levelpack(bmp.levelpack.update_json_format(levelpack_json, levelpack_json["ver"]))
+    except (bmp.base.UpgradeError, bmp.base.DowngradeError, KeyError):
+        bmp.lang.fwarn("warn.bench.skipped", file=os.path.basename(path))
+        return None
+
+def bench_suite(
+    levelpack_dir: Optional[str],
+    sizes: list[int],
+    inputs: list[Optional[bmp.loc.Orient]],
+    ticks: int,
+    seed: int = default_seed,
+    rule_sizes: Optional[list[int]] = None,
+    rule_parses: int = default_rule_parses,
+    query_sizes: Optional[list[int]] = None,
+    queries: int = default_queries,
+    serialize_sizes: Optional[list[int]] = None,
+    serializations: int = default_serializations,
+    object_counts: Optional[list[int]] = None,
+) -> list[BenchResult]:
+    cases: list[tuple[str, bmp.levelpack.Levelpack]] = []
+    if levelpack_dir is not None and os.path.isdir(levelpack_dir):
+        filename_list = sorted(n for n in os.listdir(levelpack_dir) if n.endswith(".json"))
+        skipped_list: list[str] = []
+        for filename in filename_list:
+            levelpack = load_levelpack(os.path.join(levelpack_dir, filename))
+            if levelpack is not None:
+                cases.append((os.path.splitext(filename)[0], levelpack))
+            else:
+                skipped_list.append(filename)
+        if len(skipped_list) != 0:
+            bmp.lang.fwarn("warn.bench.skipped.total", skipped=len(skipped_list), total=len(filename_list), files=", ".join(skipped_list))
+    for size in sizes:
+        cases.append((f"synthetic{size}", synthetic_levelpack(size, seed)))
+    result_list: list[BenchResult] = []
+    for name, levelpack in cases:
+        result = bench_levelpack(name, levelpack, inputs, ticks, seed)
+        print_result(result)
+        result_list.append(result)
+    for size in rule_sizes if rule_sizes is not None else []:
+        result = bench_set_rule(f"rules{size}", dense_text_space(size, seed), rule_parses)
+        print_result(result)
+        result_list.append(result)
+    for size in query_sizes if query_sizes is not None else []:
+        result = bench_type_query(f"objects{size}", crowded_space(size, seed), queries)
+        print_result(result)
+        result_list.append(result)
+    for size in serialize_sizes if serialize_sizes is not None else []:
+        result = bench_serialize(f"serialize{size}", synthetic_levelpack(size, seed), serializations)
+        print_result(result)
+        result_list.append(result)
+    for count in object_counts if object_counts is not None else []:
+        result = bench_objects(f"construct{count}", count)
+        print_result(result)
+        result_list.append(result)
+    return result_list
+
+def print_result(result: BenchResult, phase_count: int = 6) -> None:
+    bmp.lang.fprint(
+        "bench.result",
+        name = result["name"],
+        objects = result["objects"],
+        ticks = result["ticks"],
+        tps = f"{result['ticks_per_second']:.2f}",
+        memory = f"{result['peak_memory'] / 1024:.1f}",
+    )
+    for phase, seconds in list(result["phases"].items())[:phase_count]:
+        bmp.lang.fprint(
+            "bench.result.phase",
+            phase = phase,
+            ms = f"{seconds * 1000 / result['ticks']:.3f}",
+            percent = f"{seconds * 100 / result['seconds']:.1f}",
+        )
+    for counter, number in result.get("counters", {}).items():
+        bmp.lang.fprint("bench.result.counter", counter=counter, number=number)
+
+def check_results(
+    result_list: list[BenchResult],
+    min_tps: Optional[float] = None,
+    baseline: Optional[dict[str, float]] = None,
+    tolerance: float = default_tolerance,
+) -> bool:
+    passed = True
+    for result in result_list:
+        threshold = min_tps if min_tps is not None else 0.0
+        if baseline is not None and result["name"] in baseline.keys():
+            threshold = max(threshold, baseline[result["name"]] * (1 - tolerance))
+        if result["ticks_per_second"] < threshold:
+            bmp.lang.fwarn("warn.bench.slow", name=result["name"], tps=f"{result['ticks_per_second']:.2f}", threshold=f"{threshold:.2f}")
+            passed = False
+    return passed
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="headless tick benchmark of Baba Make Parabox on synthetic levels and loadable levelpacks")
+    parser.add_argument("--levelpacks", default="levelpacks", help="directory of levelpacks to run besides the synthetic levels, or empty to skip them; levelpacks older than 4.1 can not be loaded and are reported as skipped")
+    parser.add_argument("--sizes", type=int, nargs="*", default=default_sizes, help="sizes of synthetic levels")
+    parser.add_argument("--rule-sizes", type=int, nargs="*", default=default_rule_sizes, help="sizes of dense text spaces for full rule parsing")
+    parser.add_argument("--rule-parses", type=int, default=default_rule_parses)
+    parser.add_argument("--query-sizes", type=int, nargs="*", default=default_query_sizes, help="sizes of crowded spaces for type and noun queries")
+    parser.add_argument("--queries", type=int, default=default_queries)
+    parser.add_argument("--serialize-sizes", type=int, nargs="*", default=default_serialize_sizes, help="sizes of synthetic levels for json and binary save and load")
+    parser.add_argument("--serializations", type=int, default=default_serializations)
+    parser.add_argument("--object-counts", type=int, nargs="*", default=default_object_counts, help="numbers of objects to construct, clone and load from json")
+    parser.add_argument("--inputs", default=default_inputs, help="recorded input sequence made of W, A, S, D and _ (wait)")
+    parser.add_argument("--ticks", type=int, default=default_ticks)
+    parser.add_argument("--seed", type=int, default=default_seed)
+    parser.add_argument("--min-tps", type=float, default=None, help="fail when any case runs slower than this; only the loaded levelpacks and the synthetic cases are checked")
+    parser.add_argument("--baseline", default=None, help="fail when any case is slower than this saved result by more than the tolerance")
+    parser.add_argument("--tolerance", type=float, default=default_tolerance)
+    parser.add_argument("--save", default=None, help="save the results as json")
+    args = parser.parse_args(argv)
+    inputs = str_to_inputs(args.inputs)
+    if len(inputs) == 0:
+        inputs = [None]
+    result_list = bench_suite(
+        args.levelpacks if args.levelpacks != "" else None,
+        args.sizes, inputs, args.ticks, args.seed,
+        args.rule_sizes, args.rule_parses,
+        args.query_sizes, args.queries,
+        args.serialize_sizes, args.serializations,
+        args.object_counts,
+    )
+    if args.save is not None:
+        with open(args.save, "w", encoding="utf-8") as file:
+            json.dump(result_list, file, indent=4)
+    baseline: Optional[dict[str, float]] = None
+    if args.baseline is not None:
+        with open(args.baseline, "r", encoding="utf-8") as file:
+            baseline = {r["name"]: r["ticks_per_second"] for r in json.load(file)}
+    return 0 if check_results(result_list, args.min_tps, baseline, args.tolerance) else 1
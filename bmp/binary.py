@@ -0,0 +1,265 @@
+from typing import Any, Callable, Final, Hashable, Optional
+import array
+import json
+import struct
+import sys
+import zlib
+
+import bmp.base
+import bmp.levelpack
+import bmp.loc
+import bmp.obj
+import bmp.ref
+import bmp.space
+
+magic: Final[bytes] = b"BMPB"
+format_version: Final[int] = 2
+extension: Final[str] = ".bmpb"
+
+prefix_struct: Final[struct.Struct] = struct.Struct("<4sH")
+length_struct: Final[struct.Struct] = struct.Struct("<I")
+
+array_typecodes: Final[tuple[str, ...]] = ("H", "i", "i", "B", "i", "i")
+base_object_keys: Final[frozenset[str]] = frozenset(("type", "pos", "orient", "space_id", "level_id"))
+
+type SpaceIDKey = tuple[str, int]
+
+class FormatError(Exception):
+    pass
+
+class InternTable[T: Hashable]:
+    def __init__(self, item_list: Optional[list[T]] = None) -> None:
+        self.item_list: list[T] = item_list if item_list is not None else []
+        self.index_dict: dict[T, int] = {v: i for i, v in enumerate(self.item_list)}
+    def intern(self, item: T) -> int:
+        index = self.index_dict.get(item)
+        if index is None:
+            index = len(self.item_list)
+            self.index_dict[item] = index
+            self.item_list.append(item)
+        return index
+
+def get_json_extras(json_object: bmp.obj.ObjectJson) -> dict[str, Any]:
+    return {k: v for k, v in json_object.items() if k not in base_object_keys}
+
+def remap_array(packed_array: array.array, index_list: Optional[list[int]]) -> array.array:
+    if index_list is None:
+        return packed_array
+    return array.array(packed_array.typecode, [index_list[i] if i != -1 else -1 for i in packed_array])
+
+def get_space_id_key(space_json: dict[str, Any]) -> SpaceIDKey:
+    return (space_json["id"]["name"], space_json["id"].get("infinite_tier", 0))
+
+def get_space_header(space_json: bmp.space.SpaceJson) -> dict[str, Any]:
+    return {k: list(v) if k == "size" else v for k, v in space_json.items() if k != "objects"}
+
+class Encoder(object):
+    def __init__(self) -> None:
+        self.type_table: InternTable[str] = InternTable()
+        self.orient_table: InternTable[str] = InternTable([o.name for o in bmp.loc.Orient])
+        self.orient_index_dict: dict[bmp.loc.Orient, int] = {o: self.orient_table.intern(o.name) for o in bmp.loc.Orient}
+        self.space_id_table: InternTable[SpaceIDKey] = InternTable()
+        self.level_id_table: InternTable[str] = InternTable()
+        self.array_list: list[array.array] = []
+        self.space_count: int = 0
+        self.packed_space_dict: dict[SpaceIDKey, tuple[int, dict[str, Any], list[array.array], dict[str, dict[str, Any]]]] = {}
+        # decoded tables are shared by all packed spaces of a file, so each is remapped once
+        self.remap_dict: dict[int, Optional[list[int]]] = {}
+    def pack_arrays(self, space_json: dict[str, Any], array_list: list[array.array], extras_dict: dict[str, dict[str, Any]]) -> dict[str, Any]:
+        space_id_key = get_space_id_key(space_json)
+        packed_space = self.packed_space_dict.get(space_id_key)
+        if packed_space is not None and packed_space[1:] == (space_json, array_list, extras_dict):
+            return {"same": packed_space[0]}
+        self.packed_space_dict[space_id_key] = (self.space_count, space_json, array_list, extras_dict)
+        self.space_count += 1
+        self.array_list.extend(array_list)
+        return {"space": space_json, "count": len(array_list[0]), "extras": extras_dict}
+    def intern_space_id_json(self, space_id_json: Optional[bmp.ref.SpaceIDJson]) -> int:
+        if space_id_json is None:
+            return -1
+        return self.space_id_table.intern((space_id_json["name"], space_id_json.get("infinite_tier", 0)))
+    def intern_level_id_json(self, level_id_json: Optional[bmp.ref.LevelIDJson]) -> int:
+        if level_id_json is None:
+            return -1
+        return self.level_id_table.intern(level_id_json["name"])
+    def pack_space(self, space_json: dict[str, Any], object_json_list: list[bmp.obj.ObjectJson]) -> dict[str, Any]:
+        type_intern = self.type_table.intern
+        orient_intern = self.orient_table.intern
+        array_list = [
+            array.array("H", [type_intern(o["type"]) for o in object_json_list]),
+            array.array("i", [o["pos"][0] for o in object_json_list]),
+            array.array("i", [o["pos"][1] for o in object_json_list]),
+            array.array("B", [orient_intern(o["orient"]) for o in object_json_list]),
+            array.array("i", [self.intern_space_id_json(o.get("space_id")) for o in object_json_list]),
+            array.array("i", [self.intern_level_id_json(o.get("level_id")) for o in object_json_list]),
+        ]
+        extras_dict: dict[str, dict[str, Any]] = {}
+        for index, json_object in enumerate(object_json_list):
+            # every object has a type, a pos and an orient
+            if len(json_object) > 3:
+                extras = get_json_extras(json_object)
+                if len(extras) != 0:
+                    extras_dict[str(index)] = extras
+        return self.pack_arrays(space_json, array_list, extras_dict)
+    def pack_objects(self, space_json: dict[str, Any], object_list: list[bmp.obj.Object]) -> dict[str, Any]:
+        type_intern = self.type_table.intern
+        space_id_intern = self.space_id_table.intern
+        level_id_intern = self.level_id_table.intern
+        orient_index_dict = self.orient_index_dict
+        array_list = [
+            array.array("H", [type_intern(o.json_name) for o in object_list]),
+            array.array("i", [o.pos[0] for o in object_list]),
+            array.array("i", [o.pos[1] for o in object_list]),
+            array.array("B", [orient_index_dict[o.orient] for o in object_list]),
+            array.array("i", [space_id_intern((o.space_id.name, o.space_id.infinite_tier)) if o.space_id is not None else -1 for o in object_list]),
+            array.array("i", [level_id_intern(o.level_id.name) if o.level_id is not None else -1 for o in object_list]),
+        ]
+        extras_dict: dict[str, dict[str, Any]] = {}
+        for index, obj in enumerate(object_list):
+            if isinstance(obj, bmp.space.extended_object_types):
+                extras = get_json_extras(obj.to_json())
+                if len(extras) != 0:
+                    extras_dict[str(index)] = extras
+        return self.pack_arrays(space_json, array_list, extras_dict)
+    def remap[T: Hashable, U](self, table: InternTable[T], item_list: list[U], to_item: Callable[[U], T]) -> Optional[list[int]]:
+        if id(item_list) not in self.remap_dict:
+            index_list = [table.intern(to_item(i)) for i in item_list]
+            self.remap_dict[id(item_list)] = index_list if index_list != list(range(len(index_list))) else None
+        return self.remap_dict[id(item_list)]
+    def pack_packed_space(self, packed_space: bmp.space.PackedSpace) -> dict[str, Any]:
+        array_list = [
+            remap_array(packed_space.type_array, self.remap(self.type_table, packed_space.type_list, str)),
+            packed_space.x_array,
+            packed_space.y_array,
+            remap_array(packed_space.orient_array, self.remap(self.orient_table, packed_space.orient_list, str)),
+            remap_array(packed_space.space_id_array, self.remap(self.space_id_table, packed_space.space_id_list, lambda i: (i.name, i.infinite_tier))),
+            remap_array(packed_space.level_id_array, self.remap(self.level_id_table, packed_space.level_id_list, lambda i: i.name)),
+        ]
+        extras_dict = {str(k): v for k, v in packed_space.extras_dict.items()}
+        return self.pack_arrays(packed_space.header_to_json(), array_list, extras_dict)
+    def to_bytes(self, header: dict[str, Any]) -> bytes:
+        header = {
+            **header,
+            "types": self.type_table.item_list,
+            "orients": self.orient_table.item_list,
+            "space_ids": self.space_id_table.item_list,
+            "level_ids": self.level_id_table.item_list,
+        }
+        header_bytes = json.dumps(header, separators=(",", ":")).encode("utf-8")
+        body_list: list[bytes] = [length_struct.pack(len(header_bytes)), header_bytes]
+        for packed_array in self.array_list:
+            if sys.byteorder != "little":
+                # the arrays may belong to a packed space that is still pending
+                packed_array = array.array(packed_array.typecode, packed_array)
+                packed_array.byteswap()
+            body_list.append(packed_array.tobytes())
+        return prefix_struct.pack(magic, format_version) + zlib.compress(b"".join(body_list))
+
+class Decoder(object):
+    def __init__(self, data: bytes) -> None:
+        if len(data) < prefix_struct.size:
+            raise FormatError(len(data))
+        file_magic, file_format_version = prefix_struct.unpack_from(data)
+        if file_magic != magic:
+            raise FormatError(file_magic)
+        if file_format_version > format_version:
+            raise bmp.base.DowngradeError(file_format_version)
+        self.body: bytes = zlib.decompress(data[prefix_struct.size:])
+        header_length: int = length_struct.unpack_from(self.body)[0]
+        self.offset: int = length_struct.size + header_length
+        self.header: dict[str, Any] = json.loads(self.body[length_struct.size:self.offset].decode("utf-8"))
+        self.type_list: list[str] = self.header.pop("types")
+        self.orient_list: list[str] = self.header.pop("orients")
+        self.space_id_list: list[bmp.ref.SpaceID] = [bmp.ref.SpaceID(n, t) for n, t in self.header.pop("space_ids")]
+        self.level_id_list: list[bmp.ref.LevelID] = [bmp.ref.LevelID(n) for n in self.header.pop("level_ids")]
+        self.packed_space_list: list[bmp.space.PackedSpace] = []
+    def unpack_space(self, packed_space: dict[str, Any]) -> bmp.space.PackedSpace:
+        same: Optional[int] = packed_space.get("same")
+        if same is not None:
+            return self.packed_space_list[same]
+        count: int = packed_space["count"]
+        array_list: list[array.array] = []
+        for typecode in array_typecodes:
+            packed_array = array.array(typecode)
+            length = count * packed_array.itemsize
+            packed_array.frombytes(self.body[self.offset:self.offset + length])
+            if sys.byteorder != "little":
+                packed_array.byteswap()
+            self.offset += length
+            array_list.append(packed_array)
+        space_json: dict[str, Any] = packed_space["space"]
+        new_packed_space = bmp.space.PackedSpace(
+            space_id = bmp.ref.SpaceID(**space_json["id"]),
+            size = (space_json["size"][0], space_json["size"][1]),
+            color = space_json.get("color"),
+            type_list = self.type_list,
+            orient_list = self.orient_list,
+            space_id_list = self.space_id_list,
+            level_id_list = self.level_id_list,
+            array_list = array_list,
+            extras_dict = {int(k): v for k, v in packed_space["extras"].items()},
+        )
+        self.packed_space_list.append(new_packed_space)
+        return new_packed_space
+
+def json_to_bytes(json_object: bmp.levelpack.LevelpackJson) -> bytes:
+    encoder = Encoder()
+    header: dict[str, Any] = {k: v for k, v in json_object.items() if k not in ("spaces", "space_init_states")}
+    for key in ("spaces", "space_init_states"):
+        if key in json_object:
+            header[key] = [
+                encoder.pack_space(get_space_header(s), s["objects"])
+                for s in json_object[key]
+            ]
+    return encoder.to_bytes(header)
+
+def bytes_to_json(data: bytes) -> bmp.levelpack.LevelpackJson:
+    decoder = Decoder(data)
+    json_object: dict[str, Any] = decoder.header
+    for key in ("spaces", "space_init_states"):
+        if key in json_object:
+            json_object[key] = [decoder.unpack_space(s).to_json() for s in json_object[key]]
+    return json_object # type: ignore
+
+def space_to_packed(encoder: Encoder, space: bmp.space.Space | bmp.space.PendingSpace) -> dict[str, Any]:
+    if isinstance(space, bmp.space.PackedSpace):
+        return encoder.pack_packed_space(space)
+    if not isinstance(space, bmp.space.Space):
+        return encoder.pack_space(get_space_header(space), space["objects"])
+    space_json: dict[str, Any] = {"id": space.space_id.to_json(), "size": [space.width, space.height]}
+    if space.color is not None:
+        space_json["color"] = space.color
+    return encoder.pack_objects(space_json, space.object_list)
+
+def levelpack_to_bytes(levelpack: bmp.levelpack.Levelpack) -> bytes:
+    encoder = Encoder()
+    header: dict[str, Any] = {
+        "ver": bmp.base.version,
+        "current_level": levelpack.current_level_id.to_json(),
+        "levels": [l.to_json() for l in levelpack.level_dict.values()],
+        "spaces": [space_to_packed(encoder, s) for s in levelpack.get_space_list()],
+        "level_init_states": list(levelpack.level_init_state_dict.values()),
+        "space_init_states": [space_to_packed(encoder, s) for s in levelpack.space_init_state_dict.values()],
+        "collectibles": [c.to_json() for c in levelpack.collectibles],
+        "rules": [[o.json_name for o in r] for r in levelpack.rule_list],
+    }
+    if levelpack.name is not None:
+        header["name"] = levelpack.name
+    if levelpack.author is not None:
+        header["author"] = levelpack.author
+    return encoder.to_bytes(header)
+
+def bytes_to_levelpack(data: bytes) -> bmp.levelpack.Levelpack:
+    # spaces stay packed until the levelpack materializes them
+    decoder = Decoder(data)
+    json_object: dict[str, Any] = decoder.header
+    space_list: list[bmp.space.PendingSpace] = [decoder.unpack_space(s) for s in json_object.pop("spaces")]
+    space_init_state_list: Optional[list[bmp.space.PendingSpace]] = None
+    if "space_init_states" in json_object:
+        space_init_state_list = [decoder.unpack_space(s) for s in json_object.pop("space_init_states")]
+    json_object["spaces"] = []
+    return bmp.levelpack.json_to_levelpack(
+        bmp.levelpack.update_json_format(json_object, json_object["ver"]), # type: ignore
+        space_list,
+        space_init_state_list,
+    )
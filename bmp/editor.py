@@ -1,4 +1,5 @@
 from typing import Optional
+import abc
 import os
 import copy
 import random
@@ -18,11 +19,211 @@ import bmp.space
 
 import pygame
 
+def dict_insert[K, V](__dict: dict[K, V], index: int, key: K, value: V) -> None:
+    item_list = list(__dict.items())
+    item_list.insert(index, (key, value))
+    __dict.clear()
+    __dict.update(item_list)
+
+class EditAction(abc.ABC):
+    @abc.abstractmethod
+    def redo(self, levelpack: bmp.levelpack.Levelpack) -> None: ...
+    @abc.abstractmethod
+    def undo(self, levelpack: bmp.levelpack.Levelpack) -> None: ...
+
+class ObjectsAdded(EditAction):
+    def __init__(self, space: bmp.space.Space, obj_list: list[bmp.obj.Object]) -> None:
+        self.space: bmp.space.Space = space
+        self.obj_list: list[bmp.obj.Object] = obj_list
+    def redo(self, levelpack: bmp.levelpack.Levelpack) -> None:
+        for obj in self.obj_list:
+            self.space.new_obj(obj)
+    def undo(self, levelpack: bmp.levelpack.Levelpack) -> None:
+        for obj in self.obj_list:
+            self.space.del_obj(obj)
+
+class ObjectsRemoved(EditAction):
+    def __init__(self, space: bmp.space.Space, obj_list: list[bmp.obj.Object]) -> None:
+        self.space: bmp.space.Space = space
+        self.obj_list: list[bmp.obj.Object] = obj_list
+        self.index_list: list[int] = []
+    def redo(self, levelpack: bmp.levelpack.Levelpack) -> None:
+        index_dict = {o.uid: i for i, o in enumerate(self.space.object_list)}
+        self.index_list = [index_dict[o.uid] for o in self.obj_list]
+        for obj in self.obj_list:
+            self.space.del_obj(obj)
+    def undo(self, levelpack: bmp.levelpack.Levelpack) -> None:
+        self.space.insert_objs(list(zip(self.index_list, self.obj_list)))
+
+class SpaceCreated(EditAction):
+    def __init__(self, space: bmp.space.Space) -> None:
+        self.space: bmp.space.Space = space
+    def redo(self, levelpack: bmp.levelpack.Levelpack) -> None:
+        levelpack.space_dict[self.space.space_id] = self.space
+        levelpack.current_level.current_space_id = self.space.space_id
+    def undo(self, levelpack: bmp.levelpack.Levelpack) -> None:
+        levelpack.space_dict.pop(self.space.space_id)
+
+class SpaceSet(EditAction):
+    def __init__(self, level: bmp.level.Level, space: bmp.space.Space) -> None:
+        self.level: bmp.level.Level = level
+        self.space: bmp.space.Space = space
+        self.space_index: int = 0
+        self.old_space: Optional[bmp.space.Space] = None
+    def redo(self, levelpack: bmp.levelpack.Levelpack) -> None:
+        self.old_space = self.level.space_dict.get(self.space.space_id)
+        if self.old_space is not None:
+            self.space_index = list(self.level.space_dict.keys()).index(self.space.space_id)
+        self.level.set_space(self.space)
+    def undo(self, levelpack: bmp.levelpack.Levelpack) -> None:
+        self.level.space_dict.pop(self.space.space_id)
+        if self.old_space is not None:
+            dict_insert(self.level.space_dict, self.space_index, self.space.space_id, self.old_space)
+        self.level.touch()
+
+class SpaceDeleted(EditAction):
+    def __init__(self, level: bmp.level.Level, space_id: bmp.ref.SpaceID, next_space_id: bmp.ref.SpaceID) -> None:
+        self.level: bmp.level.Level = level
+        self.space_id: bmp.ref.SpaceID = space_id
+        self.next_space_id: bmp.ref.SpaceID = next_space_id
+        self.space_index: int = 0
+        self.space_included_index: int = 0
+        self.space: Optional[bmp.space.Space] = None
+    def redo(self, levelpack: bmp.levelpack.Levelpack) -> None:
+        self.space_included_index = self.level.space_included.index(self.space_id)
+        self.level.space_included.pop(self.space_included_index)
+        self.space = None
+        if all(map(lambda l: self.space_id not in l.space_included, levelpack.level_dict.values())):
+            self.space_index = list(levelpack.space_dict.keys()).index(self.space_id)
+            self.space = levelpack.space_dict.pop(self.space_id)
+        self.level.current_space_id = self.next_space_id
+    def undo(self, levelpack: bmp.levelpack.Levelpack) -> None:
+        if self.space is not None:
+            dict_insert(levelpack.space_dict, self.space_index, self.space_id, self.space)
+        self.level.space_included.insert(self.space_included_index, self.space_id)
+
+class LevelCreated(EditAction):
+    def __init__(self, level: bmp.level.Level, space: bmp.space.Space) -> None:
+        self.level: bmp.level.Level = level
+        self.space: bmp.space.Space = space
+    def redo(self, levelpack: bmp.levelpack.Levelpack) -> None:
+        levelpack.space_dict[self.space.space_id] = self.space
+        levelpack.level_dict[self.level.level_id] = self.level
+        self.level.space_dict = levelpack.space_dict
+        levelpack.current_level_id = self.level.level_id
+    def undo(self, levelpack: bmp.levelpack.Levelpack) -> None:
+        levelpack.level_dict.pop(self.level.level_id)
+        levelpack.space_dict.pop(self.space.space_id)
+
+class LevelDeleted(EditAction):
+    def __init__(self, level_id: bmp.ref.LevelID, next_level_id: bmp.ref.LevelID) -> None:
+        self.level_id: bmp.ref.LevelID = level_id
+        self.next_level_id: bmp.ref.LevelID = next_level_id
+        self.level_index: int = 0
+        self.level_init_index: int = 0
+        self.level: Optional[bmp.level.Level] = None
+        self.level_init_state: Optional[bmp.level.LevelJson] = None
+    def redo(self, levelpack: bmp.levelpack.Levelpack) -> None:
+        self.level_index = list(levelpack.level_dict.keys()).index(self.level_id)
+        self.level_init_index = list(levelpack.level_init_state_dict.keys()).index(self.level_id)
+        self.level = levelpack.level_dict[self.level_id]
+        self.level_init_state = levelpack.level_init_state_dict[self.level_id]
+        levelpack.del_level(self.level_id)
+        levelpack.current_level_id = self.next_level_id
+    def undo(self, levelpack: bmp.levelpack.Levelpack) -> None:
+        if self.level is not None and self.level_init_state is not None:
+            dict_insert(levelpack.level_dict, self.level_index, self.level_id, self.level)
+            dict_insert(levelpack.level_init_state_dict, self.level_init_index, self.level_id, self.level_init_state)
+
+class LevelRenamed(EditAction):
+    def __init__(self, level_id: bmp.ref.LevelID, name: str) -> None:
+        self.level_id: bmp.ref.LevelID = level_id
+        self.name: str = name
+    def redo(self, levelpack: bmp.levelpack.Levelpack) -> None:
+        self.level_id.name, self.name = self.name, self.level_id.name
+    def undo(self, levelpack: bmp.levelpack.Levelpack) -> None:
+        self.redo(levelpack)
+
+class SpaceRenamed(EditAction):
+    def __init__(self, space_id: bmp.ref.SpaceID, name: str, infinite_tier: int) -> None:
+        self.space_id: bmp.ref.SpaceID = space_id
+        self.name: str = name
+        self.infinite_tier: int = infinite_tier
+    def redo(self, levelpack: bmp.levelpack.Levelpack) -> None:
+        self.space_id.name, self.name = self.name, self.space_id.name
+        self.space_id.infinite_tier, self.infinite_tier = self.infinite_tier, self.space_id.infinite_tier
+    def undo(self, levelpack: bmp.levelpack.Levelpack) -> None:
+        self.redo(levelpack)
+
+class RuleAdded(EditAction):
+    def __init__(self, rule: bmp.rule.Rule) -> None:
+        self.rule: bmp.rule.Rule = rule
+    def redo(self, levelpack: bmp.levelpack.Levelpack) -> None:
+        levelpack.rule_list.append(self.rule)
+    def undo(self, levelpack: bmp.levelpack.Levelpack) -> None:
+        levelpack.rule_list.pop()
+
+class RuleRemoved(EditAction):
+    def __init__(self, rule: bmp.rule.Rule) -> None:
+        self.rule: bmp.rule.Rule = rule
+        self.rule_index: int = 0
+    def redo(self, levelpack: bmp.levelpack.Levelpack) -> None:
+        self.rule_index = levelpack.rule_list.index(self.rule)
+        self.rule = levelpack.rule_list.pop(self.rule_index)
+    def undo(self, levelpack: bmp.levelpack.Levelpack) -> None:
+        levelpack.rule_list.insert(self.rule_index, self.rule)
+
+class ActionGroup(EditAction):
+    def __init__(self, action_list: list[EditAction]) -> None:
+        self.action_list: list[EditAction] = action_list
+    def redo(self, levelpack: bmp.levelpack.Levelpack) -> None:
+        for action in self.action_list:
+            action.redo(levelpack)
+    def undo(self, levelpack: bmp.levelpack.Levelpack) -> None:
+        for action in reversed(self.action_list):
+            action.undo(levelpack)
+
+type EditRecord = tuple[EditAction, bmp.ref.LevelID, bmp.ref.SpaceID]
+
+class EditHistory(object):
+    def __init__(self) -> None:
+        self.undo_list: list[EditRecord] = []
+        self.redo_list: list[EditRecord] = []
+    def set_view(self, levelpack: bmp.levelpack.Levelpack, level_id: bmp.ref.LevelID, space_id: bmp.ref.SpaceID) -> None:
+        levelpack.current_level_id = level_id
+        levelpack.current_level.current_space_id = space_id
+    def apply(self, levelpack: bmp.levelpack.Levelpack, action: EditAction) -> None:
+        record: EditRecord = (action, levelpack.current_level_id, levelpack.current_level.current_space_id)
+        action.redo(levelpack)
+        levelpack.touch()
+        self.undo_list.append(record)
+        self.redo_list.clear()
+    def undo(self, levelpack: bmp.levelpack.Levelpack) -> bool:
+        if len(self.undo_list) == 0:
+            return False
+        record = self.undo_list.pop()
+        action, level_id, space_id = record
+        action.undo(levelpack)
+        self.set_view(levelpack, level_id, space_id)
+        self.redo_list.append(record)
+        return True
+    def redo(self, levelpack: bmp.levelpack.Levelpack) -> bool:
+        if len(self.redo_list) == 0:
+            return False
+        record = self.redo_list.pop()
+        action, level_id, space_id = record
+        self.set_view(levelpack, level_id, space_id)
+        action.redo(levelpack)
+        levelpack.touch()
+        self.undo_list.append(record)
+        return True
+
 def levelpack_editor(levelpack: bmp.levelpack.Levelpack) -> bmp.levelpack.Levelpack:
+    levelpack.materialize_all()
     for level in levelpack.level_list:
         for space in level.space_list:
             space.set_sprite_states(0)
-    history = [copy.deepcopy(levelpack)]
+    edit_history = EditHistory()
     current_object_type: type[bmp.obj.Object] = bmp.obj.TextSpace
     current_orient = bmp.loc.Orient.S
     current_cursor_pos: bmp.loc.Coord[int] = (0, 0)
@@ -51,6 +252,7 @@ def levelpack_editor(levelpack: bmp.levelpack.Levelpack) -> bmp.levelpack.Levelp
         pygame.K_m: "M",
         pygame.K_r: "R",
         pygame.K_t: "T",
+        pygame.K_y: "Y",
         pygame.K_z: "Z",
         pygame.K_x: "X",
         pygame.K_c: "C",
@@ -171,7 +373,6 @@ def levelpack_editor(levelpack: bmp.levelpack.Levelpack) -> bmp.levelpack.Levelp
                     elif mouses[0] == 1 or cursor_pos_changed:
                         # place object; with detail (shift); allow overlap (ctrl)
                         if keys["LSHIFT"] or keys["RSHIFT"] or len(levelpack.current_level.current_space.get_objs_from_pos(current_cursor_pos)) == 0:
-                            history.append(copy.deepcopy(levelpack))
                             if issubclass(current_object_type, bmp.obj.LevelObject):
                                 if keys["LCTRL"] or keys["RCTRL"]:
                                     bmp.lang.print(bmp.lang.seperator_line(bmp.lang.fformat("title.new")))
@@ -188,7 +389,7 @@ def levelpack_editor(levelpack: bmp.levelpack.Levelpack) -> bmp.levelpack.Levelp
                                     icon_name = "text_level"
                                     icon_color = bmp.color.current_palette[bmp.obj.default_level_object_type.sprite_palette]
                                 level_extra: bmp.obj.LevelObjectExtra = {"icon": {"name": icon_name, "color": icon_color}}
-                                levelpack.current_level.current_space.new_obj(current_object_type(current_cursor_pos, current_orient, level_id=level_id, level_extra=level_extra)) # type: ignore
+                                new_obj = current_object_type(current_cursor_pos, current_orient, level_id=level_id, level_extra=level_extra) # type: ignore
                             elif issubclass(current_object_type, bmp.obj.SpaceObject):
                                 space_id: bmp.ref.SpaceID = levelpack.current_level.current_space_id
                                 if keys["LCTRL"] or keys["RCTRL"]:
@@ -196,7 +397,7 @@ def levelpack_editor(levelpack: bmp.levelpack.Levelpack) -> bmp.levelpack.Levelp
                                     name = bmp.lang.input_str(bmp.lang.fformat("edit.space.new.name"))
                                     infinite_tier = bmp.lang.input_int(bmp.lang.fformat("edit.space.new.infinite_tier"))
                                     space_id = bmp.ref.SpaceID(name, infinite_tier)
-                                levelpack.current_level.current_space.new_obj(current_object_type(current_cursor_pos, current_orient, space_id=space_id))
+                                new_obj = current_object_type(current_cursor_pos, current_orient, space_id=space_id)
                             elif issubclass(current_object_type, bmp.obj.Path):
                                 unlocked = False
                                 conditions: dict[type[bmp.obj.Object], int] = {}
@@ -214,9 +415,11 @@ def levelpack_editor(levelpack: bmp.levelpack.Levelpack) -> bmp.levelpack.Levelp
                                         collects_count = bmp.lang.input_int(bmp.lang.fformat("input.number"))
                                         conditions[collects_type] = collects_count
                                         more_condition = bmp.lang.input_yes(bmp.lang.fformat("edit.path.new.condition"))
-                                levelpack.current_level.current_space.new_obj(current_object_type(current_cursor_pos, current_orient, unlocked=unlocked, conditions=conditions)) # type: ignore
+                                new_obj = current_object_type(current_cursor_pos, current_orient, unlocked=unlocked, conditions=conditions) # type: ignore
                             else:
-                                levelpack.current_level.current_space.new_obj(current_object_type(current_cursor_pos, current_orient))
+                                new_obj = current_object_type(current_cursor_pos, current_orient)
+                            edit_history.apply(levelpack, ObjectsAdded(levelpack.current_level.current_space, [new_obj]))
+                            del new_obj
                 elif mouses[2] != 0:
                     if mouses[2] == 1 and (keys["LALT"] or keys["RALT"]):
                         # leave space; leave level (shift)
@@ -231,8 +434,10 @@ def levelpack_editor(levelpack: bmp.levelpack.Levelpack) -> bmp.levelpack.Levelp
                                 space_changed = True
                     elif mouses[2] == 1 or cursor_pos_changed:
                         # new space; new level (alt)
-                        history.append(copy.deepcopy(levelpack))
-                        levelpack.current_level.current_space.del_objs_from_pos(current_cursor_pos)
+                        objs_under_cursor = levelpack.current_level.current_space.get_objs_from_pos(current_cursor_pos)
+                        if len(objs_under_cursor) != 0:
+                            edit_history.apply(levelpack, ObjectsRemoved(levelpack.current_level.current_space, objs_under_cursor.copy()))
+                        del objs_under_cursor
                 elif mouses[1] == 1:
                     # object select from cursor
                     objects_under_cursor = levelpack.current_level.current_space.get_objs_from_pos(current_cursor_pos)
@@ -301,7 +506,6 @@ def levelpack_editor(levelpack: bmp.levelpack.Levelpack) -> bmp.levelpack.Levelp
             if keys["LALT"] or keys["RALT"]:
                 bmp.lang.print(bmp.lang.seperator_line(bmp.lang.fformat("title.new")))
                 if bmp.lang.input_no(bmp.lang.fformat("edit.level.new")):
-                    history.append(copy.deepcopy(levelpack))
                     level_name = bmp.lang.input_str(bmp.lang.fformat("edit.level.new.name"))
                     level_id: bmp.ref.LevelID = bmp.ref.LevelID(level_name)
                     super_level_name = bmp.lang.input_str(bmp.lang.fformat("edit.level.new.super_level.name"))
@@ -315,25 +519,23 @@ def levelpack_editor(levelpack: bmp.levelpack.Levelpack) -> bmp.levelpack.Levelp
                         default = bmp.opt.options["editor"]["default_space"]["color"],
                     )
                     space_id = bmp.ref.SpaceID(name, infinite_tier)
-                    levelpack.space_dict[space_id] = bmp.space.Space(space_id, (width, height), space_color)
+                    new_space = bmp.space.Space(space_id, (width, height), space_color)
                     map_info: Optional[bmp.level.MapLevelExtraJson] = None
                     if bmp.lang.input_yes(bmp.lang.fformat("edit.level.new.is_map")):
                         map_info = {}
                         spore_for_blossom = bmp.lang.input_int_optional(bmp.lang.fformat("edit.level.new.spore_for_blossom"))
                         if spore_for_blossom is not None:
                             map_info["spore_for_blossom"] = spore_for_blossom
-                    levelpack.level_dict[level_id] = bmp.level.Level(
+                    new_level = bmp.level.Level(
                         level_id, [space_id], space_id,
                         super_level_id = super_level_id,
                         map_info = map_info,
                     )
-                    levelpack.level_dict[level_id].space_dict = levelpack.space_dict
-                    levelpack.current_level_id = level_id
+                    edit_history.apply(levelpack, LevelCreated(new_level, new_space))
                     level_changed = True
-                    del level_id, space_id
+                    del level_id, space_id, new_level, new_space
             else:
                 if bmp.lang.input_no(bmp.lang.fformat("edit.space.new")):
-                    history.append(copy.deepcopy(levelpack))
                     name = bmp.lang.input_str(bmp.lang.fformat("edit.space.new.name"))
                     width = bmp.lang.input_int(bmp.lang.fformat("edit.space.new.width"), default=bmp.opt.options["editor"]["default_space"]["width"])
                     height = bmp.lang.input_int(bmp.lang.fformat("edit.space.new.height"), default=bmp.opt.options["editor"]["default_space"]["height"])
@@ -343,8 +545,7 @@ def levelpack_editor(levelpack: bmp.levelpack.Levelpack) -> bmp.levelpack.Levelp
                         default = bmp.opt.options["editor"]["default_space"]["color"],
                     )
                     space_id = bmp.ref.SpaceID(name, infinite_tier)
-                    levelpack.current_level.space_dict[space_id] = bmp.space.Space(space_id, (width, height), space_color)
-                    levelpack.current_level.current_space_id = space_id
+                    edit_history.apply(levelpack, SpaceCreated(bmp.space.Space(space_id, (width, height), space_color)))
                     space_changed = True
                     del space_id
         # delete current space / level (alt)
@@ -352,18 +553,15 @@ def levelpack_editor(levelpack: bmp.levelpack.Levelpack) -> bmp.levelpack.Levelp
             bmp.lang.print(bmp.lang.seperator_line(bmp.lang.fformat("title.delete")))
             if keys["LALT"] or keys["RALT"]:
                 if bmp.lang.input_yes(bmp.lang.fformat("edit.level.delete")):
-                    levelpack.del_level(levelpack.current_level_id)
-                    levelpack.current_level_id = random.choice(list(levelpack.level_dict.keys()))
+                    next_level_id = random.choice([k for k in levelpack.level_dict.keys() if k != levelpack.current_level_id])
+                    edit_history.apply(levelpack, LevelDeleted(levelpack.current_level_id, next_level_id))
+                    del next_level_id
                     level_changed = True
             else:
                 if bmp.lang.input_yes(bmp.lang.fformat("edit.space.delete")):
-                    levelpack.current_level.space_included.remove(levelpack.current_level.current_space_id)
-                    if all(map(
-                        lambda l: levelpack.current_level.current_space_id not in l.space_included,
-                        levelpack.level_dict.values()
-                    )):
-                        levelpack.space_dict.pop(levelpack.current_level.current_space_id)
-                    levelpack.current_level.current_space_id = random.choice(levelpack.current_level.space_included)
+                    next_space_id = random.choice([i for i in levelpack.current_level.space_included if i != levelpack.current_level.current_space_id])
+                    edit_history.apply(levelpack, SpaceDeleted(levelpack.current_level, levelpack.current_level.current_space_id, next_space_id))
+                    del next_space_id
                     space_changed = True
         # add global rule; remove global rule (shift)
         elif keys["R"]:
@@ -384,9 +582,9 @@ def levelpack_editor(levelpack: bmp.levelpack.Levelpack) -> bmp.levelpack.Levelp
                     break
             if valid_input:
                 if keys["LSHIFT"] or keys["RSHIFT"]:
-                    levelpack.rule_list.remove(type_rule)
+                    edit_history.apply(levelpack, RuleRemoved(type_rule))
                 else:
-                    levelpack.rule_list.append(type_rule)
+                    edit_history.apply(levelpack, RuleAdded(type_rule))
             bmp.lang.print(bmp.lang.seperator_line(bmp.lang.fformat("title.levelpack.rule_list")))
             for rule in levelpack.rule_list:
                 str_list: list[str] = []
@@ -397,40 +595,43 @@ def levelpack_editor(levelpack: bmp.levelpack.Levelpack) -> bmp.levelpack.Levelp
         elif keys["T"]:
             bmp.lang.print(bmp.lang.seperator_line(bmp.lang.fformat("title.rename")))
             if keys["LALT"] or keys["RALT"]:
-                levelpack.current_level_id.name = bmp.lang.input_str(bmp.lang.fformat("edit.level.rename"))
+                name = bmp.lang.input_str(bmp.lang.fformat("edit.level.rename"))
+                edit_history.apply(levelpack, LevelRenamed(levelpack.current_level_id, name))
             else:
-                levelpack.current_level.current_space_id.name = bmp.lang.input_str(bmp.lang.fformat("edit.space.rename"))
-                levelpack.current_level.current_space_id.infinite_tier = bmp.lang.input_int(bmp.lang.fformat("edit.space.new.infinite_tier"))
+                name = bmp.lang.input_str(bmp.lang.fformat("edit.space.rename"))
+                infinite_tier = bmp.lang.input_int(bmp.lang.fformat("edit.space.new.infinite_tier"))
+                edit_history.apply(levelpack, SpaceRenamed(levelpack.current_level.current_space_id, name, infinite_tier))
+        # redo
+        elif (keys["Y"] or (keys["Z"] and (keys["LSHIFT"] or keys["RSHIFT"]))) and (keys["LCTRL"] or keys["RCTRL"]):
+            if edit_history.redo(levelpack):
+                level_changed = True
         # undo
         elif keys["Z"] and (keys["LCTRL"] or keys["RCTRL"]):
-            if len(history) > 1:
-                levelpack = copy.deepcopy(history.pop())
-            else:
-                levelpack = copy.deepcopy(history[0])
-            level_changed = True
+            if edit_history.undo(levelpack):
+                level_changed = True
         # cut, copy, paste
         elif keys["X"] and (keys["LCTRL"] or keys["RCTRL"]):
-            history.append(copy.deepcopy(levelpack))
-            current_clipboard = levelpack.current_level.current_space.get_objs_from_pos(current_cursor_pos)
+            current_clipboard = levelpack.current_level.current_space.get_objs_from_pos(current_cursor_pos).copy()
+            if len(current_clipboard) != 0:
+                edit_history.apply(levelpack, ObjectsRemoved(levelpack.current_level.current_space, current_clipboard))
             current_clipboard = copy.deepcopy(current_clipboard)
-            levelpack.current_level.current_space.del_objs_from_pos(current_cursor_pos)
         elif keys["C"] and (keys["LCTRL"] or keys["RCTRL"]):
-            history.append(copy.deepcopy(levelpack))
             current_clipboard = levelpack.current_level.current_space.get_objs_from_pos(current_cursor_pos)
             current_clipboard = copy.deepcopy(current_clipboard)
         elif keys["V"] and (keys["LCTRL"] or keys["RCTRL"]):
-            history.append(copy.deepcopy(levelpack))
             current_clipboard = copy.deepcopy(current_clipboard)
             for obj in current_clipboard:
                 obj.reset_uuid()
                 obj.pos = current_cursor_pos
-                levelpack.current_level.current_space.new_obj(obj)
+            paste_action_list: list[EditAction] = [ObjectsAdded(levelpack.current_level.current_space, current_clipboard)]
+            for obj in current_clipboard:
                 if isinstance(obj, bmp.obj.SpaceObject):
                     for level in levelpack.level_list:
                         space = level.get_space(obj.space_id)
                         if space is not None:
                             for new_space in level.space_list:
-                                levelpack.current_level.set_space(new_space)
+                                paste_action_list.append(SpaceSet(levelpack.current_level, new_space))
+            edit_history.apply(levelpack, ActionGroup(paste_action_list))
         elif keys["TAB"]:
             bmp.lang.print(bmp.lang.seperator_line(bmp.lang.fformat("title.level")))
             bmp.lang.fprint("edit.level.current.name", value=levelpack.current_level_id.name)
@@ -495,6 +696,8 @@ def levelpack_editor(levelpack: bmp.levelpack.Levelpack) -> bmp.levelpack.Levelp
             "@" + str(current_cursor_pos[0]) + "*" + str(current_cursor_pos[1]), # object pos
             "%" + current_orient.char(), # object orient
         ]
+        if bmp.opt.options["debug"]:
+            line_list.append("alloc " + str(bmp.render.current_allocation_counter.last))
         for line_index, line in enumerate(line_list):
             line_surface = bmp.render.line_to_surface(line, wiggle=wiggle)
             line_surface = bmp.render.set_gui_background(line_surface)
@@ -547,6 +750,7 @@ def levelpack_editor(levelpack: bmp.levelpack.Levelpack) -> bmp.levelpack.Levelp
             del real_fps_string, real_fps_surface
         if keys["F12"]:
             bmp.opt.options["debug"] = not bmp.opt.options["debug"]
+        bmp.render.current_allocation_counter.next_frame()
         pygame.display.flip()
         milliseconds = clock.tick(bmp.opt.options["render"]["fps"])
     pygame.display.quit()
@@ -7,6 +7,7 @@ import pygame
 
 import bmp.audio
 import bmp.base
+import bmp.binary
 import bmp.color
 import bmp.editor
 import bmp.game
@@ -33,20 +34,51 @@ def show_dir(path: str, filter_func: Optional[Callable[[str], bool]] = None, tab
         elif filelike.is_dir():
             show_dir(os.path.abspath(filelike.path), filter_func, tab + 1)
 
+def is_levelpack_file(filename: str) -> bool:
+    return filename.endswith(".json") or filename.endswith(bmp.binary.extension)
+
+def open_levelpack(path: str) -> bmp.levelpack.Levelpack:
+    if path.endswith(bmp.binary.extension):
+        with open(path, "rb") as file:
+            return bmp.binary.bytes_to_levelpack(file.read())
+    with open(path, "r", encoding="utf-8") as file:
+        return bmp.levelpack.json_to_levelpack(json.load(file))
+
+def open_levelpack_json(path: str) -> bmp.levelpack.AnyLevelpackJson:
+    if path.endswith(bmp.binary.extension):
+        with open(path, "rb") as file:
+            return bmp.binary.bytes_to_json(file.read())
+    with open(path, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+def save_levelpack(levelpack: bmp.levelpack.Levelpack, path: str) -> None:
+    if path.endswith(bmp.binary.extension):
+        with open(path, "wb") as file:
+            file.write(bmp.binary.levelpack_to_bytes(levelpack))
+        return
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(levelpack.to_json(), file, **bmp.opt.get_json_dump_kwds())
+
+def save_levelpack_json(json_object: bmp.levelpack.LevelpackJson, path: str) -> None:
+    if path.endswith(bmp.binary.extension):
+        with open(path, "wb") as file:
+            file.write(bmp.binary.json_to_bytes(json_object))
+        return
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(json_object, file, **bmp.opt.get_json_dump_kwds())
+
 def gameplay() -> bool:
     bmp.lang.print(bmp.lang.seperator_line(bmp.lang.fformat("title.directory", dir="levelpacks")))
-    show_dir("levelpacks", lambda s: True if bmp.opt.options["debug"] else s.endswith(".json"))
+    show_dir("levelpacks", lambda s: True if bmp.opt.options["debug"] else is_levelpack_file(s))
     bmp.lang.print(bmp.lang.seperator_line(bmp.lang.fformat("title.open.file")))
     bmp.lang.fprint("launch.open.levelpack")
     input_filename = bmp.lang.input_str(bmp.lang.fformat("input.file.name"))
-    input_filename += "" if bmp.opt.options["debug"] or input_filename.endswith(".json") else ".json"
+    input_filename += "" if bmp.opt.options["debug"] or is_levelpack_file(input_filename) else ".json"
     if not os.path.isfile(os.path.join("levelpacks", input_filename)):
         bmp.lang.fwarn("warn.file.not_found", file=input_filename)
         return False
-    with open(os.path.join("levelpacks", input_filename), "r", encoding="utf-8") as file:
-        levelpack_json = json.load(file)
-        bmp.lang.fprint("launch.open.levelpack.done", file=input_filename)
-        levelpack = bmp.levelpack.json_to_levelpack(levelpack_json)
+    levelpack = open_levelpack(os.path.join("levelpacks", input_filename))
+    bmp.lang.fprint("launch.open.levelpack.done", file=input_filename)
     bmp.lang.fprint("play.start")
     levelpack = bmp.game.play(levelpack)
     bmp.lang.print(bmp.lang.seperator_line(bmp.lang.fformat("title.save.file")))
@@ -54,28 +86,25 @@ def gameplay() -> bool:
     bmp.lang.fprint("launch.save.levelpack.empty.game")
     output_filename = bmp.lang.input_str(bmp.lang.fformat("input.file.name"))
     if output_filename != "":
-        output_filename += "" if bmp.opt.options["debug"] or output_filename.endswith(".json") else ".json"
-        with open(os.path.join("levelpacks", output_filename), "w", encoding="utf-8") as file:
-            json.dump(levelpack.to_json(), file, **bmp.opt.get_json_dump_kwds())
-            bmp.lang.fprint("launch.save.levelpack.done", file=output_filename)
+        output_filename += "" if bmp.opt.options["debug"] or is_levelpack_file(output_filename) else ".json"
+        save_levelpack(levelpack, os.path.join("levelpacks", output_filename))
+        bmp.lang.fprint("launch.save.levelpack.done", file=output_filename)
     return True
 
 def editor() -> bool:
     bmp.lang.print(bmp.lang.seperator_line(bmp.lang.fformat("title.directory", dir="levelpacks")))
-    show_dir("levelpacks", lambda s: True if bmp.opt.options["debug"] else s.endswith(".json"))
+    show_dir("levelpacks", lambda s: True if bmp.opt.options["debug"] else is_levelpack_file(s))
     bmp.lang.print(bmp.lang.seperator_line(bmp.lang.fformat("title.open.file")))
     bmp.lang.fprint("launch.open.levelpack")
     bmp.lang.fprint("launch.open.levelpack.empty.editor")
     input_filename = bmp.lang.input_str(bmp.lang.fformat("input.file.name"))
     if input_filename != "":
-        input_filename += "" if bmp.opt.options["debug"] or input_filename.endswith(".json") else ".json"
+        input_filename += "" if bmp.opt.options["debug"] or is_levelpack_file(input_filename) else ".json"
         if not os.path.isfile(os.path.join("levelpacks", input_filename)):
             bmp.lang.fwarn("warn.file.not_found", file=input_filename)
             return False
-        with open(os.path.join("levelpacks", input_filename), "r", encoding="utf-8") as file:
-            levelpack_json = json.load(file)
-            bmp.lang.fprint("launch.open.levelpack.done", file=input_filename)
-            levelpack = bmp.levelpack.json_to_levelpack(levelpack_json)
+        levelpack = open_levelpack(os.path.join("levelpacks", input_filename))
+        bmp.lang.fprint("launch.open.levelpack.done", file=input_filename)
     else:
         size = (
             bmp.opt.options["editor"]["default_space"]["width"],
@@ -91,63 +120,58 @@ def editor() -> bool:
     bmp.lang.fprint("launch.save.levelpack.empty.editor")
     output_filename = bmp.lang.input_str(bmp.lang.fformat("input.file.name"))
     if output_filename != "":
-        output_filename += "" if bmp.opt.options["debug"] or output_filename.endswith(".json") else ".json"
-        with open(os.path.join("levelpacks", output_filename), "w", encoding="utf-8") as file:
-            json.dump(levelpack.to_json(), file, **bmp.opt.get_json_dump_kwds())
-            bmp.lang.fprint("launch.save.levelpack.done", file=output_filename)
+        output_filename += "" if bmp.opt.options["debug"] or is_levelpack_file(output_filename) else ".json"
+        save_levelpack(levelpack, os.path.join("levelpacks", output_filename))
+        bmp.lang.fprint("launch.save.levelpack.done", file=output_filename)
     return True
 
 def update_levelpack() -> bool:
     bmp.lang.print(bmp.lang.seperator_line(bmp.lang.fformat("title.directory", dir="levelpacks")))
-    show_dir("levelpacks", lambda s: True if bmp.opt.options["debug"] else s.endswith(".json"))
+    show_dir("levelpacks", lambda s: True if bmp.opt.options["debug"] else is_levelpack_file(s))
     bmp.lang.print(bmp.lang.seperator_line(bmp.lang.fformat("title.open.file")))
     bmp.lang.fprint("launch.open.levelpack")
     input_filename = bmp.lang.input_str(bmp.lang.fformat("input.file.name"))
-    input_filename += "" if bmp.opt.options["debug"] or input_filename.endswith(".json") else ".json"
+    input_filename += "" if bmp.opt.options["debug"] or is_levelpack_file(input_filename) else ".json"
     if not os.path.isfile(os.path.join("levelpacks", input_filename)):
         bmp.lang.fwarn("warn.file.not_found", file=input_filename)
         return False
-    with open(os.path.join("levelpacks", input_filename), "r", encoding="utf-8") as file:
-        levelpack_json: bmp.levelpack.AnyLevelpackJson = json.load(file)
-        bmp.lang.fprint("launch.open.levelpack.done", file=input_filename)
-        levelpack_json = bmp.levelpack.update_json_format(levelpack_json, levelpack_json["ver"])
+    levelpack_json: bmp.levelpack.AnyLevelpackJson = open_levelpack_json(os.path.join("levelpacks", input_filename))
+    bmp.lang.fprint("launch.open.levelpack.done", file=input_filename)
+    levelpack_json = bmp.levelpack.update_json_format(levelpack_json, levelpack_json["ver"])
     bmp.lang.print(bmp.lang.seperator_line(bmp.lang.fformat("title.save.file")))
     bmp.lang.fprint("launch.save.levelpack")
     bmp.lang.fprint("launch.save.levelpack.empty.update")
     output_filename = bmp.lang.input_str(bmp.lang.fformat("input.file.name"))
-    output_filename += "" if bmp.opt.options["debug"] or output_filename.endswith(".json") else ".json"
+    output_filename += "" if bmp.opt.options["debug"] or is_levelpack_file(output_filename) else ".json"
     if output_filename == "":
         output_filename = input_filename
-    with open(os.path.join("levelpacks", output_filename), "w", encoding="utf-8") as file:
-        json.dump(levelpack_json, file, **bmp.opt.get_json_dump_kwds())
-        bmp.lang.fprint("launch.save.levelpack.done", file=output_filename)
+    save_levelpack_json(levelpack_json, os.path.join("levelpacks", output_filename))
+    bmp.lang.fprint("launch.save.levelpack.done", file=output_filename)
     return True
 
 def set_levelpack_to_initial() -> bool:
     bmp.lang.print(bmp.lang.seperator_line(bmp.lang.fformat("title.directory", dir="levelpacks")))
-    show_dir("levelpacks", lambda s: True if bmp.opt.options["debug"] else s.endswith(".json"))
+    show_dir("levelpacks", lambda s: True if bmp.opt.options["debug"] else is_levelpack_file(s))
     bmp.lang.print(bmp.lang.seperator_line(bmp.lang.fformat("title.open.file")))
     bmp.lang.fprint("launch.open.levelpack")
     input_filename = bmp.lang.input_str(bmp.lang.fformat("input.file.name"))
-    input_filename += "" if bmp.opt.options["debug"] or input_filename.endswith(".json") else ".json"
+    input_filename += "" if bmp.opt.options["debug"] or is_levelpack_file(input_filename) else ".json"
     if not os.path.isfile(os.path.join("levelpacks", input_filename)):
         bmp.lang.fwarn("warn.file.not_found", file=input_filename)
         return False
-    with open(os.path.join("levelpacks", input_filename), "r", encoding="utf-8") as file:
-        levelpack_json: bmp.levelpack.LevelpackJson = json.load(file)
-        bmp.lang.fprint("launch.open.levelpack.done", file=input_filename)
-        levelpack_json.pop("level_init_states")
-        levelpack_json.pop("space_init_states")
+    levelpack_json: bmp.levelpack.LevelpackJson = open_levelpack_json(os.path.join("levelpacks", input_filename)) # type: ignore
+    bmp.lang.fprint("launch.open.levelpack.done", file=input_filename)
+    levelpack_json.pop("level_init_states")
+    levelpack_json.pop("space_init_states")
     bmp.lang.print(bmp.lang.seperator_line(bmp.lang.fformat("title.save.file")))
     bmp.lang.fprint("launch.save.levelpack")
     bmp.lang.fprint("launch.save.levelpack.empty.update")
     output_filename = bmp.lang.input_str(bmp.lang.fformat("input.file.name"))
-    output_filename += "" if bmp.opt.options["debug"] or output_filename.endswith(".json") else ".json"
+    output_filename += "" if bmp.opt.options["debug"] or is_levelpack_file(output_filename) else ".json"
     if output_filename == "":
         output_filename = input_filename
-    with open(os.path.join("levelpacks", output_filename), "w", encoding="utf-8") as file:
-        json.dump(levelpack_json, file, **bmp.opt.get_json_dump_kwds())
-        bmp.lang.fprint("launch.save.levelpack.done", file=output_filename)
+    save_levelpack_json(levelpack_json, os.path.join("levelpacks", output_filename))
+    bmp.lang.fprint("launch.save.levelpack.done", file=output_filename)
     return True
 
 def change_options() -> bool:
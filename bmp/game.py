@@ -7,11 +7,13 @@ import random
 import bmp.audio
 import bmp.base
 import bmp.color
+import bmp.history
 import bmp.lang
 import bmp.level
 import bmp.levelpack
 import bmp.loc
 import bmp.obj
+import bmp.perf
 import bmp.ref
 import bmp.render
 import bmp.space
@@ -44,6 +46,7 @@ keybinds: dict[int, str] = {
     pygame.K_EQUALS: "=",
     pygame.K_SPACE: " ",
     pygame.K_F1: "F1",
+    pygame.K_F2: "F2",
     pygame.K_F12: "F12",
 }
 keymods: dict[int, str] = {
@@ -72,16 +75,10 @@ def play(levelpack: bmp.levelpack.Levelpack) -> bmp.levelpack.Levelpack:
     for level in levelpack.level_list:
         for space in level.space_list:
             space.set_sprite_states(0)
-        levelpack.set_level_init_state(level.level_id, copy.deepcopy(level))
-    levelpack_unchanged = copy.deepcopy(levelpack)
+        levelpack.set_level_init_state(level.level_id, level)
+    levelpack_unchanged = levelpack.snapshot()
     levelpack_info: bmp.levelpack.ReturnInfo = bmp.levelpack.default_levelpack_info.copy()
-    history: list[tuple[
-        bmp.levelpack.Levelpack,
-        bmp.levelpack.ReturnInfo
-    ]] = [(
-        copy.deepcopy(levelpack),
-        levelpack_info.copy()
-    )]
+    history = bmp.history.History(levelpack.snapshot(), levelpack_info.copy())
     savepoint_dict: dict[str, tuple[bmp.levelpack.Levelpack, bmp.levelpack.ReturnInfo]] = {}
     default_savepoint_name = "_"
     window = pygame.display.set_mode((720, 720), pygame.RESIZABLE)
@@ -116,6 +113,9 @@ def play(levelpack: bmp.levelpack.Levelpack) -> bmp.levelpack.Levelpack:
     milliseconds = 1000 // bmp.opt.options["render"]["fps"]
     real_fps = bmp.opt.options["render"]["fps"]
     show_fps = False
+    show_profile = False
+    profiler = bmp.perf.TickProfiler()
+    render_cache = bmp.level.SpaceRenderCache()
     if bmp.opt.options["gameplay"]["bgm"]["enabled"] and bmp.base.current_os == bmp.base.windows:
         pygame.mixer.music.load(os.path.join("midi", bmp.opt.options["gameplay"]["bgm"]["name"]))
         pygame.mixer.music.play(-1)
@@ -169,11 +169,12 @@ def play(levelpack: bmp.levelpack.Levelpack) -> bmp.levelpack.Levelpack:
         if not press_key_to_continue:
             for key, (negative_key, op, (dx, dy)) in movements.items():
                 if keys[key] and not keys.get(negative_key, False):
+                    levelpack.profiler = profiler if show_profile else None
                     new_history: tuple[bmp.levelpack.Levelpack, bmp.levelpack.ReturnInfo] = (
-                        copy.deepcopy(levelpack),
+                        levelpack.snapshot(history.last_levelpack),
                         levelpack.tick(op)
                     )
-                    history.append(new_history)
+                    history.append(*new_history)
                     levelpack_info = new_history[1]
                     if levelpack.current_level.game_properties.enabled(bmp.obj.TextYou):
                         game_offset[0] += dx * window.get_width() / levelpack.current_level.current_space.width
@@ -237,8 +238,8 @@ def play(levelpack: bmp.levelpack.Levelpack) -> bmp.levelpack.Levelpack:
                     del current_space_index
             elif keys["Z"]:
                 if len(history) >= 1:
-                    levelpack = copy.deepcopy(history[-1][0])
-                    levelpack_info = copy.deepcopy(history[-1][1])
+                    levelpack = history.last_levelpack.restore()
+                    levelpack_info = copy.deepcopy(history.last_info)
                     if len(history) != 1:
                         history.pop()
                     level_changed = True
@@ -248,22 +249,22 @@ def play(levelpack: bmp.levelpack.Levelpack) -> bmp.levelpack.Levelpack:
                 if levelpack.current_level.super_level_id is not None and levelpack.current_level.super_level_id in levelpack.level_dict.keys():
                     levelpack.current_level_id = levelpack.current_level.super_level_id
                     new_history: tuple[bmp.levelpack.Levelpack, bmp.levelpack.ReturnInfo] = (
-                        copy.deepcopy(levelpack),
+                        levelpack.snapshot(history.last_levelpack),
                         bmp.levelpack.default_levelpack_info.copy()
                     )
-                    history.append(new_history)
+                    history.append(*new_history)
                     level_changed = True
                     display_refresh = True
             elif keys["R"]:
                 restart_failed = True
                 if not (keys["LCTRL"] or keys["RCTRL"]):
-                    for index, (old_levelpack, old_levelpack_info) in reversed(list(enumerate(history))):
-                        if index == 0 or history[index - 1][1]["select"] is not None:
+                    for index in reversed(range(len(history))):
+                        if index == 0 or history.get_info(index - 1)["select"] is not None:
                             bmp.lang.fprint("play.level.restart")
                             bmp.audio.play("restart")
-                            levelpack = copy.deepcopy(old_levelpack)
-                            levelpack_info = old_levelpack_info.copy()
-                            history = history[:index + 1]
+                            history.truncate(index + 1)
+                            levelpack = history.get_levelpack(index).restore()
+                            levelpack_info = history.get_info(index).copy()
                             level_changed = True
                             display_refresh = True
                             press_key_to_continue = False
@@ -272,12 +273,10 @@ def play(levelpack: bmp.levelpack.Levelpack) -> bmp.levelpack.Levelpack:
                 else:
                     bmp.lang.fprint("play.level.restart" if restart_failed else "play.levelpack.restart")
                     bmp.audio.play("restart")
-                    levelpack = copy.deepcopy(levelpack_unchanged)
+                    levelpack = levelpack_unchanged.restore()
                     levelpack_info = bmp.levelpack.default_levelpack_info.copy()
-                    history = [(
-                        copy.deepcopy(levelpack),
-                        levelpack_info.copy()
-                    )]
+                    history.close()
+                    history = bmp.history.History(levelpack.snapshot(), levelpack_info.copy())
                     level_changed = True
                     display_refresh = True
                     press_key_to_continue = False
@@ -304,7 +303,7 @@ def play(levelpack: bmp.levelpack.Levelpack) -> bmp.levelpack.Levelpack:
                     savepoint_name = savepoint_name if savepoint_name != "" else default_savepoint_name
                     savepoint = savepoint_dict.get(savepoint_name)
                     if savepoint is not None:
-                        levelpack = savepoint[0]
+                        levelpack = savepoint[0].restore()
                         levelpack_info = savepoint[1]
                         bmp.lang.fprint("play.savepoint.loaded", value=savepoint_name)
                         level_changed = True
@@ -324,7 +323,7 @@ def play(levelpack: bmp.levelpack.Levelpack) -> bmp.levelpack.Levelpack:
                         json.dump(levelpack.to_json(), file, **bmp.opt.get_json_dump_kwds())
                 else:
                     savepoint_name = savepoint_name if savepoint_name != "" else default_savepoint_name
-                    savepoint_dict[savepoint_name] = (copy.deepcopy(levelpack), levelpack_info.copy())
+                    savepoint_dict[savepoint_name] = (levelpack.snapshot(), levelpack_info.copy())
                 bmp.lang.fprint("play.savepoint.saved", value=savepoint_name)
             elif keys["TAB"]:
                 bmp.lang.print(bmp.lang.seperator_line(bmp.lang.fformat("title.info")))
@@ -489,6 +488,7 @@ def play(levelpack: bmp.levelpack.Levelpack) -> bmp.levelpack.Levelpack:
             for level in levelpack.level_list:
                 for space in levelpack.current_level.space_list:
                     space.set_sprite_states(len(history))
+            render_cache.clear()
             display_refresh = False
         if not press_key_to_continue:
             monochrome = None
@@ -528,11 +528,12 @@ def play(levelpack: bmp.levelpack.Levelpack) -> bmp.levelpack.Levelpack:
                 if levelpack.current_level.game_properties.enabled(bmp.obj.TextStop):
                     smooth_value = None
                 space_surface = levelpack.current_level.space_to_surface(
-                    levelpack.current_level.current_space, wiggle, space_surface_size, smooth=smooth_value, debug=bmp.opt.options["debug"]
+                    levelpack.current_level.current_space, wiggle, space_surface_size, smooth=smooth_value, debug=bmp.opt.options["debug"], render_cache=render_cache
                 )
                 del smooth_value
                 # monochrome when paused
                 if monochrome is not None:
+                    space_surface = bmp.render.copy_surface(space_surface)
                     monochrome_rgb = bmp.color.hex_to_rgb(monochrome)
                     monochrome_new = bmp.color.rgb_to_hex((
                         int(monochrome_rgb[0] * 0.25),
@@ -554,7 +555,7 @@ def play(levelpack: bmp.levelpack.Levelpack) -> bmp.levelpack.Levelpack:
                     window.blit(line_surface, (0, line_index * line_surface.get_height()))
                 # display object info
                 if bmp.opt.options["debug"]:
-                    line_list: list[str] = []
+                    line_list: list[str] = ["alloc " + str(bmp.render.current_allocation_counter.last), ""]
                     for obj in levelpack.current_level.current_space.get_objs_from_pos(mouse_pos_in_space):
                         line_list.extend(obj.get_info().split("\n"))
                         line_list.append("")
@@ -601,8 +602,26 @@ def play(levelpack: bmp.levelpack.Levelpack) -> bmp.levelpack.Levelpack:
             real_fps_surface = pygame.transform.scale_by(real_fps_surface, bmp.render.smaller_gui_scalar)
             window.blit(real_fps_surface, (0, 0))
             del real_fps_string, real_fps_surface
+        if keys["F2"]:
+            show_profile = not show_profile
+            profiler.clear()
+        if show_profile:
+            line_list: list[str] = [f"tick {profiler.average_total_time() * 1000:.2f}"]
+            last_record = profiler.last_record
+            for phase, seconds in list(profiler.average_time().items())[:8]:
+                objects = last_record.phase_objects.get(phase, 0) if last_record is not None else 0
+                line_list.append(f"{phase} {seconds * 1000:.2f} {objects}")
+            for name, number in profiler.total_counters().items():
+                line_list.append(f"{name} {number}")
+            for line_index, line in enumerate(line_list, start=1):
+                line_surface = bmp.render.line_to_surface(line, wiggle=wiggle)
+                line_surface = bmp.render.set_gui_background(line_surface)
+                line_surface = pygame.transform.scale_by(line_surface, bmp.render.smaller_gui_scalar)
+                window.blit(line_surface, (0, line_index * line_surface.get_height()))
+            del line_list, last_record
         if keys["F12"]:
             bmp.opt.options["debug"] = not bmp.opt.options["debug"]
+        bmp.render.current_allocation_counter.next_frame()
         pygame.display.flip()
         milliseconds = clock.tick(bmp.opt.options["render"]["fps"])
     pygame.mixer.music.stop()
@@ -0,0 +1,151 @@
+from typing import IO, Any, Optional
+import copy
+import io
+import itertools
+import pickle
+import tempfile
+import zlib
+
+import bmp.levelpack
+import bmp.obj
+import bmp.opt
+
+type HistoryEntry = tuple[bmp.levelpack.Levelpack, bmp.levelpack.ReturnInfo]
+type SpillEntry = tuple[int, int, frozenset[int]]
+
+def get_memory_limit() -> Optional[int]:
+    return bmp.opt.options["gameplay"].get("history_limit", bmp.opt.default_options["gameplay"].get("history_limit"))
+
+class SpillPickler(pickle.Pickler):
+    def __init__(self, file: IO[bytes], shared_dict: dict[int, Any], shared_token_dict: dict[int, int]) -> None:
+        super().__init__(file, pickle.HIGHEST_PROTOCOL)
+        self.shared_dict: dict[int, Any] = shared_dict
+        self.shared_token_dict: dict[int, int] = shared_token_dict
+        self.token_set: set[int] = set()
+    def persistent_id(self, obj: Any) -> Optional[int | str]:
+        if isinstance(obj, type) and bmp.obj.name_to_class.get(getattr(obj, "json_name", "")) is obj:
+            return obj.json_name
+        token = self.shared_token_dict.get(id(obj))
+        if token is None or self.shared_dict[token] is not obj:
+            return None
+        self.token_set.add(token)
+        return token
+
+class SpillUnpickler(pickle.Unpickler):
+    def __init__(self, file: IO[bytes], shared_dict: dict[int, Any]) -> None:
+        super().__init__(file)
+        self.shared_dict: dict[int, Any] = shared_dict
+    def persistent_load(self, pid: int | str) -> Any:
+        if isinstance(pid, str):
+            return bmp.obj.name_to_class[pid]
+        return self.shared_dict[pid]
+
+class History(object):
+    def __init__(self, levelpack: bmp.levelpack.Levelpack, levelpack_info: bmp.levelpack.ReturnInfo, memory_limit: Optional[int] = None) -> None:
+        self.memory_limit: Optional[int] = memory_limit if memory_limit is not None else get_memory_limit()
+        self.levelpack_list: list[Optional[bmp.levelpack.Levelpack]] = [levelpack]
+        self.info_list: list[bmp.levelpack.ReturnInfo] = [levelpack_info]
+        self.spill_list: list[SpillEntry] = []
+        self.spill_file: Optional[IO[bytes]] = None
+        self.shared_dict: dict[int, Any] = {}
+        self.shared_token_dict: dict[int, int] = {}
+        self.shared_count_dict: dict[int, int] = {}
+        self.token_counter = itertools.count()
+    def __len__(self) -> int:
+        return len(self.info_list)
+    def __del__(self) -> None:
+        self.close()
+    def close(self) -> None:
+        if self.spill_file is not None:
+            self.spill_file.close()
+            self.spill_file = None
+    @property
+    def last_levelpack(self) -> bmp.levelpack.Levelpack:
+        return self.get_levelpack(len(self) - 1)
+    @property
+    def last_info(self) -> bmp.levelpack.ReturnInfo:
+        return self.info_list[-1]
+    def get_info(self, index: int) -> bmp.levelpack.ReturnInfo:
+        return self.info_list[index]
+    def get_levelpack(self, index: int) -> bmp.levelpack.Levelpack:
+        levelpack = self.levelpack_list[index]
+        if levelpack is None:
+            return self.load(index)
+        return levelpack
+    def append(self, levelpack: bmp.levelpack.Levelpack, levelpack_info: bmp.levelpack.ReturnInfo) -> None:
+        self.levelpack_list.append(levelpack)
+        self.info_list.append(levelpack_info)
+        if self.memory_limit is not None and len(self) - len(self.spill_list) > max(self.memory_limit, 1):
+            self.spill()
+    def pop(self) -> HistoryEntry:
+        levelpack = self.get_levelpack(len(self) - 1)
+        levelpack_info = self.info_list.pop()
+        self.levelpack_list.pop()
+        if len(self.spill_list) == len(self):
+            self.unspill()
+        return levelpack, levelpack_info
+    def truncate(self, length: int) -> None:
+        del self.levelpack_list[length:]
+        del self.info_list[length:]
+        if len(self.spill_list) >= length:
+            for entry in self.spill_list[length:]:
+                self.release(entry)
+            del self.spill_list[length:]
+            self.unspill()
+    def share(self, obj: Any) -> None:
+        token = self.shared_token_dict.get(id(obj))
+        if token is not None and self.shared_dict[token] is obj:
+            return
+        token = next(self.token_counter)
+        self.shared_dict[token] = obj
+        self.shared_token_dict[id(obj)] = token
+        self.shared_count_dict[token] = 0
+    def release(self, entry: SpillEntry) -> None:
+        for token in entry[2]:
+            self.shared_count_dict[token] -= 1
+            if self.shared_count_dict[token] == 0:
+                del self.shared_count_dict[token]
+                obj = self.shared_dict.pop(token)
+                del self.shared_token_dict[id(obj)]
+    def spill(self) -> None:
+        index = len(self.spill_list)
+        levelpack = self.levelpack_list[index]
+        if levelpack is None:
+            return
+        for init_state in [*levelpack.level_init_state_dict.values(), *levelpack.space_init_state_dict.values(), *levelpack.pending_space_dict.values()]:
+            self.share(init_state)
+        levelpack = copy.copy(levelpack)
+        levelpack.profiler = None
+        levelpack.snapshot_sources = {}
+        levelpack.snapshot_versions = {}
+        buffer = io.BytesIO()
+        pickler = SpillPickler(buffer, self.shared_dict, self.shared_token_dict)
+        pickler.dump(levelpack)
+        for token in pickler.token_set:
+            self.shared_count_dict[token] += 1
+        for token in [t for t, c in self.shared_count_dict.items() if c == 0]:
+            del self.shared_count_dict[token]
+            del self.shared_token_dict[id(self.shared_dict.pop(token))]
+        data = zlib.compress(buffer.getvalue())
+        if self.spill_file is None:
+            self.spill_file = tempfile.TemporaryFile(prefix="bmp-history-")
+        self.spill_file.seek(0, io.SEEK_END)
+        self.spill_list.append((self.spill_file.tell(), len(data), frozenset(pickler.token_set)))
+        self.spill_file.write(data)
+        self.levelpack_list[index] = None
+    def load(self, index: int) -> bmp.levelpack.Levelpack:
+        if self.spill_file is None:
+            raise ValueError(index)
+        offset, length, _ = self.spill_list[index]
+        self.spill_file.seek(offset)
+        data = zlib.decompress(self.spill_file.read(length))
+        return SpillUnpickler(io.BytesIO(data), self.shared_dict).load()
+    def unspill(self) -> None:
+        if len(self.spill_list) == 0 or self.spill_file is None:
+            return
+        index = len(self.spill_list) - 1
+        if self.levelpack_list[index] is None:
+            self.levelpack_list[index] = self.load(index)
+        entry = self.spill_list.pop()
+        self.release(entry)
+        self.spill_file.truncate(entry[0])
@@ -31,6 +31,23 @@ type LevelJson = LevelJson41
 max_move_count: int = 120
 infinite_move_number: int = 6
 MoveInfo = tuple[bmp.obj.Object, list[tuple[bmp.ref.SpaceID, bmp.loc.Coord[int], bmp.loc.Orient]]]
+type SpaceSurfaceKey = tuple[bmp.ref.SpaceID, int, int, int, Optional[float]]
+type SpaceFrameKey = tuple[bmp.ref.SpaceID, int, bmp.loc.Coord[int], bool]
+type SpaceLayerKey = tuple[bmp.ref.SpaceID, int, bmp.loc.Coord[int], bool, int]
+
+class SpaceRenderCache(object):
+    def __init__(self) -> None:
+        self.version: Optional[int] = None
+        self.frame_dict: dict[SpaceFrameKey, pygame.Surface] = {}
+        self.layer_dict: dict[SpaceLayerKey, pygame.Surface] = {}
+    def refresh(self, version: int) -> None:
+        if self.version != version:
+            self.clear()
+            self.version = version
+    def clear(self) -> None:
+        self.version = None
+        self.frame_dict.clear()
+        self.layer_dict.clear()
 
 class Level(object):
     def __init__(
@@ -56,8 +73,14 @@ class Level(object):
         self.all_list: list[type[bmp.obj.Object]] = []
         self.group_references: dict[type[bmp.obj.GroupNoun], bmp.obj.PropertyStorage] = {p: bmp.obj.PropertyStorage() for p in bmp.obj.group_noun_types}
         self.sound_events: list[str] = []
+        self.level_version: int = bmp.space.next_version()
     def __eq__(self, level: "Level") -> bool:
         return self.level_id == level.level_id
+    def touch(self) -> None:
+        self.level_version = bmp.space.next_version()
+    @property
+    def version(self) -> int:
+        return max([self.level_version, *(s.version for s in self.space_list)])
     def get_space(self, space_id: Optional[bmp.ref.SpaceID]) -> Optional[bmp.space.Space]:
         return None if space_id is None else self.space_dict.get(space_id)
     def get_exact_space(self, space_id: bmp.ref.SpaceID) -> bmp.space.Space:
@@ -68,9 +91,11 @@ class Level(object):
     @current_space.setter
     def current_space(self, space: bmp.space.Space) -> None:
         self.current_space_id = space.space_id
+        self.touch()
     def set_space(self, space: bmp.space.Space, space_id: Optional[bmp.ref.SpaceID] = None) -> None:
         _space_id: bmp.ref.SpaceID = space_id if space_id is not None else space.space_id
         self.space_dict[_space_id] = space
+        self.touch()
     @property
     def space_list(self) -> list[bmp.space.Space]:
         return [s for s in self.space_dict.values() if s.space_id in self.space_included]
@@ -78,6 +103,7 @@ class Level(object):
     def space_list(self, __space_list: list[bmp.space.Space]) -> None:
         self.space_dict.clear()
         self.space_dict.update({s.space_id: s for s in __space_list})
+        self.touch()
     def find_super_spaces(self, space_object_id: bmp.ref.SpaceID) -> list[tuple[bmp.space.Space, bmp.obj.SpaceObject]]:
         return_value: list[tuple[bmp.space.Space, bmp.obj.SpaceObject]] = []
         for super_space_id, super_space in self.space_dict.items():
@@ -103,29 +129,29 @@ class Level(object):
             move_dict.setdefault(obj, [])
             move_dict[obj].extend(new_info_list)
         return [(o, l) for o, l in move_dict.items()]
-    def move_objs_from_move_list(self, move_list: list[MoveInfo]) -> None:
+    def move_objs_from_move_list(self, move_list: list[MoveInfo]) -> bool:
         move_list = self.merge_move_list(move_list)
         for old_obj, new_info_list in move_list:
             new_info_list = bmp.base.remove_same_elements(new_info_list)
-            old_space: Optional[bmp.space.Space] = None
-            for space in self.space_list:
-                if old_obj in space.object_list:
-                    old_space = space
-            if old_space is None:
+            old_space: Optional[bmp.space.Space] = self.get_space(old_obj.located_space_id)
+            if old_space is None or old_space.space_id not in self.space_included:
                 continue # how did we get here?
             old_obj.move_number += 1
+            new_obj_list: list[tuple[bmp.obj.Object, bmp.space.Space, bmp.loc.Coord[int], bmp.loc.Orient]] = []
             for new_space_id, new_pos, new_direct in new_info_list:
                 new_space = self.get_space(new_space_id)
                 if new_space is None:
                     continue
-                new_obj = copy.deepcopy(old_obj)
-                new_obj.reset_uuid()
+                new_obj = old_obj if len(new_obj_list) == 0 else old_obj.clone()
+                new_obj_list.append((new_obj, new_space, new_pos, new_direct))
+            old_space.del_obj(old_obj)
+            for new_obj, new_space, new_pos, new_direct in new_obj_list:
                 new_obj.pos = new_pos
                 new_obj.orient = new_direct
                 new_space.new_obj(new_obj)
-            old_space.del_obj(old_obj)
         if len(move_list) != 0 and "move" not in self.sound_events:
             self.sound_events.append("move")
+        return len(move_list) != 0
     def meet_prefix_conditions(self, space: bmp.space.Space, obj: bmp.obj.Object, prefix_info_list: list[bmp.rule.PrefixInfo], is_meta: bool = False) -> bool:
         return_value = True
         for prefix_info in prefix_info_list:
@@ -243,7 +269,7 @@ class Level(object):
         return rule_list, rule_info
     def destroy_obj(self, space: bmp.space.Space, obj: bmp.obj.Object) -> None:
         space.del_obj(obj)
-        for new_noun_type, new_noun_count in obj.operator_properties[bmp.obj.TextHas].enabled_count().items(): # type: ignore
+        for new_noun_type, new_noun_count in obj.get_operator_properties(bmp.obj.TextHas).enabled_count().items(): # type: ignore
             new_noun_type: type[bmp.obj.Noun]
             if issubclass(new_noun_type, bmp.obj.RangedNoun):
                 continue
@@ -435,42 +461,44 @@ class Level(object):
             return [(obj, [(space.space_id, new_pos, direct)])]
         else:
             return None
-    def you(self, direct: Optional[bmp.loc.Orient]) -> bool:
+    def you(self, direct: Optional[bmp.loc.Orient]) -> tuple[bool, bool]:
         self.reset_move_numbers()
         if direct is None:
-            return False
+            return False, False
         pushing_game = False
+        changed = False
         finished = False
         for _ in range(max_move_count):
             if finished:
-                return pushing_game
+                return pushing_game, changed
             move_list = []
             finished = True
             for space in self.space_list:
-                you_objs = [o for o in space.object_list if o.move_number < o.properties.count(bmp.obj.TextYou)]
+                you_objs = [o for o in space.get_objs_from_prop(bmp.obj.TextYou) if o.move_number < o.properties.count(bmp.obj.TextYou)]
                 if len(you_objs) != 0:
                     finished = False
                 for obj in you_objs:
-                    obj.orient = direct
+                    changed |= space.set_obj_orient(obj, direct)
                     new_move_list = self.get_move_list(space, obj, obj.orient)
                     if new_move_list is not None:
                         move_list.extend(new_move_list)
                         obj.move_number += 1
                     else:
                         pushing_game = True
-            self.move_objs_from_move_list(move_list)
-        return pushing_game
-    def select(self, direct: Optional[bmp.loc.Orient]) -> Optional[list[bmp.ref.LevelID]]:
+            changed |= self.move_objs_from_move_list(move_list)
+        return pushing_game, changed
+    def select(self, direct: Optional[bmp.loc.Orient]) -> tuple[Optional[list[bmp.ref.LevelID]], bool]:
         if direct is None:
             level_list: list[bmp.ref.LevelID] = []
             for space in self.space_list:
-                select_objs = [o for o in space.object_list if o.properties.enabled(bmp.obj.TextSelect)]
+                select_objs = space.get_objs_from_prop(bmp.obj.TextSelect)
                 for select_obj in select_objs:
                     level_list.extend([o.level_id for o in space.object_list if o.pos == select_obj.pos and o.level_id is not None and o != select_obj])
-            return level_list
+            return level_list, False
         else:
+            changed = False
             for space in self.space_list:
-                select_objs = [o for o in space.object_list if o.properties.enabled(bmp.obj.TextSelect)]
+                select_objs = space.get_objs_from_prop(bmp.obj.TextSelect)
                 for select_obj in select_objs:
                     new_pos = bmp.loc.front_position(select_obj.pos, direct)
                     if not space.out_of_range(new_pos):
@@ -478,51 +506,75 @@ class Level(object):
                         path_objs = space.get_objs_from_pos_and_type(new_pos, bmp.obj.Path)
                         if any(map(lambda p: p.unlocked, path_objs)) or len(level_objs) != 0:
                             space.set_obj_pos(select_obj, new_pos)
-        return None
-    def direction(self) -> None:
+                            changed = True
+        return None, changed
+    def direction(self) -> bool:
+        changed = False
         for prop in bmp.obj.direct_fix_properties:
             for space in self.space_list:
-                for obj in space.object_list:
-                    if obj.properties.enabled(prop):
-                        if isinstance(obj, bmp.obj.SpaceObject):
-                            obj.space_extra["static_transform"] = prop.ref_transform.copy()
-                        obj.orient = prop.ref_direct
-                if space.properties[bmp.obj.default_space_object_type].enabled(prop):
+                for obj in space.get_objs_from_prop(prop):
+                    if isinstance(obj, bmp.obj.SpaceObject) and obj.space_extra["static_transform"] != prop.ref_transform:
+                        changed = True
+                        obj.space_extra["static_transform"] = prop.ref_transform.copy()
+                        space.touch()
+                    changed |= space.set_obj_orient(obj, prop.ref_direct)
+                if space.properties[bmp.obj.default_space_object_type].enabled(prop) and space.static_transform != prop.ref_transform:
+                    changed = True
                     space.static_transform = prop.ref_transform.copy()
+                    space.touch()
             if self.properties[bmp.obj.default_level_object_type].enabled(prop):
                 pass # NotImplemented
-    def flip(self) -> None:
+        return changed
+    def flip(self) -> bool:
+        changed = False
         for space in self.space_list:
-            space.dynamic_transform = bmp.loc.default_space_transform.copy()
+            if space.dynamic_transform != bmp.loc.default_space_transform:
+                changed = True
+                space.dynamic_transform = bmp.loc.default_space_transform.copy()
+                space.touch()
             for obj in space.get_spaces():
-                obj.space_extra["dynamic_transform"] = bmp.loc.default_space_transform.copy()
+                if obj.space_extra["dynamic_transform"] != bmp.loc.default_space_transform:
+                    changed = True
+                    obj.space_extra["dynamic_transform"] = bmp.loc.default_space_transform.copy()
+                    space.touch()
         for prop in bmp.obj.direct_mapping_properties:
             for space in self.space_list:
                 for obj in space.object_list:
                     if obj.properties.count(prop) % 2 == 1:
+                        changed = True
                         if isinstance(obj, bmp.obj.SpaceObject):
                             obj.space_extra["dynamic_transform"] = bmp.loc.get_stacked_transform(obj.space_extra["dynamic_transform"], prop.ref_transform)
                         obj.set_direct_mapping(prop.ref_mapping)
+                        space.touch()
                 if space.properties[bmp.obj.default_space_object_type].count(prop) % 2 == 1:
+                    changed = True
                     space.dynamic_transform = bmp.loc.get_stacked_transform(space.dynamic_transform, prop.ref_transform)
+                    space.touch()
             if self.properties[bmp.obj.default_level_object_type].count(prop) % 2 == 1:
                 pass # NotImplemented
-    def turn(self) -> None:
+        return changed
+    def turn(self) -> bool:
+        changed = False
         for space in self.space_list:
             for obj in space.object_list:
                 turn_count = (obj.properties.count(bmp.obj.TextTurn) - obj.properties.count(bmp.obj.TextDeturn)) % 4
+                changed |= turn_count != 0
                 for _ in range(turn_count):
-                    obj.orient = bmp.loc.turn_right(obj.orient)
+                    space.set_obj_orient(obj, bmp.loc.turn_right(obj.orient))
                     if isinstance(obj, bmp.obj.SpaceObject):
                         obj.space_extra["static_transform"] = bmp.loc.get_stacked_transform(obj.space_extra["static_transform"], {"direct": "A", "flip": False})
             turn_count = (space.properties[bmp.obj.default_space_object_type].count(bmp.obj.TextTurn) - space.properties[bmp.obj.default_space_object_type].count(bmp.obj.TextDeturn)) % 4
+            changed |= turn_count != 0
             for _ in range(turn_count):
                 space.static_transform = bmp.loc.get_stacked_transform(space.static_transform, {"direct": "A", "flip": False})
+                space.touch()
         if self.properties[bmp.obj.default_level_object_type].count(bmp.obj.TextFlip) % 2 == 1:
             pass # NotImplemented
-    def move(self) -> bool:
+        return changed
+    def move(self) -> tuple[bool, bool]:
         self.reset_move_numbers()
         pushing_game = False
+        changed = False
         for space in self.space_list:
             global_move_count = space.properties[bmp.obj.default_space_object_type].count(bmp.obj.TextMove) + self.properties[bmp.obj.default_level_object_type].count(bmp.obj.TextMove)
             for _ in range(global_move_count):
@@ -535,16 +587,16 @@ class Level(object):
                             obj.move_number += 1
                         else:
                             pushing_game = True
-                self.move_objs_from_move_list(move_list)
+                changed |= self.move_objs_from_move_list(move_list)
         self.reset_move_numbers()
         finished = False
         for _ in range(max_move_count):
             if finished:
-                return pushing_game
+                return pushing_game, changed
             move_list = []
             finished = True
             for space in self.space_list:
-                move_objs = [o for o in space.object_list if o.move_number < o.properties.count(bmp.obj.TextMove)]
+                move_objs = [o for o in space.get_objs_from_prop(bmp.obj.TextMove) if o.move_number < o.properties.count(bmp.obj.TextMove)]
                 if len(move_objs) != 0:
                     finished = False
                 for obj in move_objs:
@@ -553,18 +605,19 @@ class Level(object):
                         move_list = new_move_list
                         obj.move_number += 1
                     else:
-                        obj.orient = bmp.loc.swap_direction(obj.orient)
+                        changed |= space.set_obj_orient(obj, bmp.loc.swap_direction(obj.orient))
                         new_move_list = self.get_move_list(space, obj, obj.orient)
                         if new_move_list is not None:
                             move_list = new_move_list
                             obj.move_number += 1
                         else:
                             pushing_game = True
-            self.move_objs_from_move_list(move_list)
-        return pushing_game
-    def shift(self) -> bool:
+            changed |= self.move_objs_from_move_list(move_list)
+        return pushing_game, changed
+    def shift(self) -> tuple[bool, bool]:
         self.reset_move_numbers()
         pushing_game = False
+        changed = False
         for space in self.space_list:
             global_shift_count = space.properties[bmp.obj.default_space_object_type].count(bmp.obj.TextShift) + self.properties[bmp.obj.default_level_object_type].count(bmp.obj.TextShift)
             for _ in range(global_shift_count):
@@ -577,12 +630,12 @@ class Level(object):
                             obj.move_number += 1
                         else:
                             pushing_game = True
-                self.move_objs_from_move_list(move_list)
+                changed |= self.move_objs_from_move_list(move_list)
         self.reset_move_numbers()
         finished = False
         for _ in range(max_move_count):
             if finished:
-                return pushing_game
+                return pushing_game, changed
             move_list = []
             finished = True
             for space in self.space_list:
@@ -597,9 +650,9 @@ class Level(object):
                             finished = False
                         else:
                             pushing_game = True
-            self.move_objs_from_move_list(move_list)
-        return pushing_game
-    def tele(self) -> None:
+            changed |= self.move_objs_from_move_list(move_list)
+        return pushing_game, changed
+    def tele(self) -> bool:
         if self.properties[bmp.obj.default_level_object_type].enabled(bmp.obj.TextTele):
             pass
         for space in self.space_list:
@@ -633,7 +686,8 @@ class Level(object):
             new_space.new_obj(obj)
         if len(tele_list) != 0:
             self.sound_events.append("tele")
-    def sink(self) -> None:
+        return len(tele_list) != 0
+    def sink(self) -> bool:
         success = False
         for space in self.space_list:
             delete_list = []
@@ -641,7 +695,7 @@ class Level(object):
                 for obj in space.object_list:
                     if not obj.properties.enabled(bmp.obj.TextFloat):
                         delete_list.append(obj)
-            sink_objs = [o for o in space.object_list if o.properties.enabled(bmp.obj.TextSink)]
+            sink_objs = space.get_objs_from_prop(bmp.obj.TextSink)
             for sink_obj in sink_objs:
                 for obj in space.get_objs_from_pos(sink_obj.pos):
                     if obj == sink_obj:
@@ -658,12 +712,13 @@ class Level(object):
                 success = True
         if success:
             self.sound_events.append("sink")
-    def hot_and_melt(self) -> None:
+        return success
+    def hot_and_melt(self) -> bool:
         success = False
         for space in self.space_list:
             delete_list = []
-            melt_objs = [o for o in space.object_list if o.properties.enabled(bmp.obj.TextMelt)]
-            hot_objs = [o for o in space.object_list if o.properties.enabled(bmp.obj.TextHot)]
+            melt_objs = space.get_objs_from_prop(bmp.obj.TextMelt)
+            hot_objs = space.get_objs_from_prop(bmp.obj.TextHot)
             if len(hot_objs) != 0 and (space.properties[bmp.obj.default_space_object_type].enabled(bmp.obj.TextMelt) or self.properties[bmp.obj.default_level_object_type].enabled(bmp.obj.TextMelt)):
                 for melt_obj in melt_objs:
                     if not melt_obj.properties.enabled(bmp.obj.TextFloat):
@@ -686,12 +741,13 @@ class Level(object):
                 success = True
         if success:
             self.sound_events.append("melt")
-    def defeat(self) -> None:
+        return success
+    def defeat(self) -> bool:
         success = False
         for space in self.space_list:
             delete_list = []
-            you_objs = [o for o in space.object_list if o.properties.enabled(bmp.obj.TextYou)]
-            defeat_objs = [o for o in space.object_list if o.properties.enabled(bmp.obj.TextDefeat)]
+            you_objs = space.get_objs_from_prop(bmp.obj.TextYou)
+            defeat_objs = space.get_objs_from_prop(bmp.obj.TextDefeat)
             if len(defeat_objs) != 0 and (space.properties[bmp.obj.default_space_object_type].enabled(bmp.obj.TextYou) or self.properties[bmp.obj.default_level_object_type].enabled(bmp.obj.TextYou)):
                 delete_list.extend(space.object_list)
                 continue
@@ -711,12 +767,13 @@ class Level(object):
                 success = True
         if success:
             self.sound_events.append("defeat")
+        return success
     def bonus(self) -> dict[type[bmp.obj.Object], bool]:
         collected: dict[type[bmp.obj.Object], bool] = {}
         for space in self.space_list:
             delete_list = []
-            bonus_objs = [o for o in space.object_list if o.properties.enabled(bmp.obj.TextBonus)]
-            you_objs = [o for o in space.object_list if o.properties.enabled(bmp.obj.TextYou)]
+            bonus_objs = space.get_objs_from_prop(bmp.obj.TextBonus)
+            you_objs = space.get_objs_from_prop(bmp.obj.TextYou)
             if len(you_objs) != 0 and (space.properties[bmp.obj.default_space_object_type].enabled(bmp.obj.TextBonus) or self.properties[bmp.obj.default_level_object_type].enabled(bmp.obj.TextBonus)):
                 delete_list.extend(space.object_list)
                 continue
@@ -736,12 +793,12 @@ class Level(object):
         if len(collected):
             self.sound_events.append("bonus")
         return collected
-    def open_and_shut(self) -> None:
+    def open_and_shut(self) -> bool:
         success = False
         for space in self.space_list:
             delete_list = []
-            shut_objs = [o for o in space.object_list if o.properties.enabled(bmp.obj.TextShut)]
-            open_objs = [o for o in space.object_list if o.properties.enabled(bmp.obj.TextOpen)]
+            shut_objs = space.get_objs_from_prop(bmp.obj.TextShut)
+            open_objs = space.get_objs_from_prop(bmp.obj.TextOpen)
             if len(open_objs) != 0 and (space.properties[bmp.obj.default_space_object_type].enabled(bmp.obj.TextShut) or self.properties[bmp.obj.default_level_object_type].enabled(bmp.obj.TextShut)):
                 delete_list.extend(space.object_list)
                 continue
@@ -762,10 +819,12 @@ class Level(object):
                 success = True
         if success:
             self.sound_events.append("open")
-    def make(self) -> None:
+        return success
+    def make(self) -> bool:
+        changed = False
         for space in self.space_list:
             for obj in space.object_list:
-                for make_noun_type, make_noun_count in obj.operator_properties[bmp.obj.TextMake].enabled_count().items(): # type: ignore
+                for make_noun_type, make_noun_count in obj.get_operator_properties(bmp.obj.TextMake).enabled_count().items(): # type: ignore
                     make_noun_type: type[bmp.obj.Noun]
                     if issubclass(make_noun_type, bmp.obj.RangedNoun):
                         continue
@@ -775,6 +834,7 @@ class Level(object):
                     if len(space.get_objs_from_pos_and_type(obj.pos, make_object_type)) != 0:
                         continue
                     for _ in range(make_noun_count):
+                        object_count = len(space.object_dict)
                         if issubclass(make_object_type, bmp.obj.Game):
                             if isinstance(obj, (bmp.obj.LevelObject, bmp.obj.SpaceObject)):
                                 space.new_obj(bmp.obj.Game(obj.pos, obj.orient, ref_type=bmp.obj.get_noun_from_type(type(obj))))
@@ -795,11 +855,14 @@ class Level(object):
                                     space.new_obj(make_object_type(obj.pos, obj.orient, space_id=space.space_id))
                         else:
                             space.new_obj(make_object_type(obj.pos, obj.orient, space_id=obj.space_id, level_id=obj.level_id))
-    def text_plus_and_text_minus(self) -> None:
+                        changed |= len(space.object_dict) != object_count
+        return changed
+    def text_plus_and_text_minus(self) -> bool:
+        changed = False
         for space in self.space_list:
             delete_list = []
-            text_plus_objs = [o for o in space.object_list if o.properties.enabled(bmp.obj.TextTextPlus)]
-            text_minus_objs = [o for o in space.object_list if o.properties.enabled(bmp.obj.TextTextMinus)]
+            text_plus_objs = space.get_objs_from_prop(bmp.obj.TextTextPlus)
+            text_minus_objs = space.get_objs_from_prop(bmp.obj.TextTextMinus)
             for text_plus_obj in text_plus_objs:
                 if text_plus_obj in text_minus_objs:
                     continue
@@ -833,7 +896,9 @@ class Level(object):
                     space.new_obj(new_type(text_minus_obj.pos, text_minus_obj.orient, space_id=text_minus_obj.space_id, level_id=text_minus_obj.level_id))
             for obj in delete_list:
                 self.destroy_obj(space, obj)
-    def game(self) -> None:
+            changed |= len(delete_list) != 0
+        return changed
+    def game(self) -> bool:
         for space in self.space_list:
             for game_obj in space.get_objs_from_type(bmp.obj.Game):
                 if bmp.base.current_os == bmp.base.windows:
@@ -843,12 +908,13 @@ class Level(object):
                         os.system(f"start /b python submp.py {game_obj.ref_type.json_name}")
                 elif bmp.base.current_os == bmp.base.linux:
                     os.system(f"python ./submp.py {game_obj.ref_type.json_name} &")
+        return False
     def win(self) -> bool:
         if self.properties[bmp.obj.default_level_object_type].enabled(bmp.obj.TextWin):
             return True
         for space in self.space_list:
-            you_objs = [o for o in space.object_list if o.properties.enabled(bmp.obj.TextYou)]
-            win_objs = [o for o in space.object_list if o.properties.enabled(bmp.obj.TextWin)]
+            you_objs = space.get_objs_from_prop(bmp.obj.TextYou)
+            win_objs = space.get_objs_from_prop(bmp.obj.TextWin)
             for you_obj in you_objs:
                 if you_obj in win_objs:
                     return True
@@ -864,8 +930,8 @@ class Level(object):
         if self.properties[bmp.obj.default_level_object_type].enabled(bmp.obj.TextEnd):
             return True
         for space in self.space_list:
-            you_objs = [o for o in space.object_list if o.properties.enabled(bmp.obj.TextYou)]
-            end_objs = [o for o in space.object_list if o.properties.enabled(bmp.obj.TextEnd)]
+            you_objs = space.get_objs_from_prop(bmp.obj.TextYou)
+            end_objs = space.get_objs_from_prop(bmp.obj.TextEnd)
             for you_obj in you_objs:
                 if you_obj in end_objs:
                     return True
@@ -877,30 +943,29 @@ class Level(object):
                         if bmp.obj.same_float_prop(you_obj, end_obj):
                             return True
         return False
-    def done(self) -> bool:
+    def done(self) -> tuple[bool, bool]:
+        changed = False
         for space in self.space_list:
             delete_list = []
             if self.properties[bmp.obj.default_level_object_type].enabled(bmp.obj.TextDone):
                 delete_list.extend(space.object_list)
             if space.properties[bmp.obj.default_space_object_type].enabled(bmp.obj.TextDone):
                 delete_list.extend(space.object_list)
-            for obj in space.object_list:
-                if obj.properties.enabled(bmp.obj.TextDone):
-                    delete_list.append(obj)
+            delete_list.extend(space.get_objs_from_prop(bmp.obj.TextDone))
             for obj in delete_list:
                 space.del_obj(obj)
             if len(delete_list) != 0 and "done" not in self.sound_events:
                 self.sound_events.append("done")
+            changed |= len(delete_list) != 0
         for space in self.space_list:
             for obj in [o for o in space.object_list if bmp.obj.TextAll().isreferenceof(o, all_list = self.all_list)]:
                 if not obj.properties.enabled(bmp.obj.TextDone):
-                    return False
-        return len(delete_list) > 0
+                    return False, changed
+        return len(delete_list) > 0, changed
     def have_you(self) -> bool:
         for space in self.space_list:
-            for obj in space.object_list:
-                if obj.properties.enabled(bmp.obj.TextYou):
-                    return True
+            if len(space.get_objs_from_prop(bmp.obj.TextYou)) != 0:
+                return True
         return False
     def recursion_get_object_surface_info(
         self,
@@ -965,52 +1030,69 @@ class Level(object):
                     )
                 ))
         return return_list
-    def space_to_surface(self, space: bmp.space.Space, wiggle: int, size: bmp.loc.Coord[int], depth: int = 0, smooth: Optional[float] = None, cursor: Optional[bmp.loc.Coord[int]] = None, debug: bool = False) -> pygame.Surface:
+    def object_to_surface(self, obj: bmp.obj.Object, wiggle: int, scaled_sprite_size: int, depth: int, smooth: Optional[float], debug: bool, space_surface_dict: dict[SpaceSurfaceKey, pygame.Surface]) -> pygame.Surface:
+        if isinstance(obj, bmp.obj.SpaceObject):
+            sub_space = self.get_space(obj.space_id)
+            if sub_space is not None:
+                space_surface_key: SpaceSurfaceKey = (sub_space.space_id, scaled_sprite_size, wiggle, depth + 1, smooth)
+                default_surface = space_surface_dict.get(space_surface_key)
+                if default_surface is None:
+                    default_surface = self.space_to_surface(sub_space, wiggle, (scaled_sprite_size, scaled_sprite_size), depth + 1, smooth, space_surface_dict=space_surface_dict)
+                    space_surface_dict[space_surface_key] = default_surface
+            else:
+                default_surface = None
+            obj_surface = bmp.render.simple_object_to_surface(obj, wiggle=wiggle, default_surface=default_surface, debug=debug)
+            transform = bmp.loc.get_stacked_transform(obj.space_extra["static_transform"], obj.space_extra["dynamic_transform"])
+            if transform["flip"]:
+                obj_surface = bmp.render.flip_surface(obj_surface)
+            match transform["direct"]:
+                case "W": obj_surface = bmp.render.rotate_surface(obj_surface, 180)
+                case "S": pass
+                case "A": obj_surface = bmp.render.rotate_surface(obj_surface, 270)
+                case "D": obj_surface = bmp.render.rotate_surface(obj_surface, 90)
+            return obj_surface
+        if self.game_properties.enabled(bmp.obj.TextWord):
+            object_type = type(obj)
+            for _ in range(self.game_properties.count(bmp.obj.TextWord)):
+                object_type = bmp.obj.get_noun_from_type(object_type)
+            return bmp.render.simple_type_to_surface(object_type, wiggle=wiggle, debug=debug)
+        return bmp.render.simple_object_to_surface(obj, wiggle=wiggle, debug=debug)
+    def blit_objects(self, space_surface: pygame.Surface, object_list: list[bmp.obj.Object], surface_rect_list: list[tuple[bmp.loc.Coord[float], bmp.loc.Coord[float]]], wiggle: int, scaled_sprite_size: int, depth: int, smooth: Optional[float], debug: bool, space_surface_dict: dict[SpaceSurfaceKey, pygame.Surface]) -> None:
+        for obj, (obj_surface_pos, obj_surface_size) in zip(object_list, surface_rect_list):
+            obj_surface = self.object_to_surface(obj, wiggle, scaled_sprite_size, depth, smooth, debug, space_surface_dict)
+            space_surface.blit(
+                bmp.render.scale_surface(
+                    obj_surface, (int(obj_surface_size[0] * scaled_sprite_size), int(obj_surface_size[1] * scaled_sprite_size))
+                ),
+                (int(obj_surface_pos[0] * scaled_sprite_size), int(obj_surface_pos[1] * scaled_sprite_size))
+            )
+    def space_to_surface(self, space: bmp.space.Space, wiggle: int, size: bmp.loc.Coord[int], depth: int = 0, smooth: Optional[float] = None, cursor: Optional[bmp.loc.Coord[int]] = None, debug: bool = False, space_surface_dict: Optional[dict[SpaceSurfaceKey, pygame.Surface]] = None, render_cache: Optional[SpaceRenderCache] = None) -> pygame.Surface:
+        if space_surface_dict is None:
+            space_surface_dict = {}
         pixel_size = math.ceil(max(size[0] / space.width, size[1] / space.height) / bmp.render.sprite_size)
         scaled_sprite_size = pixel_size * bmp.render.sprite_size
         if depth > bmp.opt.options["render"]["space_depth"] or space.properties[bmp.obj.default_space_object_type].enabled(bmp.obj.TextHide):
-            space_surface = pygame.Surface((scaled_sprite_size, scaled_sprite_size), pygame.SRCALPHA)
+            space_surface = bmp.render.make_surface((scaled_sprite_size, scaled_sprite_size))
             space_surface.fill(space.color if space.color is not None else bmp.color.current_palette[0, 4])
             space_surface = bmp.render.simple_object_to_surface(bmp.obj.SpaceObject((0, 0), space_id=space.space_id), default_surface=space_surface)
             return space_surface
+        frame_key: Optional[SpaceFrameKey] = None
+        if render_cache is not None:
+            render_cache.refresh(self.version)
+            if smooth is None and cursor is None:
+                frame_key = (space.space_id, wiggle, size, debug)
+                cached_surface = render_cache.frame_dict.get(frame_key)
+                if cached_surface is not None:
+                    return cached_surface
         space_surface_size = (space.width * scaled_sprite_size, space.height * scaled_sprite_size)
-        space_surface = pygame.Surface(space_surface_size, pygame.SRCALPHA)
         # get objects
-        object_list: list[bmp.obj.Object] = []
-        obj_surface_list: list[tuple[bmp.loc.Coord[float], bmp.loc.Coord[float], pygame.Surface, bmp.obj.Object]] = []
-        object_list.extend([o for o in space.object_list if bmp.render.valid(o) and (space.space_id, o) not in object_list])
-        for obj in object_list:
-            if not bmp.render.valid(obj):
-                continue
-            if obj.properties.enabled(bmp.obj.TextHide):
-                continue
-            obj_surface: pygame.Surface = bmp.render.simple_object_to_surface(obj, wiggle=wiggle, debug=debug)
-            if self.game_properties.enabled(bmp.obj.TextWord):
-                object_type = type(obj)
-                for _ in range(self.game_properties.count(bmp.obj.TextWord)):
-                    object_type = bmp.obj.get_noun_from_type(object_type)
-                obj_surface = bmp.render.simple_type_to_surface(object_type, wiggle=wiggle, debug=debug)
+        object_list: list[bmp.obj.Object] = [o for o in space.object_list if bmp.render.valid(o) and not o.properties.enabled(bmp.obj.TextHide)]
+        object_list.sort(key=lambda o: [f(o) for f in bmp.render.order].index(True), reverse=True)
+        surface_rect_list: list[tuple[bmp.loc.Coord[float], bmp.loc.Coord[float]]] = []
+        static_count = len(object_list)
+        for index, obj in enumerate(object_list):
             obj_surface_pos: bmp.loc.Coord[float] = (float(obj.x), float(obj.y))
             obj_surface_size: bmp.loc.Coord[float] = (1.0, 1.0)
-            if isinstance(obj, bmp.obj.SpaceObject):
-                sub_space = self.get_space(obj.space_id)
-                if sub_space is not None:
-                    default_surface = self.space_to_surface(sub_space, wiggle, (scaled_sprite_size, scaled_sprite_size), depth + 1, smooth)
-                else:
-                    default_surface = None
-                obj_surface = bmp.render.simple_object_to_surface(obj, wiggle=wiggle, default_surface=default_surface, debug=debug)
-                transform = bmp.loc.get_stacked_transform(obj.space_extra["static_transform"], obj.space_extra["dynamic_transform"])
-                if transform["flip"]:
-                    obj_surface = pygame.transform.flip(obj_surface, flip_x=True, flip_y=False)
-                match transform["direct"]:
-                    case "W": obj_surface = pygame.transform.rotate(obj_surface, 180)
-                    case "S": pass
-                    case "A": obj_surface = pygame.transform.rotate(obj_surface, 270)
-                    case "D": obj_surface = pygame.transform.rotate(obj_surface, 90)
-            obj_surface_list.append((obj_surface_pos, obj_surface_size, obj_surface, obj))
-        # blit objects
-        obj_surface_list.sort(key=lambda o: [f(o[-1]) for f in bmp.render.order].index(True), reverse=True)
-        for obj_surface_pos, obj_surface_size, obj_surface, obj in obj_surface_list:
             if obj.old_state.new_surface_pos is None:
                 obj.old_state.new_surface_pos = obj_surface_pos
             if obj.old_state.new_surface_size is None:
@@ -1020,41 +1102,58 @@ class Level(object):
                     obj_surface_pos = bmp.render.calc_smooth_coord(obj.old_state.old_surface_pos, smooth, obj_surface_pos)
                 if obj.old_state.old_surface_size is not None:
                     obj_surface_size = bmp.render.calc_smooth_coord(obj.old_state.old_surface_size, smooth, obj_surface_size)
-            space_surface.blit(
-                pygame.transform.scale(
-                    obj_surface, (int(obj_surface_size[0] * scaled_sprite_size), int(obj_surface_size[1] * scaled_sprite_size))
-                ),
-                (int(obj_surface_pos[0] * scaled_sprite_size), int(obj_surface_pos[1] * scaled_sprite_size))
-            )
+            if smooth is not None and static_count == len(object_list):
+                if obj_surface_pos != (float(obj.x), float(obj.y)) or obj_surface_size != (1.0, 1.0):
+                    static_count = index
+                elif isinstance(obj, bmp.obj.SpaceObject) and self.get_space(obj.space_id) is not None:
+                    static_count = index
+            surface_rect_list.append((obj_surface_pos, obj_surface_size))
+        # blit objects
+        space_surface: Optional[pygame.Surface] = None
+        if render_cache is not None:
+            layer_key: SpaceLayerKey = (space.space_id, wiggle, size, debug, static_count)
+            space_surface = render_cache.layer_dict.get(layer_key)
+            if space_surface is None:
+                space_surface = bmp.render.make_surface(space_surface_size)
+                self.blit_objects(space_surface, object_list[:static_count], surface_rect_list[:static_count], wiggle, scaled_sprite_size, depth, smooth, debug, space_surface_dict)
+                render_cache.layer_dict[layer_key] = space_surface
+            if static_count != len(object_list) or cursor is not None:
+                space_surface = bmp.render.copy_surface(space_surface)
+        else:
+            space_surface = bmp.render.make_surface(space_surface_size)
+            static_count = 0
+        self.blit_objects(space_surface, object_list[static_count:], surface_rect_list[static_count:], wiggle, scaled_sprite_size, depth, smooth, debug, space_surface_dict)
         # cursor
         if cursor is not None:
-            surface = bmp.render.current_sprites.get("cursor", 0, wiggle, raw=True).copy()
+            surface = bmp.render.current_sprites.get("cursor", 0, wiggle, raw=True)
             pos = (cursor[0] * scaled_sprite_size - (surface.get_width() - bmp.render.sprite_size) * pixel_size // 2,
                    cursor[1] * scaled_sprite_size - (surface.get_height() - bmp.render.sprite_size) * pixel_size // 2)
-            space_surface.blit(pygame.transform.scale(surface, (pixel_size * surface.get_width(), pixel_size * surface.get_height())), pos)
+            space_surface.blit(bmp.render.scale_surface(surface, (pixel_size * surface.get_width(), pixel_size * surface.get_height())), pos)
         # background
-        space_background = pygame.Surface(space_surface.get_size(), pygame.SRCALPHA)
+        space_background = bmp.render.make_surface(space_surface.get_size())
         space_background.fill(pygame.Color(*bmp.color.hex_to_rgb(space.color if space.color is not None else bmp.color.current_palette[0, 4])))
         space_background.blit(space_surface, (0, 0))
         space_surface = space_background
         if space.space_id.infinite_tier != 0 and depth == 0:
             infinite_text_surface = bmp.render.current_sprites.get("text_infinity" if space.space_id.infinite_tier > 0 else "text_epsilon", 0, wiggle, raw=True)
-            infinite_tier_surface = pygame.Surface((infinite_text_surface.get_width(), infinite_text_surface.get_height() * abs(space.space_id.infinite_tier)), pygame.SRCALPHA)
+            infinite_tier_surface = bmp.render.make_surface((infinite_text_surface.get_width(), infinite_text_surface.get_height() * abs(space.space_id.infinite_tier)))
             infinite_tier_surface.fill("#00000000")
             for i in range(abs(space.space_id.infinite_tier)):
                 infinite_tier_surface.blit(infinite_text_surface, (0, i * infinite_text_surface.get_height()))
             infinite_tier_surface = bmp.render.set_alpha(infinite_tier_surface, 0x80 if depth > 0 else 0x40)
-            infinite_tier_surface = pygame.transform.scale_by(infinite_tier_surface, space.height * pixel_size / abs(space.space_id.infinite_tier))
+            infinite_tier_surface = bmp.render.scale_surface_by(infinite_tier_surface, space.height * pixel_size / abs(space.space_id.infinite_tier))
             space_surface.blit(infinite_tier_surface, ((space_surface.get_width() - infinite_tier_surface.get_width()) // 2, 0))
         # transform
         transform = bmp.loc.get_stacked_transform(space.static_transform, space.dynamic_transform)
         if transform["flip"]:
-            space_surface = pygame.transform.flip(space_surface, flip_x=True, flip_y=False)
+            space_surface = bmp.render.flip_surface(space_surface)
         match transform["direct"]:
-            case "W": space_surface = pygame.transform.rotate(space_surface, 180)
+            case "W": space_surface = bmp.render.rotate_surface(space_surface, 180)
             case "S": pass
-            case "A": space_surface = pygame.transform.rotate(space_surface, 270)
-            case "D": space_surface = pygame.transform.rotate(space_surface, 90)
+            case "A": space_surface = bmp.render.rotate_surface(space_surface, 270)
+            case "D": space_surface = bmp.render.rotate_surface(space_surface, 90)
+        if render_cache is not None and frame_key is not None:
+            render_cache.frame_dict[frame_key] = space_surface
         return space_surface
     def to_json(self) -> LevelJson:
         json_object: LevelJson = {
@@ -1,11 +1,15 @@
-from typing import Optional, TypeGuard, TypedDict, NotRequired
+from typing import Iterable, Iterator, Optional, TypeGuard, TypedDict, NotRequired
+import contextlib
 import copy
+import time
+import weakref
 from tqdm import tqdm
 
 import bmp.base
 import bmp.level
 import bmp.loc
 import bmp.obj
+import bmp.perf
 import bmp.ref
 import bmp.rule
 import bmp.space
@@ -53,6 +57,13 @@ class LevelpackJson4102(TypedDict):
 
 type LevelpackJson = LevelpackJson4102
 
+type SpaceRuleFingerprint = tuple[bmp.ref.SpaceID, bmp.rule.RuleFingerprint, tuple[Optional[bmp.ref.SpaceID], ...]]
+type LevelRuleFingerprint = tuple[bmp.rule.RuleFingerprint, tuple[SpaceRuleFingerprint, ...]]
+type SpaceRuleState = tuple[bmp.ref.SpaceID, int]
+type RuleState = tuple[bmp.ref.LevelID, bmp.rule.RuleFingerprint, tuple[type[bmp.obj.Object], ...], tuple[SpaceRuleState, ...], tuple[SpaceRuleState, ...]]
+
+volatile_text_types: tuple[type[bmp.obj.Text], ...] = (bmp.obj.TextOften, bmp.obj.TextSeldom, bmp.obj.TextFeeling)
+
 class Levelpack(object):
     def __init__(
         self,
@@ -61,48 +72,201 @@ class Levelpack(object):
         current_level_id: bmp.ref.LevelID,
         name: Optional[str] = None,
         author: Optional[str] = None,
-        level_init_state_dict: Optional[dict[bmp.ref.LevelID, bmp.level.Level]] = None,
-        space_init_state_dict: Optional[dict[bmp.ref.SpaceID, bmp.space.Space]] = None,
+        level_init_state_dict: Optional[dict[bmp.ref.LevelID, bmp.level.LevelJson]] = None,
+        space_init_state_dict: Optional[dict[bmp.ref.SpaceID, bmp.space.PendingSpace]] = None,
         collectibles: Optional[set[bmp.obj.Collectible]] = None,
         rule_list: Optional[list[bmp.rule.Rule]] = None,
+        pending_space_dict: Optional[dict[bmp.ref.SpaceID, bmp.space.PendingSpace]] = None,
     ) -> None:
         self.name: Optional[str] = name
         self.author: Optional[str] = author
         self.level_dict: dict[bmp.ref.LevelID, bmp.level.Level] = level_dict
         self.space_dict: dict[bmp.ref.SpaceID, bmp.space.Space] = space_dict
-        self.level_init_state_dict: dict[bmp.ref.LevelID, bmp.level.Level] = copy.deepcopy(self.level_dict)
+        for level in self.level_dict.values():
+            level.space_dict = space_dict
+        self.pending_space_dict: dict[bmp.ref.SpaceID, bmp.space.PendingSpace] = pending_space_dict if pending_space_dict is not None else {}
+        self.level_init_state_dict: dict[bmp.ref.LevelID, bmp.level.LevelJson] = {k: v.to_json() for k, v in self.level_dict.items()}
         if level_init_state_dict is not None:
             self.level_init_state_dict.update(level_init_state_dict)
-        self.space_init_state_dict: dict[bmp.ref.SpaceID, bmp.space.Space] = copy.deepcopy(self.space_dict)
+        self.space_init_state_dict: dict[bmp.ref.SpaceID, bmp.space.PendingSpace] = {k: v.to_json() for k, v in self.space_dict.items()}
+        self.space_init_state_dict.update(self.pending_space_dict)
         if space_init_state_dict is not None:
             self.space_init_state_dict.update(space_init_state_dict)
-        for level in self.level_dict.values():
-            level.space_dict = space_dict
-        for level in self.level_init_state_dict.values():
-            level.space_dict = space_dict
-        self.current_level_id: bmp.ref.LevelID = current_level_id
+        self.space_order: dict[bmp.ref.SpaceID, int] = {k: i for i, k in enumerate([*self.space_dict.keys(), *self.pending_space_dict.keys()])}
+        self.space_name_dict: dict[str, list[bmp.ref.SpaceID]] = {}
+        self.space_link_dict: dict[str, set[str]] = {}
+        self.level_link_dict: dict[str, set[str]] = {}
+        self.index_pending_spaces()
+        self.shared_space_dict: dict[bmp.ref.SpaceID, bmp.space.Space] = {}
+        self.current_level_id = current_level_id
         self.collectibles: set[bmp.obj.Collectible] = collectibles if collectibles is not None else set()
         self.rule_list: list[bmp.rule.Rule] = rule_list if (rule_list is not None and len(rule_list) != 0) else bmp.rule.default_rule_list
+        self.profiler: Optional[bmp.perf.TickProfiler] = None
+        self.snapshot_sources: dict[bmp.ref.SpaceID, weakref.ref[bmp.space.Space]] = {}
+        self.snapshot_versions: dict[bmp.ref.SpaceID, int] = {}
+        self.rule_fingerprint: Optional[LevelRuleFingerprint] = None
+        self.global_rule_info_list: list[bmp.rule.RuleInfo] = []
+        self.outer_rule_info_dict: dict[bmp.ref.SpaceID, list[bmp.rule.RuleInfo]] = {}
+        self.rule_volatile: bool = False
+        self.rule_state: Optional[RuleState] = None
+        self.levelpack_version: int = bmp.space.next_version()
+    def touch(self) -> None:
+        self.levelpack_version = bmp.space.next_version()
+    @property
+    def version(self) -> int:
+        return max([self.levelpack_version, *(l.level_version for l in self.level_dict.values()), *(s.version for s in self.space_dict.values())])
+    @property
+    def current_level_id(self) -> bmp.ref.LevelID:
+        return self._current_level_id
+    @current_level_id.setter
+    def current_level_id(self, level_id: bmp.ref.LevelID) -> None:
+        self._current_level_id = level_id
+        self.materialize_level(level_id)
+        self.unshare_active_spaces()
+        self.touch()
+    def index_pending_spaces(self) -> None:
+        for space_id, pending_space in self.pending_space_dict.items():
+            space_name: str = space_id.name
+            self.space_name_dict.setdefault(space_name, []).append(space_id)
+            if isinstance(pending_space, bmp.space.PackedSpace):
+                linked_space_names, linked_level_names = pending_space.get_linked_names()
+            else:
+                linked_space_names = {o["space_id"]["name"] for o in pending_space["objects"] if o.get("space_id") is not None}
+                linked_level_names = {o["level_id"]["name"] for o in pending_space["objects"] if o.get("level_id") is not None}
+            for linked_name in linked_space_names:
+                self.space_link_dict.setdefault(space_name, set()).add(linked_name)
+                self.space_link_dict.setdefault(linked_name, set()).add(space_name)
+            for linked_name in linked_level_names:
+                self.level_link_dict.setdefault(linked_name, set()).add(space_name)
+    def materialize_spaces(self, space_names: Iterable[str]) -> None:
+        if len(self.pending_space_dict) == 0:
+            return
+        name_list: list[str] = list(space_names)
+        visited_names: set[str] = set(name_list)
+        materialized: bool = False
+        while len(name_list) != 0:
+            space_name = name_list.pop()
+            for space_id in self.space_name_dict.get(space_name, []):
+                pending_space = self.pending_space_dict.pop(space_id, None)
+                if pending_space is None:
+                    continue
+                space = bmp.space.pending_to_space(pending_space)
+                space.set_sprite_states(0)
+                self.space_dict[space_id] = space
+                materialized = True
+            for linked_name in self.space_link_dict.get(space_name, set()):
+                if linked_name not in visited_names:
+                    visited_names.add(linked_name)
+                    name_list.append(linked_name)
+        if materialized:
+            space_list = sorted(self.space_dict.items(), key=lambda i: self.space_order.get(i[0], len(self.space_order)))
+            self.space_dict.clear()
+            self.space_dict.update(space_list)
+            self.touch()
+    def materialize_level(self, level_id: bmp.ref.LevelID) -> None:
+        if len(self.pending_space_dict) == 0:
+            return
+        space_names: set[str] = set(self.level_link_dict.get(level_id.name, set()))
+        level = self.level_dict.get(level_id)
+        if level is not None:
+            space_names.update(s.name for s in level.space_included)
+            space_names.add(level.current_space_id.name)
+        self.materialize_spaces(space_names)
+    def materialize_all(self) -> None:
+        self.materialize_spaces(self.space_name_dict.keys())
     def get_exact_level(self, level_id: bmp.ref.LevelID) -> bmp.level.Level:
+        self.materialize_level(level_id)
         return self.level_dict[level_id]
     def get_level(self, level_id: Optional[bmp.ref.LevelID]) -> Optional[bmp.level.Level]:
-        return None if level_id is None else self.level_dict.get(level_id)
+        if level_id is None:
+            return None
+        self.materialize_level(level_id)
+        return self.level_dict.get(level_id)
     def set_level(self, level_id: bmp.ref.LevelID, level: bmp.level.Level) -> None:
         level.space_dict = self.space_dict
         self.level_dict[level_id] = level
+        self.touch()
     def set_level_init_state(self, level_id: bmp.ref.LevelID, level: bmp.level.Level) -> None:
-        self.level_init_state_dict[level_id] = level
+        self.level_init_state_dict[level_id] = level.to_json()
     def reset_level(self, level_id: bmp.ref.LevelID) -> None:
         old_level = self.level_dict.get(level_id)
         if old_level is not None:
             for space_id in old_level.space_included:
-                self.space_dict[space_id] = copy.deepcopy(self.space_init_state_dict[space_id])
-            level = copy.deepcopy(self.level_init_state_dict[level_id])
+                self.pending_space_dict.pop(space_id, None)
+                self.space_dict[space_id] = bmp.space.pending_to_space(self.space_init_state_dict[space_id])
+            level = bmp.level.json_to_level(self.level_init_state_dict[level_id])
             level.space_dict = self.space_dict
             self.level_dict[level_id] = level
+            self.touch()
+    def get_active_space_ids(self) -> set[bmp.ref.SpaceID]:
+        space_ids: set[bmp.ref.SpaceID] = set(self.current_level.space_included)
+        space_ids.add(self.current_level.current_space_id)
+        for space_id, space in self.space_dict.items():
+            if any(o.level_id == self.current_level_id for o in space.get_levels()):
+                space_ids.add(space_id)
+        changed = True
+        while changed:
+            changed = False
+            for space_id, space in self.space_dict.items():
+                for space_obj in space.get_spaces():
+                    if space_obj.space_id is None:
+                        continue
+                    if space_id in space_ids and space_obj.space_id not in space_ids:
+                        space_ids.add(space_obj.space_id)
+                        changed = True
+                    elif space_obj.space_id in space_ids and space_id not in space_ids:
+                        space_ids.add(space_id)
+                        changed = True
+        return space_ids
+    def unshare_active_spaces(self) -> None:
+        if len(self.shared_space_dict) == 0:
+            return
+        for space_id in self.get_active_space_ids():
+            self.unshare_space(space_id)
+    def unshare_space(self, space_id: bmp.ref.SpaceID) -> None:
+        space = self.shared_space_dict.pop(space_id, None)
+        if space is not None and self.space_dict.get(space_id) is space:
+            self.space_dict[space_id] = copy.deepcopy(space)
+    def snapshot(self, base: Optional["Levelpack"] = None) -> "Levelpack":
+        space_dict: dict[bmp.ref.SpaceID, bmp.space.Space] = {}
+        for space_id, space in self.space_dict.items():
+            if self.shared_space_dict.get(space_id) is space:
+                space_dict[space_id] = space
+                continue
+            if base is not None and space_id in base.space_dict.keys() and base.snapshot_versions.get(space_id) == space.version:
+                source = base.snapshot_sources.get(space_id)
+                if source is not None and source() is space:
+                    space_dict[space_id] = base.space_dict[space_id]
+                    continue
+            space_dict[space_id] = copy.deepcopy(space)
+        levelpack = copy.copy(self)
+        levelpack.space_dict = space_dict
+        levelpack.level_dict = {k: copy.deepcopy(v, {id(self.space_dict): space_dict}) for k, v in self.level_dict.items()}
+        levelpack.level_init_state_dict = self.level_init_state_dict.copy()
+        levelpack.space_init_state_dict = self.space_init_state_dict.copy()
+        levelpack.pending_space_dict = self.pending_space_dict.copy()
+        levelpack.collectibles = self.collectibles.copy()
+        levelpack.rule_fingerprint = None
+        levelpack.global_rule_info_list = []
+        levelpack.outer_rule_info_dict = {}
+        levelpack.rule_state = None
+        levelpack.snapshot_sources = {k: weakref.ref(v) for k, v in self.space_dict.items()}
+        levelpack.snapshot_versions = {k: v.version for k, v in self.space_dict.items()}
+        levelpack.shared_space_dict = space_dict.copy()
+        return levelpack
+    def restore(self) -> "Levelpack":
+        levelpack = self.snapshot()
+        levelpack.unshare_active_spaces()
+        self.snapshot_sources = {k: weakref.ref(v) for k, v in levelpack.space_dict.items()}
+        self.snapshot_versions = {k: v.version for k, v in levelpack.space_dict.items()}
+        return levelpack
+    def get_space_list(self) -> list[bmp.space.Space | bmp.space.PendingSpace]:
+        space_list: list[tuple[bmp.ref.SpaceID, bmp.space.Space | bmp.space.PendingSpace]] = [*self.space_dict.items(), *self.pending_space_dict.items()]
+        return [v for _, v in sorted(space_list, key=lambda i: self.space_order.get(i[0], len(self.space_order)))]
     def del_level(self, level_id: bmp.ref.LevelID) -> None:
         self.level_dict.pop(level_id)
         self.level_init_state_dict.pop(level_id)
+        self.touch()
     @property
     def level_list(self) -> list[bmp.level.Level]:
         return list(self.level_dict.values())
@@ -112,13 +276,64 @@ class Levelpack(object):
         self.level_dict.update({l.level_id: l for l in __level_list})
         for level in self.level_dict.values():
             level.space_dict = self.space_dict
+        self.touch()
     @property
     def current_level(self) -> bmp.level.Level:
         return self.level_dict[self.current_level_id]
     @current_level.setter
     def current_level(self, level: bmp.level.Level) -> None:
         self.current_level_id = level.level_id
+    def get_rule_fingerprint(self) -> LevelRuleFingerprint:
+        return (
+            bmp.rule.get_rule_fingerprint(self.rule_list),
+            tuple((s.space_id, s.rule_fingerprint, tuple(o.space_id for o in s.get_spaces())) for s in self.current_level.space_list),
+        )
+    def compile_rules(self) -> None:
+        rule_fingerprint = self.get_rule_fingerprint()
+        if rule_fingerprint == self.rule_fingerprint:
+            return
+        self.rule_fingerprint = rule_fingerprint
+        self.rule_volatile = any(
+            issubclass(t, volatile_text_types)
+            for f in (rule_fingerprint[0], *(s[1] for s in rule_fingerprint[1]))
+            for r in f for t in r
+        )
+        self.global_rule_info_list = [bmp.rule.get_info_from_rule(r) for r in self.rule_list]
+        self.outer_rule_info_dict = {}
+    def get_outer_rule_info(self, space: bmp.space.Space) -> list[bmp.rule.RuleInfo]:
+        rule_info = self.outer_rule_info_dict.get(space.space_id)
+        if rule_info is None:
+            rule_info = self.current_level.recursion_rules(space)[1]
+            self.outer_rule_info_dict[space.space_id] = rule_info
+        return rule_info
+    def get_rule_state(self) -> RuleState:
+        level_id = self.current_level_id
+        return (
+            level_id,
+            bmp.rule.get_rule_fingerprint(self.rule_list),
+            tuple(self.current_level.all_list),
+            tuple((s.space_id, s.object_version) for s in self.current_level.space_list),
+            tuple((k, s.object_version) for k, s in self.space_dict.items() if any(o.level_id == level_id for o in s.get_levels())),
+        )
+    def update_rules_if_changed(self, changed: bool) -> None:
+        if changed or self.rule_volatile:
+            with self.profile("update_rules"):
+                self.update_rules()
+        elif self.profiler is not None:
+            self.profiler.count("update_rules_skipped")
+    def get_property_counts(self) -> list[dict[type[bmp.obj.Text], int]]:
+        storage_list: list[bmp.obj.PropertyStorage] = [
+            self.current_level.game_properties,
+            *(self.current_level.properties[t] for t in bmp.obj.level_object_types),
+            *(s.properties[t] for s in self.current_level.space_list for t in bmp.obj.space_object_types),
+        ]
+        return [c for p in storage_list for c in (p.enabled_count(), p.disabled_count())]
     def update_rules(self) -> None:
+        if self.rule_state is not None and self.get_rule_state() == self.rule_state:
+            if self.profiler is not None:
+                self.profiler.count("update_rules_skipped")
+            return
+        property_counts = self.get_property_counts()
         self.current_level.game_properties.clear()
         for level_object_type in bmp.obj.level_object_types:
             self.current_level.properties[level_object_type].clear()
@@ -130,7 +345,7 @@ class Levelpack(object):
                 space.special_operator_properties[object_type] = {o: bmp.obj.PropertyStorage() for o in bmp.obj.special_operators}
             for obj in space.object_list:
                 obj.properties.clear()
-                obj.operator_properties = {o: bmp.obj.PropertyStorage() for o in bmp.obj.special_operators}
+                obj.operator_properties = None
             if space != self.current_level.current_space:
                 active_space_objs.extend(o for o in space.get_spaces())
         for space_obj in active_space_objs:
@@ -147,11 +362,11 @@ class Levelpack(object):
             level_obj.properties.clear()
         for space in self.current_level.space_list:
             space.set_rule()
+        self.compile_rules()
         new_prop_list: list[tuple[bmp.obj.Object, tuple[bmp.obj.Text, bool]]] = []
-        global_rule_info_list = [bmp.rule.get_info_from_rule(r) for r in self.rule_list]
         for space in self.current_level.space_list:
             # space & levelpack
-            for rule_info in space.rule_info + global_rule_info_list:
+            for rule_info in space.rule_info + self.global_rule_info_list:
                 prefix_info_list = rule_info.prefix_info_list
                 noun_negated = rule_info.noun_negated
                 noun_obj = rule_info.noun
@@ -193,7 +408,7 @@ class Levelpack(object):
                                         if type(oper_obj) == bmp.obj.TextIs:
                                             level_obj.properties.update(prop_obj, prop_negated)
                                         else:
-                                            level_obj.operator_properties[type(oper_obj)].update(prop_obj, prop_negated)
+                                            level_obj.update_operator_properties(type(oper_obj), prop_obj, prop_negated)
                                     if len(current_level_objs) == 0:
                                         level_prop_update |= True
                                     if level_prop_update:
@@ -218,7 +433,7 @@ class Levelpack(object):
                                         if type(oper_obj) == bmp.obj.TextIs:
                                             space_obj.properties.update(prop_obj, prop_negated)
                                         else:
-                                            space_obj.operator_properties[type(oper_obj)].update(prop_obj, prop_negated)
+                                            space_obj.update_operator_properties(type(oper_obj), prop_obj, prop_negated)
                                     if len(active_space_objs) == 0:
                                         space_prop_update |= True
                                     if space_prop_update:
@@ -242,9 +457,9 @@ class Levelpack(object):
                                 if type(oper_obj) == bmp.obj.TextIs:
                                     new_prop_list.append((obj, (prop_obj, prop_negated)))
                                 else:
-                                    obj.operator_properties[type(oper_obj)].update(prop_obj, prop_negated)
+                                    obj.update_operator_properties(type(oper_obj), prop_obj, prop_negated)
             # outer space
-            outer_space_rule_info = self.current_level.recursion_rules(space)[1]
+            outer_space_rule_info = self.get_outer_rule_info(space)
             for rule_info in outer_space_rule_info:
                 prefix_info_list = rule_info.prefix_info_list
                 noun_negated = rule_info.noun_negated
@@ -280,9 +495,14 @@ class Levelpack(object):
                                 if type(oper_obj) == bmp.obj.TextIs:
                                     new_prop_list.append((obj, (prop_obj, prop_negated)))
                                 else:
-                                    obj.operator_properties[type(oper_obj)].update(prop_obj, prop_negated)
+                                    obj.update_operator_properties(type(oper_obj), prop_obj, prop_negated)
         for obj, (prop_obj, prop_negated) in new_prop_list:
             obj.properties.update(prop_obj, prop_negated)
+        for space in self.current_level.space_list:
+            space.refresh_prop_index()
+        if self.get_property_counts() != property_counts:
+            self.current_level.touch()
+        self.rule_state = self.get_rule_state() if not self.rule_volatile else None
     def get_transform_noun(self, old_obj: bmp.obj.Object, negated: bool = False) -> list[bmp.obj.Noun]:
         new_noun_list: list[bmp.obj.Noun] = []
         get_prop_dict_func = bmp.obj.PropertyStorage.disabled_dict if negated else bmp.obj.PropertyStorage.enabled_dict
@@ -292,7 +512,7 @@ class Levelpack(object):
             for noun_info in noun_info_list:
                 if isinstance(noun_info.obj, bmp.obj.Noun):
                     new_noun_list.append(noun_info.obj)
-        for text_type, text_info_list in get_prop_dict_func(old_obj.operator_properties[bmp.obj.TextWrite]).items():
+        for text_type, text_info_list in get_prop_dict_func(old_obj.get_operator_properties(bmp.obj.TextWrite)).items():
             for text_info in text_info_list:
                 new_noun_list.append(bmp.obj.get_noun_from_type(type(text_info.obj))())
         while any(map(lambda n: isinstance(n, bmp.obj.RangedNoun), new_noun_list)):
@@ -336,6 +556,7 @@ class Levelpack(object):
                 if isinstance(new_noun, bmp.obj.SpecificSpaceNoun):
                     if new_noun.isreferenceof(old_obj) and old_obj.space_id is not None:
                         old_obj.space_id += new_noun.delta_infinite_tier
+                        space.touch_objects()
                 continue
             new_obj = old_obj.transform(new_noun.ref_type)
             new_obj.reset_uuid()
@@ -358,6 +579,7 @@ class Levelpack(object):
                         new_obj_copy.reset_uuid()
                         new_obj_copy.space_id = old_obj_space.space_id
                         level.space_included.append(old_obj_space.space_id)
+                        level.touch()
                         space.new_obj(new_obj_copy)
                 transform_success = True
             else:
@@ -366,20 +588,43 @@ class Levelpack(object):
         if transform_success:
             space.del_obj(old_obj)
         return transform_success
-    def transform(self) -> bool:
+    def transform(self) -> tuple[bool, bool]:
         level_transform_success: bool = False
+        changed: bool = False
         for space in self.current_level.space_list:
-            for old_obj in space.object_list:
-                self.transform_object(old_obj, space, self.current_level)
+            # walks objects like a list that drops transformed objects in place, so the object after each one is skipped
+            object_list = space.object_list.copy()
+            index = 0
+            while index < len(object_list):
+                old_obj = object_list[index]
+                old_space_id = old_obj.space_id
+                object_count = len(space.object_dict)
+                changed |= self.transform_object(old_obj, space, self.current_level) or old_obj.space_id != old_space_id
+                deleted = old_obj.uid not in space.object_dict
+                object_list.extend(space.get_last_objs(len(space.object_dict) - object_count + int(deleted)))
+                index += 2 if deleted else 1
         for outer_level in self.level_dict.values():
             for space in outer_level.space_list:
                 for old_level_obj in [l for l in space.get_levels() if l.level_id == self.current_level_id]:
+                    old_space_id = old_level_obj.space_id
                     level_transform_success |= self.transform_object(old_level_obj, space, outer_level)
-        return level_transform_success
+                    changed |= level_transform_success or old_level_obj.space_id != old_space_id
+        return level_transform_success, changed
+    def get_path_unlocked(self, path: bmp.obj.Path) -> bool:
+        for bonus_type, bonus_counts in path.conditions.items():
+            if len({c for c in self.collectibles if isinstance(c.object_type, bonus_type)}) < bonus_counts:
+                return False
+        return True
     def prepare(self) -> None:
         clear_counts: int = 0
+        self.unshare_active_spaces()
         for sub_level in self.level_dict.values():
             for space in sub_level.space_list:
+                if self.shared_space_dict.get(space.space_id) is space:
+                    if all(self.get_path_unlocked(p) == p.unlocked for p in space.get_objs_from_type(bmp.obj.Path)):
+                        continue
+                    self.unshare_space(space.space_id)
+                    space = self.space_dict[space.space_id]
                 for obj in space.object_list:
                     obj.old_state = bmp.obj.OldObjectState(
                         uid = obj.uid,
@@ -392,58 +637,98 @@ class Levelpack(object):
                         old_surface_size = obj.old_state.new_surface_size,
                     )
                     if isinstance(obj, bmp.obj.Path):
-                        unlocked = True
-                        for bonus_type, bonus_counts in obj.conditions.items():
-                            if len({c for c in self.collectibles if isinstance(c.object_type, bonus_type)}) < bonus_counts:
-                                unlocked = False
-                        obj.unlocked = unlocked
+                        unlocked = self.get_path_unlocked(obj)
+                        if obj.unlocked != unlocked:
+                            obj.unlocked = unlocked
+                            space.touch()
             if sub_level.super_level_id == self.current_level.level_id and bmp.obj.Collectible(bmp.obj.Spore, sub_level.level_id) in self.collectibles:
                 clear_counts += 1
                 self.collectibles.add(bmp.obj.Collectible(bmp.obj.Spore, sub_level.level_id))
             if sub_level.map_info is not None:
                 if clear_counts >= sub_level.map_info.get("spore_for_blossom", float("inf")):
                     self.collectibles.add(bmp.obj.Collectible(bmp.obj.Blossom, sub_level.level_id))
+    @contextlib.contextmanager
+    def profile(self, name: str) -> Iterator[None]:
+        if self.profiler is None:
+            yield
+            return
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.profiler.record(name, time.perf_counter() - start_time, sum(len(s.object_list) for s in self.current_level.space_list))
     def tick(self, op: Optional[bmp.loc.Orient]) -> ReturnInfo:
-        self.prepare()
+        if self.profiler is None:
+            return self.tick_phases(op)
+        self.profiler.begin_tick()
+        try:
+            return self.tick_phases(op)
+        finally:
+            self.profiler.end_tick()
+    def tick_phases(self, op: Optional[bmp.loc.Orient]) -> ReturnInfo:
+        with self.profile("prepare"):
+            self.prepare()
         self.current_level.sound_events = []
         self.current_level.created_levels = []
-        self.update_rules()
-        game_push = False
-        game_push |= self.current_level.you(op)
-        game_push |= self.current_level.move()
+        with self.profile("update_rules"):
+            self.update_rules()
+        with self.profile("you"):
+            you_push, you_changed = self.current_level.you(op)
+        with self.profile("move"):
+            move_push, move_changed = self.current_level.move()
         # BIY had this parsing step
         # self.update_rules()
-        game_push |= self.current_level.shift()
-        self.update_rules()
-        transform = self.transform()
-        self.current_level.game()
-        self.current_level.text_plus_and_text_minus()
-        self.update_rules()
-        self.current_level.tele()
-        select = self.current_level.select(op)
+        with self.profile("shift"):
+            shift_push, shift_changed = self.current_level.shift()
+        game_push = you_push or move_push or shift_push
+        self.update_rules_if_changed(you_changed or move_changed or shift_changed)
+        with self.profile("transform"):
+            transform, changed = self.transform()
+        with self.profile("game"):
+            changed |= self.current_level.game()
+        with self.profile("text_plus_and_text_minus"):
+            changed |= self.current_level.text_plus_and_text_minus()
+        self.update_rules_if_changed(changed)
+        with self.profile("tele"):
+            changed = self.current_level.tele()
+        with self.profile("select"):
+            select, select_changed = self.current_level.select(op)
+        changed |= select_changed
         if select is not None:
             select = [l for l in select if l in self.level_dict.keys()]
             if len(select) == 0:
                 select = None
-        self.update_rules()
-        self.current_level.direction()
-        self.current_level.flip()
-        self.current_level.turn()
-        self.update_rules()
-        done = self.current_level.done()
-        self.current_level.sink()
-        self.current_level.hot_and_melt()
-        self.current_level.defeat()
-        self.current_level.open_and_shut()
-        self.update_rules()
-        self.current_level.make()
-        self.update_rules()
+        self.update_rules_if_changed(changed)
+        with self.profile("direction"):
+            changed = self.current_level.direction()
+        with self.profile("flip"):
+            changed |= self.current_level.flip()
+        with self.profile("turn"):
+            changed |= self.current_level.turn()
+        self.update_rules_if_changed(changed)
+        with self.profile("done"):
+            done, changed = self.current_level.done()
+        with self.profile("sink"):
+            changed |= self.current_level.sink()
+        with self.profile("hot_and_melt"):
+            changed |= self.current_level.hot_and_melt()
+        with self.profile("defeat"):
+            changed |= self.current_level.defeat()
+        with self.profile("open_and_shut"):
+            changed |= self.current_level.open_and_shut()
+        self.update_rules_if_changed(changed)
+        with self.profile("make"):
+            changed = self.current_level.make()
+        self.update_rules_if_changed(changed)
         for new_level in self.current_level.created_levels:
             self.set_level(new_level.level_id, new_level)
         self.current_level.refresh_all_list()
-        bonus = self.current_level.bonus()
-        end = self.current_level.end()
-        win = self.current_level.win()
+        with self.profile("bonus"):
+            bonus = self.current_level.bonus()
+        with self.profile("end"):
+            end = self.current_level.end()
+        with self.profile("win"):
+            win = self.current_level.win()
         for object_type in [t for t, b in bonus.items() if b]:
             self.collectibles.add(bmp.obj.Collectible(object_type, self.current_level.level_id))
         for space in self.current_level.space_list:
@@ -452,7 +737,9 @@ class Levelpack(object):
                 for bonus_type, bonus_counts in path.conditions.items():
                     if len({c for c in self.collectibles if isinstance(c, bonus_type)}) < bonus_counts:
                         unlocked = False
-                path.unlocked = unlocked
+                if path.unlocked != unlocked:
+                    path.unlocked = unlocked
+                    space.touch()
         return {
             "win": win,
             "end": end,
@@ -483,13 +770,13 @@ class Levelpack(object):
         ):
             json_object["levels"].append(level.to_json())
         for space in tqdm(
-            self.space_dict.values(),
+            self.get_space_list(),
             desc = bmp.lang.fformat("saving.level.spaces"),
             unit = bmp.lang.fformat("level.name"),
             position = 0,
             **bmp.lang.default_tqdm_args,
         ):
-            json_object["spaces"].append(space.to_json())
+            json_object["spaces"].append(space.to_json() if isinstance(space, bmp.space.Space) else bmp.space.pending_to_json(space))
         for level in tqdm(
             self.level_init_state_dict.values(),
             desc = bmp.lang.fformat("saving.levelpack.levels"),
@@ -497,7 +784,7 @@ class Levelpack(object):
             position = 0,
             **bmp.lang.default_tqdm_args,
         ):
-            json_object["level_init_states"].append(level.to_json())
+            json_object["level_init_states"].append(level)
         for space in tqdm(
             self.space_init_state_dict.values(),
             desc = bmp.lang.fformat("saving.level.spaces"),
@@ -505,7 +792,7 @@ class Levelpack(object):
             position = 0,
             **bmp.lang.default_tqdm_args,
         ):
-            json_object["space_init_states"].append(space.to_json())
+            json_object["space_init_states"].append(bmp.space.pending_to_json(space))
         for collectible in tqdm(
             self.collectibles,
             desc = bmp.lang.fformat("saving.levelpack.collectibles"),
@@ -571,18 +858,22 @@ def update_json_format(json_object: AnyLevelpackJson, ver: str) -> LevelpackJson
     else:
         raise bmp.base.UpgradeError(json_object)
 
-def json_to_levelpack(json_object: LevelpackJson) -> Levelpack:
+def json_to_levelpack(
+    json_object: LevelpackJson,
+    space_list: Optional[list[bmp.space.PendingSpace]] = None,
+    space_init_state_list: Optional[list[bmp.space.PendingSpace]] = None,
+) -> Levelpack:
+    # space_list and space_init_state_list replace the spaces in json_object when they are already unpacked
     collectibles: set[bmp.obj.Collectible] = set()
-    space_dict: dict[bmp.ref.SpaceID, bmp.space.Space] = {}
-    for space_json in tqdm(
-        json_object["spaces"],
+    pending_space_dict: dict[bmp.ref.SpaceID, bmp.space.PendingSpace] = {}
+    for pending_space in tqdm(
+        space_list if space_list is not None else json_object["spaces"],
         desc = bmp.lang.fformat("loading.level.spaces"),
         unit = bmp.lang.fformat("space.name"),
         position = 0,
         **bmp.lang.default_tqdm_args,
     ):
-        space = bmp.space.json_to_space(space_json)
-        space_dict[space.space_id] = space
+        pending_space_dict[bmp.space.get_pending_space_id(pending_space)] = pending_space
     level_dict: dict[bmp.ref.LevelID, bmp.level.Level] = {}
     for level_json in tqdm(
         json_object["levels"],
@@ -593,36 +884,15 @@ def json_to_levelpack(json_object: LevelpackJson) -> Levelpack:
     ):
         level = bmp.level.json_to_level(level_json)
         level_dict[level.level_id] = level
-    space_init_state_dict_json = json_object.get("space_init_states")
-    space_init_state_dict: dict[bmp.ref.SpaceID, bmp.space.Space]
-    if space_init_state_dict_json is not None:
-        space_init_state_dict = {}
-        for space_json in tqdm(
-            space_init_state_dict_json,
-            desc = bmp.lang.fformat("loading.level.spaces"),
-            unit = bmp.lang.fformat("level.name"),
-            position = 0,
-            **bmp.lang.default_tqdm_args,
-        ):
-            space = bmp.space.json_to_space(space_json)
-            space_init_state_dict[space.space_id] = space
-    else:
-        space_init_state_dict = copy.deepcopy(space_dict)
+    space_init_state_dict: Optional[dict[bmp.ref.SpaceID, bmp.space.PendingSpace]] = None
+    if space_init_state_list is None:
+        space_init_state_list = json_object.get("space_init_states")
+    if space_init_state_list is not None:
+        space_init_state_dict = {bmp.space.get_pending_space_id(s): s for s in space_init_state_list}
+    level_init_state_dict: Optional[dict[bmp.ref.LevelID, bmp.level.LevelJson]] = None
     level_init_state_dict_json = json_object.get("level_init_states")
-    level_init_state_dict: dict[bmp.ref.LevelID, bmp.level.Level]
     if level_init_state_dict_json is not None:
-        level_init_state_dict = {}
-        for level_json in tqdm(
-            level_init_state_dict_json,
-            desc = bmp.lang.fformat("loading.levelpack.levels"),
-            unit = bmp.lang.fformat("level.name"),
-            position = 0,
-            **bmp.lang.default_tqdm_args,
-        ):
-            level = bmp.level.json_to_level(level_json)
-            level_init_state_dict[level.level_id] = level
-    else:
-        level_init_state_dict = copy.deepcopy(level_dict)
+        level_init_state_dict = {bmp.ref.LevelID(**l["id"]): l for l in level_init_state_dict_json}
     rule_list: list[bmp.rule.Rule] = []
     for rule in tqdm(
         json_object["rules"],
@@ -648,9 +918,10 @@ def json_to_levelpack(json_object: LevelpackJson) -> Levelpack:
         ))
     return Levelpack(
         level_dict = level_dict,
-        space_dict = space_dict,
+        space_dict = {},
         level_init_state_dict = level_init_state_dict,
         space_init_state_dict = space_init_state_dict,
+        pending_space_dict = pending_space_dict,
         name = json_object.get("name"),
         author = json_object.get("author"),
         current_level_id = current_level_id,
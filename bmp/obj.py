@@ -1,11 +1,12 @@
 from dataclasses import dataclass
 from enum import Enum, StrEnum
 from tqdm import tqdm, trange
+import copy
 import json
 import os
-from typing import Any, Final, Literal, NotRequired, Optional, TypeGuard, TypedDict, Self
+from typing import Any, Final, Iterator, Literal, NotRequired, Optional, TypeGuard, TypedDict, Self
+import itertools
 import math
-import uuid
 import bmp.base
 import bmp.color
 import bmp.lang
@@ -36,7 +37,7 @@ default_level_extra: LevelObjectExtra = {"icon": {"name": "empty", "color": 0xFF
 
 # dict[type[property], dict[negated_number, negated_count]]
 
-@dataclass(init=True, repr=True)
+@dataclass(init=True, repr=True, slots=True)
 class PropertyInfo[T: "Text"]():
     obj: T
     negated: bool
@@ -45,10 +46,19 @@ class PropertyInfo[T: "Text"]():
 type PropertyDict = dict[type["Text"], list[PropertyInfo]]
 
 class PropertyStorage(object):
+    __slots__ = ("__dict", "__enabled", "__disabled")
     def __init__(self, prop: Optional[PropertyDict] = None) -> None:
         self.__dict: PropertyDict = prop if prop is not None else {}
+        self.__enabled: dict[type["Text"], int] = {}
+        self.__disabled: dict[type["Text"], int] = {}
+        for prop_type, info_list in self.__dict.items():
+            for info in info_list:
+                self.__add_count(prop_type, info.negated)
     def __bool__(self) -> bool:
         return len(self.__dict) != 0
+    def __add_count(self, prop: type["Text"], negated: bool) -> None:
+        count_dict = self.__disabled if negated else self.__enabled
+        count_dict[prop] = count_dict.get(prop, 0) + 1
     def get_info(self) -> str:
         string = f"property storage {self.__dict}"
         return "<" + string + ">"
@@ -60,44 +70,60 @@ class PropertyStorage(object):
             return int(info_list[0].negated == negated)
         return sum([1 for i in info_list if i.negated == negated])
     def update(self, prop: "Text", negated: bool = False) -> None:
-        self.__dict.setdefault(type(prop), [])
-        self.__dict[type(prop)].append(PropertyInfo(
+        self.__dict.setdefault(type(prop), []).append(PropertyInfo(
             obj = prop,
             negated = negated,
             effected = False,
         ))
+        self.__add_count(type(prop), negated)
     def exist(self, prop: type["Text"]) -> bool:
-        return len(self.__dict.get(prop, [])) != 0
+        return prop in self.__dict
     def count(self, prop: type["Text"], *, negated: bool = False) -> int:
-        if self.__dict.get(prop) is None:
-            return 0
-        return self.calc_count(self.__dict[prop], negated)
+        return (self.__disabled if negated else self.__enabled).get(prop, 0)
     def clear(self) -> None:
         self.__dict.clear()
+        self.__enabled.clear()
+        self.__disabled.clear()
     def enabled(self, prop: type["Text"]) -> bool:
-        return self.count(prop, negated=False) > 0
+        return prop in self.__enabled
     def disabled(self, prop: type["Text"]) -> bool:
-        return self.count(prop, negated=True) > 0
+        return prop in self.__disabled
     def enabled_info[T: "Text"](self, prop: type[T]) -> list[PropertyInfo[T]]:
-        return [] if self.disabled(prop) else [i for i in self.__dict.get(prop, []) if not i.negated]
+        if prop in self.__disabled or prop not in self.__enabled:
+            return []
+        return [i for i in self.__dict[prop] if not i.negated]
     def disabled_info[T: "Text"](self, prop: type[T]) -> list[PropertyInfo[T]]:
-        return [i for i in self.__dict.get(prop, []) if i.negated]
+        if prop not in self.__disabled:
+            return []
+        return [i for i in self.__dict[prop] if i.negated]
     def enabled_dict(self) -> dict[type["Text"], list[PropertyInfo["Text"]]]:
         return {k: self.enabled_info(k) for k in self.__dict.keys()}
     def disabled_dict(self) -> dict[type["Text"], list[PropertyInfo["Text"]]]:
         return {k: self.disabled_info(k) for k in self.__dict.keys()}
     def enabled_count(self) -> dict[type["Text"], int]:
-        return {_k: _v for _k, _v in {k: self.calc_count(v, False) for k, v in self.__dict.items()}.items() if _v != 0}
+        return {k: self.__enabled[k] for k in self.__dict.keys() if k in self.__enabled}
     def disabled_count(self) -> dict[type["Text"], int]:
-        return {_k: _v for _k, _v in {k: self.calc_count(v, True) for k, v in self.__dict.items()}.items() if _v != 0}
+        return {k: self.__disabled[k] for k in self.__dict.keys() if k in self.__disabled}
     def copy(self) -> "PropertyStorage":
-        return PropertyStorage(self.__dict.copy())
+        new_storage = PropertyStorage()
+        new_storage.__dict = {k: v.copy() for k, v in self.__dict.items()}
+        new_storage.__enabled = self.__enabled.copy()
+        new_storage.__disabled = self.__disabled.copy()
+        return new_storage
+
+class EmptyPropertyStorage(PropertyStorage):
+    __slots__ = ()
+    def update(self, prop: "Text", negated: bool = False) -> None:
+        raise TypeError(type(self))
+    def clear(self) -> None:
+        pass
 
 class OldObjectState(object):
+    __slots__ = ("uid", "pos", "orient", "prop", "space", "level", "old_surface_pos", "old_surface_size", "new_surface_pos", "new_surface_size")
     def __init__(
         self,
         *,
-        uid: Optional[uuid.UUID] = None,
+        uid: Optional[int] = None,
         pos: Optional[bmp.loc.Coord[int]] = None,
         orient: Optional[bmp.loc.Orient] = None,
         prop: Optional[PropertyStorage] = None,
@@ -108,7 +134,7 @@ class OldObjectState(object):
         new_surface_pos: Optional[bmp.loc.Coord[float]] = None,
         new_surface_size: Optional[bmp.loc.Coord[float]] = None,
     ) -> None:
-        self.uid: Optional[uuid.UUID] = uid
+        self.uid: Optional[int] = uid
         self.pos: Optional[bmp.loc.Coord[int]] = pos
         self.orient: Optional[bmp.loc.Orient] = orient
         self.prop: Optional[PropertyStorage] = prop
@@ -118,9 +144,18 @@ class OldObjectState(object):
         self.old_surface_size: Optional[bmp.loc.Coord[float]] = old_surface_size
         self.new_surface_pos: Optional[bmp.loc.Coord[float]] = new_surface_pos
         self.new_surface_size: Optional[bmp.loc.Coord[float]] = new_surface_size
+    def __copy__(self) -> "OldObjectState":
+        new_state = object.__new__(OldObjectState)
+        for name in self.__slots__:
+            setattr(new_state, name, getattr(self, name))
+        return new_state
 
 special_operators: tuple[type["Operator"], ...]
 
+uid_counter: Final[Iterator[int]] = itertools.count()
+default_direct_mapping: Final[dict[bmp.loc.Orient, bmp.loc.Orient]] = {d: d for d in bmp.loc.Orient}
+empty_property_storage: Final[PropertyStorage] = EmptyPropertyStorage()
+
 class SpriteCategory(StrEnum):
     NONE = "none"
     STATIC = "static"
@@ -142,8 +177,18 @@ class ObjectJson41(TypedDict):
 
 type ObjectJson = ObjectJson41
 
-class Object(object):
+class ObjectMeta(type):
+    def __new__(mcs, name: str, bases: tuple[type, ...], namespace: dict[str, Any], **kwds: Any) -> "ObjectMeta":
+        namespace.setdefault("__slots__", ())
+        return super().__new__(mcs, name, bases, namespace, **kwds)
+
+class Object(object, metaclass=ObjectMeta):
+    __slots__ = (
+        "uid", "pos", "orient", "direct_mapping", "old_state", "space_id", "level_id",
+        "located_space_id", "properties", "operator_properties", "move_number", "sprite_state",
+    )
     ref_type: type["Object"]
+    slot_names: tuple[str, ...]
     json_name: str
     sprite_name: str
     sprite_palette: bmp.color.PaletteIndex
@@ -172,17 +217,28 @@ class Object(object):
         space_id: Optional[bmp.ref.SpaceID] = None,
         level_id: Optional[bmp.ref.LevelID] = None
     ) -> None:
-        self.uid: uuid.UUID = uuid.uuid4()
+        self.uid: int = next(uid_counter)
         self.pos: bmp.loc.Coord[int] = pos
         self.orient: bmp.loc.Orient = direct
-        self.direct_mapping: dict[bmp.loc.Orient, bmp.loc.Orient] = {d: d for d in bmp.loc.Orient}
+        self.direct_mapping: dict[bmp.loc.Orient, bmp.loc.Orient] = default_direct_mapping
         self.old_state: OldObjectState = OldObjectState()
         self.space_id: Optional[bmp.ref.SpaceID] = space_id
         self.level_id: Optional[bmp.ref.LevelID] = level_id
+        self.located_space_id: Optional[bmp.ref.SpaceID] = None
         self.properties: PropertyStorage = PropertyStorage()
-        self.operator_properties: dict[type["Operator"], PropertyStorage] = {o: PropertyStorage() for o in special_operators}
+        self.operator_properties: Optional[dict[type["Operator"], PropertyStorage]] = None
         self.move_number: int = 0
         self.sprite_state: int = 0
+    def __init_subclass__(cls) -> None:
+        super().__init_subclass__()
+        cls.slot_names = tuple(n for c in cls.__mro__ for n in vars(c).get("__slots__", ()))
+    def __copy__(self) -> Self:
+        new_obj = object.__new__(type(self))
+        for name in self.slot_names:
+            setattr(new_obj, name, getattr(self, name))
+        if hasattr(self, "__dict__"):
+            new_obj.__dict__.update(self.__dict__)
+        return new_obj
     def __eq__(self, obj: "Object") -> bool:
         return self.uid == obj.uid
     def __hash__(self) -> int:
@@ -215,7 +271,25 @@ class Object(object):
     def y(self, value: int) -> None:
         self.pos = (self.pos[0], value)
     def reset_uuid(self) -> None:
-        self.uid = uuid.uuid4()
+        self.uid = next(uid_counter)
+    def clone(self) -> Self:
+        new_obj = copy.copy(self)
+        new_obj.reset_uuid()
+        new_obj.properties = self.properties.copy()
+        if self.operator_properties is not None:
+            new_obj.operator_properties = {k: v.copy() for k, v in self.operator_properties.items()}
+        new_obj.old_state = copy.copy(self.old_state)
+        if self.old_state.prop is self.properties:
+            new_obj.old_state.prop = new_obj.properties
+        return new_obj
+    def get_operator_properties(self, oper: type["Operator"]) -> PropertyStorage:
+        if self.operator_properties is None:
+            return empty_property_storage
+        return self.operator_properties[oper]
+    def update_operator_properties(self, oper: type["Operator"], prop: "Text", negated: bool = False) -> None:
+        if self.operator_properties is None:
+            self.operator_properties = {o: PropertyStorage() for o in special_operators}
+        self.operator_properties[oper].update(prop, negated)
     def set_direct_mapping(self, mapping: dict[bmp.loc.Orient, bmp.loc.Orient]) -> None:
         self.orient = mapping[self.direct_mapping[self.orient]]
         self.direct_mapping = mapping.copy()
@@ -255,6 +329,7 @@ class Object(object):
 class NotRealObject(Object):
     pass
 Object.ref_type = NotRealObject
+Object.slot_names = Object.__slots__
 
 class Cursor(Object):
     json_name = "cursor"
@@ -275,6 +350,7 @@ class Blossom(Object):
     sprite_palette: bmp.color.PaletteIndex = (0, 3)
 
 class SpaceObject(Object):
+    __slots__ = ("space_extra", )
     sprite_name = "space"
     sprite_category = SpriteCategory.STATIC
     light_overlay: bmp.color.ColorHex = 0x000000
@@ -290,9 +366,13 @@ class SpaceObject(Object):
     ) -> None:
         super().__init__(pos, direct, space_id=space_id, level_id=level_id)
         self.space_extra: SpaceObjectExtra = space_extra.copy()
+    def clone(self) -> Self:
+        new_obj = super().clone()
+        new_obj.space_extra = copy.deepcopy(self.space_extra)
+        return new_obj
     def transform(self: "SpaceObject", /, _type: type["Object"]) -> "Object": ...
     def to_json(self) -> ObjectJson:
-        return {**super().to_json(), "space_extra": self.space_extra}
+        return {**super().to_json(), "space_extra": self.space_extra.copy()}
 
 class Space(SpaceObject):
     dark_overlay: bmp.color.ColorHex = 0xC0C0C0
@@ -308,6 +388,7 @@ space_object_types: list[type[SpaceObject]] = [Space, Clone]
 default_space_object_type: type[SpaceObject] = Space
 
 class LevelObject(Object):
+    __slots__ = ("level_extra", )
     sprite_category: SpriteCategory = SpriteCategory.STATIC
     def __init__(
         self,
@@ -320,9 +401,13 @@ class LevelObject(Object):
     ) -> None:
         super().__init__(pos, direct, space_id=space_id, level_id=level_id)
         self.level_extra: LevelObjectExtra = level_extra
+    def clone(self) -> Self:
+        new_obj = super().clone()
+        new_obj.level_extra = copy.deepcopy(self.level_extra)
+        return new_obj
     def transform(self: "LevelObject", /, _type: type["Object"]) -> "Object": ...
     def to_json(self) -> ObjectJson:
-        return {**super().to_json(), "level_extra": self.level_extra}
+        return {**super().to_json(), "level_extra": self.level_extra.copy()}
 
 class Level(LevelObject):
     json_name = "level"
@@ -348,6 +433,7 @@ class Collectible(object):
         return {"type": self.object_type.json_name, "source": self.source.to_json()}
 
 class Path(Object):
+    __slots__ = ("unlocked", "conditions")
     json_name = "path"
     sprite_name = "line"
     sprite_category: SpriteCategory = SpriteCategory.TILED
@@ -365,10 +451,15 @@ class Path(Object):
         super().__init__(pos, direct, space_id=space_id, level_id=level_id)
         self.unlocked: bool = unlocked
         self.conditions: dict[type[Object], int] = conditions if conditions is not None else {}
+    def clone(self) -> Self:
+        new_obj = super().clone()
+        new_obj.conditions = self.conditions.copy()
+        return new_obj
     def to_json(self) -> ObjectJson:
         return {**super().to_json(), "path_extra": {"unlocked": self.unlocked, "conditions": {k.json_name: v for k, v in self.conditions.items()}}}
 
 class Game(Object):
+    __slots__ = ("ref_type", )
     def __init__(
         self,
         pos: bmp.loc.Coord[int],
@@ -388,6 +479,7 @@ class TextRenderState(StrEnum):
     # CROSSED = "crossed"
 
 class Text(Object):
+    __slots__ = ("render_state", )
     json_name = "text"
     sprite_category = SpriteCategory.STATIC
     sprite_palette: bmp.color.PaletteIndex = (0, 3)
@@ -38,6 +38,7 @@ class GameplayOptions(TypedDict):
     repeat: RepeatOptions
     metatext: MetatextOptions
     bgm: BgmOptions
+    history_limit: NotRequired[Optional[int]]
     game_is_end: NotRequired[bool]
     game_is_done: NotRequired[bool]
 
@@ -46,6 +47,7 @@ class RenderOptions(TypedDict):
     space_depth: int
     palette: str
     smooth: Optional[int]
+    recolor_cache: NotRequired[int]
 
 class EditorOptions(TypedDict):
     shortcuts: list[str]
@@ -96,12 +98,14 @@ default_options: Options = {
             "enabled": True,
             "tier": 5,
         },
+        "history_limit": 200,
     },
     "render": {
         "fps": 30,
         "space_depth": 1,
         "palette": "default.png",
         "smooth": 3,
+        "recolor_cache": 512,
     },
     "editor": {
         "shortcuts": [
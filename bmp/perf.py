@@ -0,0 +1,62 @@
+from typing import Optional, Self
+import collections
+import time
+
+default_capacity: int = 120
+
+class TickRecord(object):
+    def __init__(self) -> None:
+        self.total_time: float = 0.0
+        self.phase_time: dict[str, float] = {}
+        self.phase_calls: dict[str, int] = {}
+        self.phase_objects: dict[str, int] = {}
+        self.counters: dict[str, int] = {}
+    def record(self, name: str, seconds: float, objects: int) -> None:
+        self.phase_time[name] = self.phase_time.get(name, 0.0) + seconds
+        self.phase_calls[name] = self.phase_calls.get(name, 0) + 1
+        self.phase_objects[name] = objects
+    def count(self, name: str, number: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + number
+
+class TickProfiler(object):
+    def __init__(self, capacity: int = default_capacity) -> None:
+        self.records: collections.deque[TickRecord] = collections.deque(maxlen=capacity)
+        self.current_record: Optional[TickRecord] = None
+        self.start_time: float = 0.0
+    def __deepcopy__(self, memo: dict) -> Self:
+        return self
+    def begin_tick(self) -> None:
+        self.current_record = TickRecord()
+        self.start_time = time.perf_counter()
+    def end_tick(self) -> None:
+        if self.current_record is None:
+            return
+        self.current_record.total_time = time.perf_counter() - self.start_time
+        self.records.append(self.current_record)
+        self.current_record = None
+    def record(self, name: str, seconds: float, objects: int) -> None:
+        if self.current_record is not None:
+            self.current_record.record(name, seconds, objects)
+    def count(self, name: str, number: int = 1) -> None:
+        if self.current_record is not None:
+            self.current_record.count(name, number)
+    def clear(self) -> None:
+        self.records.clear()
+        self.current_record = None
+    @property
+    def last_record(self) -> Optional[TickRecord]:
+        return self.records[-1] if len(self.records) != 0 else None
+    def average_time(self) -> dict[str, float]:
+        phase_time: dict[str, float] = {}
+        for record in self.records:
+            for name, seconds in record.phase_time.items():
+                phase_time[name] = phase_time.get(name, 0.0) + seconds
+        return {k: v / len(self.records) for k, v in sorted(phase_time.items(), key=lambda i: i[1], reverse=True)}
+    def average_total_time(self) -> float:
+        return sum(r.total_time for r in self.records) / len(self.records) if len(self.records) != 0 else 0.0
+    def total_counters(self) -> dict[str, int]:
+        counters: dict[str, int] = {}
+        for record in self.records:
+            for name, number in record.counters.items():
+                counters[name] = counters.get(name, 0) + number
+        return counters
@@ -1,5 +1,6 @@
 from typing import Any, Callable, Optional, Final
 from tqdm import tqdm
+import collections
 import os
 import string
 
@@ -7,10 +8,12 @@ import bmp.base
 import bmp.color
 import bmp.lang
 import bmp.obj
+import bmp.opt
 
 import pygame
 
 sprite_size: Final[int] = 24
+type RecolorKey = tuple[str, int, int, bmp.color.ColorHex, int]
 gui_scalar: int
 smaller_gui_scalar: int
 
@@ -36,31 +39,66 @@ def calc_smooth_value(frame: int) -> Optional[float]:
 def calc_smooth_coord(old: bmp.loc.Coord[int | float], smooth: float, new: bmp.loc.Coord[int | float]) -> bmp.loc.Coord[float]:
     return (old[0] * smooth + new[0] * (1 - smooth), old[1] * smooth + new[1] * (1 - smooth))
 
+class AllocationCounter(object):
+    def __init__(self) -> None:
+        self.current: int = 0
+        self.last: int = 0
+    def count(self, number: int = 1) -> None:
+        self.current += number
+    def next_frame(self) -> int:
+        self.last, self.current = self.current, 0
+        return self.last
+current_allocation_counter = AllocationCounter()
+
+def make_surface(size: bmp.loc.Coord[int]) -> pygame.Surface:
+    current_allocation_counter.count()
+    return pygame.Surface(size, pygame.SRCALPHA)
+
+def copy_surface(surface: pygame.Surface) -> pygame.Surface:
+    current_allocation_counter.count()
+    return surface.copy()
+
+def scale_surface(surface: pygame.Surface, size: bmp.loc.Coord[int]) -> pygame.Surface:
+    current_allocation_counter.count()
+    return pygame.transform.scale(surface, size)
+
+def scale_surface_by(surface: pygame.Surface, factor: float) -> pygame.Surface:
+    current_allocation_counter.count()
+    return pygame.transform.scale_by(surface, factor)
+
+def rotate_surface(surface: pygame.Surface, angle: float) -> pygame.Surface:
+    current_allocation_counter.count()
+    return pygame.transform.rotate(surface, angle)
+
+def flip_surface(surface: pygame.Surface) -> pygame.Surface:
+    current_allocation_counter.count()
+    return pygame.transform.flip(surface, flip_x=True, flip_y=False)
+
 def set_alpha(surface: pygame.Surface, alpha: int) -> pygame.Surface:
     if alpha == 0xFF:
-        return surface.copy()
-    new_surface = surface.copy()
+        return copy_surface(surface)
+    new_surface = copy_surface(surface)
     new_surface.fill(pygame.Color(255, 255, 255, alpha), special_flags=pygame.BLEND_RGBA_MULT)
     return new_surface
 
 def set_surface_color_dark(surface: pygame.Surface, color: bmp.color.ColorHex) -> pygame.Surface:
     if color == 0xFFFFFF:
-        return surface.copy()
+        return copy_surface(surface)
     r, g, b = bmp.color.hex_to_rgb(color)
-    new_surface = pygame.Surface(surface.get_size(), pygame.SRCALPHA)
+    new_surface = make_surface(surface.get_size())
     new_surface.fill(pygame.Color(r, g, b, 255))
     new_surface.blit(surface, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
     return new_surface
 
 def set_surface_color_light(surface: pygame.Surface, color: bmp.color.ColorHex) -> pygame.Surface:
     if color == 0x000000:
-        return surface.copy()
+        return copy_surface(surface)
     r, g, b = bmp.color.hex_to_rgb(color)
-    neg_surface = pygame.Surface(surface.get_size(), pygame.SRCALPHA)
+    neg_surface = make_surface(surface.get_size())
     neg_surface.fill("#FFFFFFFF")
     neg_surface.blit(surface, (0, 0), special_flags=pygame.BLEND_RGBA_SUB)
     neg_surface.fill(pygame.Color(255 - r, 255 - g, 255 - b, 255), special_flags=pygame.BLEND_RGBA_MULT)
-    new_surface = pygame.Surface(surface.get_size(), pygame.SRCALPHA)
+    new_surface = make_surface(surface.get_size())
     new_surface.fill("#FFFFFFFF")
     new_surface.blit(neg_surface, (0, 0), special_flags=pygame.BLEND_RGBA_SUB)
     return new_surface
@@ -72,6 +110,7 @@ class Sprites(object):
     def update(self) -> None:
         self.raw_sprites.clear()
         self.sprites.clear()
+        current_recolor_cache.clear()
         empty_sprite = pygame.Surface((sprite_size, sprite_size), pygame.SRCALPHA)
         empty_sprite.fill("#00000000")
         self.raw_sprites.setdefault("empty", {0: {}})
@@ -124,11 +163,36 @@ class Sprites(object):
                     sprite = empty_sprite.copy()
                 self.raw_sprites[sprite_name][0][int(wiggle)] = sprite.copy()
                 self.sprites[sprite_name][0][int(wiggle)] = set_surface_color_dark(sprite, sprite_palette)
-    def get(self, name: str, variant: int, wiggle: int = 1, raw: bool = False) -> pygame.Surface:
-        if raw: return self.raw_sprites[name][variant][wiggle]
-        return self.sprites[name][variant][wiggle].copy()
+    # the returned surface is shared; pass mutable=True for a copy that can be drawn on
+    def get(self, name: str, variant: int, wiggle: int = 1, raw: bool = False, mutable: bool = False) -> pygame.Surface:
+        surface = self.raw_sprites[name][variant][wiggle] if raw else self.sprites[name][variant][wiggle]
+        return copy_surface(surface) if mutable else surface
 current_sprites = Sprites()
 
+def get_recolor_cache_size() -> int:
+    return bmp.opt.options["render"].get("recolor_cache", bmp.opt.default_options["render"].get("recolor_cache", 0))
+
+class RecolorCache(object):
+    def __init__(self) -> None:
+        self.surfaces: collections.OrderedDict[RecolorKey, pygame.Surface] = collections.OrderedDict()
+    # the returned surface is shared; pass mutable=True for a copy that can be drawn on
+    def get(self, name: str, variant: int, wiggle: int, color: bmp.color.ColorHex, alpha: int = 0xFF, mutable: bool = False) -> pygame.Surface:
+        key: RecolorKey = (name, variant, wiggle, color, alpha)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            return copy_surface(surface) if mutable else surface
+        surface = set_surface_color_dark(current_sprites.get(name, variant, wiggle, raw=True), color)
+        if alpha != 0xFF:
+            surface = set_alpha(surface, alpha)
+        self.surfaces[key] = surface
+        while len(self.surfaces) > get_recolor_cache_size():
+            self.surfaces.popitem(last=False)
+        return copy_surface(surface) if mutable else surface
+    def clear(self) -> None:
+        self.surfaces.clear()
+current_recolor_cache = RecolorCache()
+
 def char_to_sprite_name(char: str) -> str:
     special_char_dict: dict[str, str] = {
         ".": "line",
@@ -161,11 +225,11 @@ def char_to_sprite_name(char: str) -> str:
         return "empty"
 
 def char_to_surface(char: str, wiggle: int = 1) -> pygame.Surface:
-    return current_sprites.get(char_to_sprite_name(char), 0, wiggle, raw=True).copy()
+    return current_sprites.get(char_to_sprite_name(char), 0, wiggle, raw=True)
 
 def line_to_surface(line: str, wiggle: int = 1) -> pygame.Surface:
     sprite_name_list: list[str] = [char_to_sprite_name(s) for s in line]
-    surface = pygame.Surface((len(sprite_name_list) * sprite_size, sprite_size), pygame.SRCALPHA)
+    surface = make_surface((len(sprite_name_list) * sprite_size, sprite_size))
     surface.fill("#00000000")
     for i, sprite_name in enumerate(sprite_name_list):
         surface.blit(current_sprites.get(sprite_name, 0, wiggle, raw=True), (i * sprite_size, 0))
@@ -176,50 +240,52 @@ def set_gui_background(surface: pygame.Surface, /, bgcolor: Optional[bmp.color.C
         bgcolor = bmp.color.current_palette[0, 4]
     if bgalpha is None:
         bgalpha = 0xC0
-    bgsurface = pygame.Surface(surface.get_size(), pygame.SRCALPHA)
+    bgsurface = make_surface(surface.get_size())
     bgsurface.fill(pygame.Color(*bmp.color.hex_to_rgb(bgcolor), bgalpha))
     bgsurface.blit(surface, (0, 0))
     return bgsurface
 
 def simple_type_to_surface(object_type: type[bmp.obj.Object], variant: int = 0, wiggle: int = 1, default_surface: Optional[pygame.Surface] = None, debug: bool = False) -> pygame.Surface:
-    obj_surface = current_sprites.get("empty", 0, wiggle, raw=True).copy()
+    obj_surface = current_sprites.get("empty", 0, wiggle, raw=True)
     if issubclass(object_type, bmp.obj.SpaceObject):
         if default_surface is not None:
-            obj_surface = default_surface.copy()
+            obj_surface = default_surface
         else:
-            obj_surface = pygame.Surface((sprite_size, sprite_size), pygame.SRCALPHA)
+            obj_surface = make_surface((sprite_size, sprite_size))
             obj_surface.fill("#00000000")
         obj_surface = set_surface_color_light(obj_surface, object_type.light_overlay)
         obj_surface = set_surface_color_dark(obj_surface, object_type.dark_overlay)
-        overlay_surface = current_sprites.get(bmp.obj.SpaceObject.sprite_name, 0, wiggle, raw=True).copy()
-        overlay_surface = pygame.transform.scale(set_alpha(overlay_surface, 0x40), obj_surface.get_size())
+        overlay_surface = current_recolor_cache.get(bmp.obj.SpaceObject.sprite_name, 0, wiggle, 0xFFFFFF, 0x40)
+        overlay_surface = scale_surface(overlay_surface, obj_surface.get_size())
         obj_surface.blit(overlay_surface, (0, 0))
     elif issubclass(object_type, bmp.obj.Metatext):
-        obj_surface = current_sprites.get(object_type.basic_ref_type.sprite_name, variant, wiggle).copy()
-        tier_surface = pygame.Surface((obj_surface.get_width() * len(str(object_type.meta_tier)), obj_surface.get_height()), pygame.SRCALPHA)
+        obj_surface = current_sprites.get(object_type.basic_ref_type.sprite_name, variant, wiggle)
+        tier_surface = make_surface((obj_surface.get_width() * len(str(object_type.meta_tier)), obj_surface.get_height()))
         tier_surface.fill("#00000000")
         for digit, char in enumerate(str(object_type.meta_tier)):
             tier_surface.blit(current_sprites.get("text_" + char, variant, wiggle), (sprite_size * digit, 0))
         tier_surface = set_alpha(tier_surface, 0x80)
-        obj_surface = pygame.transform.scale_by(obj_surface, len(str(object_type.meta_tier)))
+        obj_surface = scale_surface_by(obj_surface, len(str(object_type.meta_tier)))
         tier_surface_pos = (
             (obj_surface.get_width() - tier_surface.get_width()) // 2,
             (obj_surface.get_height() - tier_surface.get_height()) // 2,
         )
         obj_surface.blit(tier_surface, tier_surface_pos)
     elif object_type.sprite_name in current_sprites.sprites.keys():
-        obj_surface = current_sprites.get(object_type.sprite_name, variant, wiggle).copy()
+        obj_surface = current_sprites.get(object_type.sprite_name, variant, wiggle)
     return obj_surface
 
 def simple_object_to_surface(obj: bmp.obj.Object, wiggle: int = 1, default_surface: Optional[pygame.Surface] = None, debug: bool = False) -> pygame.Surface:
     if isinstance(obj, bmp.obj.LevelObject):
-        obj_surface = set_surface_color_dark(current_sprites.get(obj.sprite_name, obj.sprite_state, wiggle, raw=True).copy(), obj.level_extra["icon"]["color"])
-        icon_surface = current_sprites.get(obj.level_extra["icon"]["name"], 0, wiggle, raw=True).copy()
+        obj_surface = current_recolor_cache.get(obj.sprite_name, obj.sprite_state, wiggle, obj.level_extra["icon"]["color"], mutable=True)
+        icon_surface = current_sprites.get(obj.level_extra["icon"]["name"], 0, wiggle, raw=True)
         icon_surface_pos = (
             (obj_surface.get_width() - icon_surface.get_width()) // 2,
             (obj_surface.get_height() - icon_surface.get_height()) // 2,
         )
         obj_surface.blit(icon_surface, icon_surface_pos)
+    elif isinstance(obj, bmp.obj.Text) and not isinstance(obj, bmp.obj.Metatext) and obj.render_state == bmp.obj.TextRenderState.UNUSED and not debug and obj.sprite_name in current_sprites.sprites.keys():
+        obj_surface = current_recolor_cache.get(obj.sprite_name, obj.sprite_state, wiggle, obj.get_color(), 0x80)
     else:
         obj_surface = simple_type_to_surface(type(obj), obj.sprite_state, wiggle, default_surface, debug)
         if isinstance(obj, bmp.obj.Text):
@@ -230,17 +296,14 @@ def simple_object_to_surface(obj: bmp.obj.Object, wiggle: int = 1, default_surfa
                 case bmp.obj.TextRenderState.USED:
                     pass
         elif isinstance(obj, bmp.obj.SpaceObject) and obj.space_id is not None and obj.space_id.infinite_tier != 0:
-            infinite_text_surface = current_sprites.get("text_infinity" if obj.space_id.infinite_tier > 0 else "text_epsilon", 0, wiggle, raw=True).copy()
-            infinite_text_surface = pygame.transform.scale(infinite_text_surface, obj_surface.get_size())
-            infinite_tier_surface = pygame.Surface(
-                (obj_surface.get_width(), obj_surface.get_height() * abs(obj.space_id.infinite_tier)),
-                pygame.SRCALPHA
-            )
+            infinite_text_surface = current_sprites.get("text_infinity" if obj.space_id.infinite_tier > 0 else "text_epsilon", 0, wiggle, raw=True)
+            infinite_text_surface = scale_surface(infinite_text_surface, obj_surface.get_size())
+            infinite_tier_surface = make_surface((obj_surface.get_width(), obj_surface.get_height() * abs(obj.space_id.infinite_tier)))
             infinite_tier_surface.fill("#00000000")
             for i in range(abs(obj.space_id.infinite_tier)):
                 infinite_tier_surface.blit(infinite_text_surface, (0, i * obj_surface.get_height()))
             infinite_tier_surface = set_alpha(infinite_tier_surface, 0x80)
-            obj_surface = pygame.transform.scale_by(obj_surface, abs(obj.space_id.infinite_tier))
+            obj_surface = scale_surface_by(obj_surface, abs(obj.space_id.infinite_tier))
             infinite_tier_surface_pos = (
                 (obj_surface.get_width() - infinite_tier_surface.get_width()) // 2,
                 (obj_surface.get_height() - infinite_tier_surface.get_height()) // 2,
@@ -251,7 +314,7 @@ def simple_object_to_surface(obj: bmp.obj.Object, wiggle: int = 1, default_surfa
                 if debug:
                     obj_surface = set_alpha(obj_surface, 0x80)
                 else:
-                    obj_surface.fill("#00000000")
+                    obj_surface = make_surface(obj_surface.get_size())
     return obj_surface
 
 def valid(__obj: bmp.obj.Object, /) -> bool:
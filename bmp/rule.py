@@ -4,6 +4,7 @@ from typing import Any, Callable, Optional
 import bmp.obj
 
 Rule = list[bmp.obj.Text]
+type RuleFingerprint = tuple[tuple[type[bmp.obj.Text], ...], ...]
 
 @dataclass(init=True, repr=True)
 class PrefixInfo():
@@ -39,6 +40,15 @@ class RuleInfo():
     infix_info_list: list[InfixInfo]
     oper_list: list[OperInfo]
 
+def copy_info(info: RuleInfo) -> RuleInfo:
+    return RuleInfo(
+        [PrefixInfo(p.negated, p.prefix) for p in info.prefix_info_list],
+        info.noun_negated,
+        info.noun,
+        [InfixInfo(i.negated, i.infix, [InfixNounInfo(n.negated, n.infix_noun) for n in i.infix_noun_info_list]) for i in info.infix_info_list],
+        [OperInfo(o.oper, [PropInfo(p.prop_negated, p.prop) for p in o.prop_list]) for o in info.oper_list],
+    )
+
 def do_nothing(info: RuleInfo, placeholder: bmp.obj.Text) -> RuleInfo:
     return info
 
@@ -183,6 +193,9 @@ def get_info_from_rule(rule: Rule, stage: str = "before prefix") -> RuleInfo:
                 return info_list
     raise ValueError(rule[0])
 
+def get_rule_fingerprint(rule_list: list[Rule]) -> RuleFingerprint:
+    return tuple(tuple(type(t) for t in r) for r in rule_list)
+
 def handle_text_text_(rule: Rule) -> Rule:
     metanumber = 0
     new_rule = []
@@ -1,5 +1,7 @@
-from typing import Never, NotRequired, Optional, TypeGuard, TypedDict
+from typing import Any, Callable, Iterator, Never, NotRequired, Optional, TypeGuard, TypedDict
 from tqdm import tqdm
+import array
+import itertools
 
 import bmp.base
 import bmp.color
@@ -20,6 +22,31 @@ class SpaceJson41(SpaceJson4102):
 
 type SpaceJson = SpaceJson4102
 
+type RuleEntry = tuple[bmp.loc.Coord[int], bmp.rule.Rule, bmp.rule.RuleInfo]
+type RuleBranch = tuple[list[bmp.rule.Rule], list[bmp.rule.RuleInfo]]
+
+match_rule_dict: dict[str, list[tuple[
+    tuple[type[bmp.obj.Text], ...],
+    tuple[type[bmp.obj.Text], ...],
+    str,
+    Callable[[bmp.rule.RuleInfo, Any], bmp.rule.RuleInfo]
+]]] = {k: [(tuple(m), tuple(u), n, f) for m, u, n, f in v] for k, v in bmp.rule.how_to_match_rule.items()}
+
+def rule_completes_from_stage(rule: bmp.rule.Rule, stage: str) -> bool:
+    for text in rule:
+        for match_type, unmatch_type, next_stage, _ in match_rule_dict[stage]:
+            if isinstance(text, match_type) and not isinstance(text, unmatch_type):
+                stage = next_stage
+                break
+        else:
+            return False
+    return stage == "after property"
+
+version_counter: Iterator[int] = itertools.count(1)
+
+def next_version() -> int:
+    return next(version_counter)
+
 class Space(object):
     def __init__(
         self,
@@ -31,29 +58,55 @@ class Space(object):
         self.space_id: bmp.ref.SpaceID = space_id
         self.size: bmp.loc.Coord[int] = size
         self.color: Optional[bmp.color.ColorHex] = color
-        self.object_list: list[bmp.obj.Object] = object_list if object_list is not None else []
+        self.object_dict: dict[int, bmp.obj.Object] = {o.uid: o for o in object_list} if object_list is not None else {}
+        self.object_list_cache: Optional[list[bmp.obj.Object]] = None
         self.object_pos_index: list[list[bmp.obj.Object]]
+        self.object_type_index: dict[type[bmp.obj.Object], dict[bmp.obj.Object, int]]
+        self.object_number: int
+        self.object_prop_index: dict[type[bmp.obj.Text], dict[bmp.obj.Object, None]] = {}
+        self.row_rule_dict: dict[int, list[RuleEntry]] = {}
+        self.column_rule_dict: dict[int, list[RuleEntry]] = {}
+        self.dirty_rows: set[int] = set()
+        self.dirty_columns: set[int] = set()
+        self.word_cells: set[tuple[bmp.loc.Coord[int], int]] = set()
+        self.text_cache: dict[bmp.loc.Coord[int], list[bmp.obj.Text]] = {}
+        self.branch_cache: dict[tuple[bmp.loc.Coord[int], str], RuleBranch] = {}
         self.refresh_index()
         self.properties: dict[type[bmp.obj.SpaceObject], bmp.obj.PropertyStorage] = {p: bmp.obj.PropertyStorage() for p in bmp.obj.space_object_types}
         self.special_operator_properties: dict[type[bmp.obj.SpaceObject], dict[type[bmp.obj.Operator], bmp.obj.PropertyStorage]] = {p: {o: bmp.obj.PropertyStorage() for o in bmp.obj.special_operators} for p in bmp.obj.space_object_types}
         self.rule_list: list[bmp.rule.Rule] = []
         self.rule_info: list[bmp.rule.RuleInfo] = []
+        self.rule_fingerprint: bmp.rule.RuleFingerprint = ()
         self.static_transform: bmp.loc.SpaceTransform = bmp.loc.default_space_transform.copy()
         self.dynamic_transform: bmp.loc.SpaceTransform = bmp.loc.default_space_transform.copy()
+        self.version: int = next_version()
+        self.object_version: int = self.version
     def __eq__(self, space: "Space") -> bool:
         return self.space_id == space.space_id
     @property
+    def object_list(self) -> list[bmp.obj.Object]:
+        if self.object_list_cache is None:
+            self.object_list_cache = list(self.object_dict.values())
+        return self.object_list_cache
+    @property
     def width(self) -> int:
         return self.size[0]
     @width.setter
     def width(self, value: int) -> None:
         self.size = (value, self.size[1])
+        self.touch_objects()
     @property
     def height(self) -> int:
         return self.size[1]
     @height.setter
     def height(self, value: int) -> None:
         self.size = (self.size[0], value)
+        self.touch_objects()
+    def touch(self) -> None:
+        self.version = next_version()
+    def touch_objects(self) -> None:
+        self.object_version = next_version()
+        self.version = self.object_version
     def out_of_range(self, coord: bmp.loc.Coord[int]) -> bool:
         return coord[0] < 0 or coord[1] < 0 or coord[0] >= self.width or coord[1] >= self.height
     def pos_to_index(self, pos) -> int:
@@ -62,9 +115,39 @@ class Space(object):
         return self.object_pos_index[self.pos_to_index(pos)]
     def refresh_index(self) -> None:
         self.object_pos_index = [[] for _ in range(self.width * self.height)]
+        self.object_type_index = {}
+        self.object_number = 0
         for obj in self.object_list:
             if not self.out_of_range(obj.pos):
                 self.pos_to_objs(obj.pos).append(obj)
+            self.add_type_index(obj)
+        self.refresh_prop_index()
+        self.row_rule_dict.clear()
+        self.column_rule_dict.clear()
+        self.dirty_rows = set(range(self.height))
+        self.dirty_columns = set(range(self.width))
+    def add_type_index(self, obj: bmp.obj.Object) -> None:
+        self.object_type_index.setdefault(type(obj), {})[obj] = self.object_number
+        self.object_number += 1
+    def remove_type_index(self, obj: bmp.obj.Object) -> None:
+        del self.object_type_index[type(obj)][obj]
+    def refresh_prop_index(self) -> None:
+        old_prop_index = {k: v for k, v in self.object_prop_index.items() if len(v) != 0}
+        self.object_prop_index = {}
+        for obj in self.object_list:
+            self.add_prop_index(obj)
+        if self.object_prop_index != old_prop_index:
+            self.touch()
+    def add_prop_index(self, obj: bmp.obj.Object) -> None:
+        for prop in obj.properties.enabled_count().keys():
+            self.object_prop_index.setdefault(prop, {})[obj] = None
+    def remove_prop_index(self, obj: bmp.obj.Object) -> None:
+        for object_dict in self.object_prop_index.values():
+            object_dict.pop(obj, None)
+    def set_rule_dirty(self, obj: bmp.obj.Object) -> None:
+        if isinstance(obj, bmp.obj.Text) and not self.out_of_range(obj.pos):
+            self.dirty_rows.add(obj.pos[1])
+            self.dirty_columns.add(obj.pos[0])
     @staticmethod
     def auto_refresh(func):
         def wrapper(self: "Space", *args, **kwds):
@@ -76,11 +159,32 @@ class Space(object):
                 r = func(self, *args, **kwds)
                 return r
         return wrapper
+    # callers of link_obj and unlink_obj update the position index themselves
+    def link_obj(self, obj: bmp.obj.Object) -> None:
+        self.object_dict[obj.uid] = obj
+        self.object_list_cache = None
+        self.touch_objects()
+        obj.located_space_id = self.space_id
+        self.add_type_index(obj)
+        self.add_prop_index(obj)
+        self.set_rule_dirty(obj)
+    def unlink_obj(self, obj: bmp.obj.Object) -> None:
+        del self.object_dict[obj.uid]
+        self.object_list_cache = None
+        self.touch_objects()
+        obj.located_space_id = None
+        self.remove_type_index(obj)
+        self.remove_prop_index(obj)
+        self.set_rule_dirty(obj)
     # @auto_refresh
     def new_obj(self, obj: bmp.obj.Object) -> None:
-        self.object_list.append(obj)
+        self.link_obj(obj)
         if not self.out_of_range(obj.pos):
             self.pos_to_objs(obj.pos).append(obj)
+    def get_last_objs(self, count: int) -> list[bmp.obj.Object]:
+        if count <= 0:
+            return []
+        return list(itertools.islice(reversed(self.object_dict.values()), count))[::-1]
     # @auto_refresh
     def get_objs_from_pos(self, pos: bmp.loc.Coord[int]) -> list[bmp.obj.Object]:
         if self.out_of_range(pos):
@@ -98,13 +202,34 @@ class Space(object):
         return [o for o in self.pos_to_objs(pos) if noun.isreferenceof(o)]
     # @auto_refresh
     def get_objs_from_type[T: bmp.obj.Object](self, object_type: type[T]) -> list[T]:
-        return [o for o in self.object_list if isinstance(o, object_type)]
+        bucket_list = [b for t, b in self.object_type_index.items() if issubclass(t, object_type) and len(b) != 0]
+        if len(bucket_list) == 0:
+            return []
+        if len(bucket_list) == 1:
+            return list(bucket_list[0]) # type: ignore
+        return [o for o, _ in sorted((i for b in bucket_list for i in b.items()), key=lambda i: i[1])] # type: ignore
+    # @auto_refresh
+    def get_objs_from_prop(self, prop: type[bmp.obj.Text]) -> list[bmp.obj.Object]:
+        return list(self.object_prop_index.get(prop, {}))
     # @auto_refresh
     def get_objs_from_noun(self, noun: bmp.obj.Noun) -> list[bmp.obj.Object]:
+        if isinstance(noun, bmp.obj.GeneralNoun):
+            return self.get_objs_from_type(noun.ref_type)
         return [o for o in self.object_list if noun.isreferenceof(o)]
+    def insert_objs(self, obj_list: list[tuple[int, bmp.obj.Object]]) -> None:
+        object_list = self.object_list.copy()
+        for index, obj in sorted(obj_list, key=lambda i: i[0]):
+            object_list.insert(index, obj)
+        self.object_dict = {o.uid: o for o in object_list}
+        self.object_list_cache = None
+        self.touch_objects()
+        for _, obj in obj_list:
+            obj.located_space_id = self.space_id
+            self.set_rule_dirty(obj)
+        self.refresh_index()
     # @auto_refresh
     def del_obj(self, obj: bmp.obj.Object) -> None:
-        self.object_list.remove(obj)
+        self.unlink_obj(obj)
         if not self.out_of_range(obj.pos):
             self.pos_to_objs(obj.pos).remove(obj)
     # @auto_refresh
@@ -113,37 +238,44 @@ class Space(object):
             return False
         deleted = len(self.pos_to_objs(pos)) != 0
         for obj in self.pos_to_objs(pos):
-            self.object_list.remove(obj)
+            self.unlink_obj(obj)
         self.object_pos_index[self.pos_to_index(pos)].clear()
         return deleted
     # @auto_refresh
     def del_objs_from_pos_and_type(self, pos: bmp.loc.Coord[int], object_type: type) -> bool:
-        del_objects = filter(lambda o: isinstance(o, object_type), self.pos_to_objs(pos))
-        deleted = False
+        if self.out_of_range(pos):
+            return False
+        del_objects = [o for o in self.pos_to_objs(pos) if isinstance(o, object_type)]
         for obj in del_objects:
-            deleted = True
-            self.object_list.remove(obj)
-            if not self.out_of_range(obj.pos):
-                self.pos_to_objs(pos).remove(obj)
-        return deleted
+            self.unlink_obj(obj)
+            self.pos_to_objs(pos).remove(obj)
+        return len(del_objects) != 0
     # @auto_refresh
     def del_objs_from_pos_and_noun(self, pos: bmp.loc.Coord[int], noun: bmp.obj.Noun) -> bool:
-        del_objects = filter(lambda o: noun.isreferenceof(o), self.pos_to_objs(pos))
-        deleted = False
+        if self.out_of_range(pos):
+            return False
+        del_objects = [o for o in self.pos_to_objs(pos) if noun.isreferenceof(o)]
         for obj in del_objects:
-            deleted = True
-            self.object_list.remove(obj)
-            if not self.out_of_range(obj.pos):
-                self.pos_to_objs(pos).remove(obj)
-        return deleted
+            self.unlink_obj(obj)
+            self.pos_to_objs(pos).remove(obj)
+        return len(del_objects) != 0
     # @auto_refresh
     def set_obj_pos(self, obj: bmp.obj.Object, pos: bmp.loc.Coord[int]) -> None:
+        self.set_rule_dirty(obj)
         self.pos_to_objs(obj.pos).remove(obj)
         obj.pos = pos
         self.pos_to_objs(pos).append(obj)
+        self.set_rule_dirty(obj)
+        self.touch_objects()
+    def set_obj_orient(self, obj: bmp.obj.Object, orient: bmp.loc.Orient) -> bool:
+        if obj.orient == orient:
+            return False
+        obj.orient = orient
+        self.touch_objects()
+        return True
     # @auto_refresh
     def get_spaces(self) -> list[bmp.obj.SpaceObject]:
-        return [o for o in self.object_list if isinstance(o, bmp.obj.SpaceObject)]
+        return self.get_objs_from_type(bmp.obj.SpaceObject)
     # @auto_refresh
     def get_spaces_from_pos(self, pos: bmp.loc.Coord[int]) -> list[bmp.obj.SpaceObject]:
         if self.out_of_range(pos):
@@ -151,72 +283,103 @@ class Space(object):
         return [o for o in self.pos_to_objs(pos) if isinstance(o, bmp.obj.SpaceObject)]
     # @auto_refresh
     def get_levels(self) -> list[bmp.obj.LevelObject]:
-        return [o for o in self.object_list if isinstance(o, bmp.obj.LevelObject)]
+        return self.get_objs_from_type(bmp.obj.LevelObject)
     # @auto_refresh
     def get_levels_from_pos(self, pos: bmp.loc.Coord[int]) -> list[bmp.obj.LevelObject]:
         if self.out_of_range(pos):
             return []
         return [o for o in self.pos_to_objs(pos) if isinstance(o, bmp.obj.LevelObject)]
-    def get_rule_from_pos_and_direct(self, pos: bmp.loc.Coord[int], direct: bmp.loc.Orient, stage: str = "before prefix") -> tuple[list[bmp.rule.Rule], list[bmp.rule.RuleInfo]]:
-        new_rule_list: list[bmp.rule.Rule] = []
-        new_info_list: list[bmp.rule.RuleInfo] = []
-        for match_type, unmatch_type, next_stage, func in bmp.rule.how_to_match_rule[stage]:
-            text_list: list[bmp.obj.Text] = self.get_objs_from_pos_and_type(pos, bmp.obj.Text)
+    def get_texts_from_pos(self, pos: bmp.loc.Coord[int]) -> list[bmp.obj.Text]:
+        text_list = self.text_cache.get(pos)
+        if text_list is None:
+            text_list = self.get_objs_from_pos_and_type(pos, bmp.obj.Text)
             text_list += [
                 o.transform(bmp.obj.get_noun_from_type(type(o)))
                 for o in self.get_objs_from_pos(pos)
                 if o.old_state.prop is not None and o.old_state.prop.enabled(bmp.obj.TextWord)
             ] # type: ignore
-            matched_list = [o for o in text_list if isinstance(o, tuple(match_type))]
-            if len(unmatch_type) != 0:
-                matched_list = [o for o in matched_list if not isinstance(o, tuple(unmatch_type))]
+            self.text_cache[pos] = text_list
+        return text_list
+    def get_rule_branch(self, pos: bmp.loc.Coord[int], direct: bmp.loc.Orient, stage: str) -> RuleBranch:
+        rule_branch = self.branch_cache.get((pos, stage))
+        if rule_branch is not None:
+            return rule_branch
+        rule_list: list[bmp.rule.Rule] = []
+        info_list: list[bmp.rule.RuleInfo] = []
+        text_list = self.get_texts_from_pos(pos)
+        for match_type, unmatch_type, next_stage, func in match_rule_dict[stage]:
+            matched_list = [o for o in text_list if isinstance(o, match_type) and not isinstance(o, unmatch_type)]
             if len(matched_list) != 0:
-                rule_list, info_list = self.get_rule_from_pos_and_direct(bmp.loc.front_position(pos, direct), direct, next_stage)
+                next_rule_list, next_info_list = self.get_rule_branch(bmp.loc.front_position(pos, direct), direct, next_stage)
                 for matched_text in matched_list:
-                    new_rule_list.extend([matched_text] + r for r in rule_list)
-                    new_info_list.extend(func(i, matched_text) for i in info_list)
+                    rule_list.extend([matched_text] + r for r in next_rule_list)
+                    info_list.extend(func(bmp.rule.copy_info(i), matched_text) for i in next_info_list)
             if stage == "after property":
-                new_rule_list.append([])
-                new_info_list.append(bmp.rule.RuleInfo([], False, bmp.obj.Noun(), [], [bmp.rule.OperInfo(bmp.obj.Operator(), [])]))
-        return new_rule_list, new_info_list
+                rule_list.append([])
+                info_list.append(bmp.rule.RuleInfo([], False, bmp.obj.Noun(), [], [bmp.rule.OperInfo(bmp.obj.Operator(), [])]))
+        rule_branch = (rule_list, info_list)
+        self.branch_cache[(pos, stage)] = rule_branch
+        return rule_branch
+    def get_rule_from_pos_and_direct(self, pos: bmp.loc.Coord[int], direct: bmp.loc.Orient, stage: str = "before prefix") -> tuple[list[bmp.rule.Rule], list[bmp.rule.RuleInfo]]:
+        rule_list, info_list = self.get_rule_branch(pos, direct, stage)
+        return list(rule_list), list(info_list)
+    def get_rule_from_line(self, pos: bmp.loc.Coord[int], direct: bmp.loc.Orient) -> list[RuleEntry]:
+        rule_entry_list: list[RuleEntry] = []
+        self.branch_cache.clear()
+        while not self.out_of_range(pos):
+            # every rule from a stage that an earlier cell reached here is the tail of a rule found there
+            if (pos, "before prefix") in self.branch_cache or len(self.get_texts_from_pos(pos)) == 0:
+                pos = bmp.loc.front_position(pos, direct)
+                continue
+            new_rule_list, new_rule_info = self.get_rule_branch(pos, direct, "before prefix")
+            if len(new_rule_list) != 0:
+                reached_stage_list = [s for s in match_rule_dict.keys() if s != "before prefix" and (pos, s) in self.branch_cache]
+                for rule, rule_info in zip(new_rule_list, new_rule_info):
+                    if not any(rule_completes_from_stage(rule, s) for s in reached_stage_list):
+                        rule_entry_list.append((pos, rule, rule_info))
+            pos = bmp.loc.front_position(pos, direct)
+        return rule_entry_list
     def set_rule(self) -> None:
-        for text_obj in self.get_objs_from_type(bmp.obj.Text):
+        word_cells = {
+            (o.pos, o.uid) for o in self.object_list
+            if o.old_state.prop is not None and o.old_state.prop.enabled(bmp.obj.TextWord)
+        }
+        for pos, _ in word_cells ^ self.word_cells:
+            if not self.out_of_range(pos):
+                self.dirty_rows.add(pos[1])
+                self.dirty_columns.add(pos[0])
+        self.word_cells = word_cells
+        for y in self.dirty_rows:
+            self.row_rule_dict[y] = self.get_rule_from_line((0, y), bmp.loc.Orient.D)
+        for x in self.dirty_columns:
+            self.column_rule_dict[x] = self.get_rule_from_line((x, 0), bmp.loc.Orient.S)
+        self.dirty_rows.clear()
+        self.dirty_columns.clear()
+        self.text_cache.clear()
+        self.branch_cache.clear()
+        rule_entry_list: list[tuple[bmp.loc.Coord[int], int, bmp.rule.Rule, bmp.rule.RuleInfo]] = []
+        for rule_entries in self.row_rule_dict.values():
+            rule_entry_list.extend((p, 0, r, i) for p, r, i in rule_entries)
+        for rule_entries in self.column_rule_dict.values():
+            rule_entry_list.extend((p, 1, r, i) for p, r, i in rule_entries)
+        rule_entry_list.sort(key=lambda e: (e[0], e[1]))
+        self.rule_list = [e[2] for e in rule_entry_list]
+        self.rule_info = [e[3] for e in rule_entry_list]
+        old_rule_fingerprint = self.rule_fingerprint
+        self.rule_fingerprint = bmp.rule.get_rule_fingerprint(self.rule_list)
+        text_list = self.get_objs_from_type(bmp.obj.Text)
+        old_render_state_list = [o.render_state for o in text_list]
+        for text_obj in text_list:
             text_obj.render_state = bmp.obj.TextRenderState.UNUSED
-        self.rule_list = []
-        self.rule_info = []
-        x_rule_dict: dict[int, list[bmp.rule.Rule]] = {}
-        y_rule_dict: dict[int, list[bmp.rule.Rule]] = {}
-        for x in range(self.width):
-            for y in range(self.height):
-                x_rule_dict.setdefault(x, [])
-                new_rule_list, new_rule_info = self.get_rule_from_pos_and_direct((x, y), bmp.loc.Orient.D)
-                for rule_index in range(len(new_rule_list)):
-                    part_of_old_rule = False
-                    for old_x, old_rule_list in x_rule_dict.items():
-                        old_rule_list_test = list(map(lambda r: list(r[x - old_x:]), old_rule_list))
-                        if list(new_rule_list[rule_index]) in old_rule_list_test:
-                            part_of_old_rule = True
-                    if not part_of_old_rule:
-                        x_rule_dict[x].append(new_rule_list[rule_index])
-                        self.rule_list.append(new_rule_list[rule_index])
-                        self.rule_info.append(new_rule_info[rule_index])
-                y_rule_dict.setdefault(y, [])
-                new_rule_list, new_rule_info = self.get_rule_from_pos_and_direct((x, y), bmp.loc.Orient.S)
-                for rule_index in range(len(new_rule_list)):
-                    part_of_old_rule = False
-                    for old_y, old_rule_list in y_rule_dict.items():
-                        old_rule_list_test = list(map(lambda r: list(r[y - old_y:]), old_rule_list))
-                        if list(new_rule_list[rule_index]) in old_rule_list_test:
-                            part_of_old_rule = True
-                    if not part_of_old_rule:
-                        y_rule_dict[y].append(new_rule_list[rule_index])
-                        self.rule_list.append(new_rule_list[rule_index])
-                        self.rule_info.append(new_rule_info[rule_index])
         for rule in self.rule_list:
             for text_obj in rule:
                 text_obj.render_state = bmp.obj.TextRenderState.USED
+        if self.rule_fingerprint != old_rule_fingerprint or any(o.render_state != s for o, s in zip(text_list, old_render_state_list)):
+            self.touch()
     def set_sprite_states(self, round_num: int = 0) -> None:
+        changed = False
         for obj in self.object_list:
+            sprite_state = obj.sprite_state
             if obj.sprite_category == bmp.obj.SpriteCategory.TILED:
                 connected = {
                     o: len(self.get_objs_from_pos_and_type(
@@ -227,6 +390,9 @@ class Space(object):
             else:
                 connected = {o: False for o in bmp.loc.Orient}
             obj.set_sprite(round_num=round_num, connected=connected)
+            changed |= obj.sprite_state != sprite_state
+        if changed:
+            self.touch()
     def get_stacked_transform(self, static: bmp.loc.SpaceTransform, dynamic: bmp.loc.SpaceTransform) -> bmp.loc.SpaceTransform:
         transform = bmp.loc.get_stacked_transform(
             bmp.loc.get_stacked_transform(self.static_transform, self.dynamic_transform),
@@ -349,6 +515,111 @@ def json_to_space(json_object: SpaceJson) -> Space:
         position = 2,
         **bmp.lang.default_tqdm_args,
     ):
-        new_space.object_list.append(bmp.obj.json_to_object(obj))
-    new_space.refresh_index()
-    return new_space
\ No newline at end of file
+        new_space.new_obj(bmp.obj.json_to_object(obj))
+    return new_space
+# objects whose extra json fields can't be kept in the packed arrays
+extended_object_types: tuple[type[bmp.obj.Object], ...] = (bmp.obj.SpaceObject, bmp.obj.LevelObject, bmp.obj.Path)
+
+class PackedSpace(object):
+    def __init__(
+        self,
+        space_id: bmp.ref.SpaceID,
+        size: bmp.loc.Coord[int],
+        color: Optional[bmp.color.ColorHex],
+        type_list: list[str],
+        orient_list: list[str],
+        space_id_list: list[bmp.ref.SpaceID],
+        level_id_list: list[bmp.ref.LevelID],
+        array_list: list[array.array],
+        extras_dict: dict[int, dict[str, Any]],
+    ) -> None:
+        self.space_id: bmp.ref.SpaceID = space_id
+        self.size: bmp.loc.Coord[int] = size
+        self.color: Optional[bmp.color.ColorHex] = color
+        # the tables are shared by every packed space from the same file
+        self.type_list: list[str] = type_list
+        self.orient_list: list[str] = orient_list
+        self.space_id_list: list[bmp.ref.SpaceID] = space_id_list
+        self.level_id_list: list[bmp.ref.LevelID] = level_id_list
+        self.type_array: array.array
+        self.x_array: array.array
+        self.y_array: array.array
+        self.orient_array: array.array
+        self.space_id_array: array.array
+        self.level_id_array: array.array
+        self.type_array, self.x_array, self.y_array, self.orient_array, self.space_id_array, self.level_id_array = array_list
+        self.extras_dict: dict[int, dict[str, Any]] = extras_dict
+    @property
+    def array_list(self) -> list[array.array]:
+        return [self.type_array, self.x_array, self.y_array, self.orient_array, self.space_id_array, self.level_id_array]
+    def get_linked_names(self) -> tuple[set[str], set[str]]:
+        return (
+            {self.space_id_list[i].name for i in set(self.space_id_array) if i != -1},
+            {self.level_id_list[i].name for i in set(self.level_id_array) if i != -1},
+        )
+    def header_to_json(self) -> dict[str, Any]:
+        json_object: dict[str, Any] = {"id": self.space_id.to_json(), "size": [self.size[0], self.size[1]]}
+        if self.color is not None:
+            json_object["color"] = self.color
+        return json_object
+    def object_to_json(self, index: int) -> bmp.obj.ObjectJson:
+        json_object: dict[str, Any] = {
+            "type": self.type_list[self.type_array[index]],
+            "pos": (self.x_array[index], self.y_array[index]),
+            "orient": self.orient_list[self.orient_array[index]],
+        }
+        if self.space_id_array[index] != -1:
+            json_object["space_id"] = self.space_id_list[self.space_id_array[index]].to_json()
+        if self.level_id_array[index] != -1:
+            json_object["level_id"] = self.level_id_list[self.level_id_array[index]].to_json()
+        extras = self.extras_dict.get(index)
+        if extras is not None:
+            json_object.update(extras)
+        return json_object # type: ignore
+    def to_json(self) -> SpaceJson:
+        json_object: SpaceJson = {
+            "id": self.space_id.to_json(),
+            "size": (self.size[0], self.size[1]),
+            "objects": [self.object_to_json(i) for i in range(len(self.type_array))],
+        }
+        if self.color is not None:
+            json_object["color"] = self.color
+        return json_object
+    def to_space(self) -> Space:
+        # objects with extra fields and unknown types go through json_to_object
+        object_types: list[Optional[type[bmp.obj.Object]]] = [bmp.obj.name_to_class.get(n) for n in self.type_list]
+        object_types = [t if t is not None and not issubclass(t, extended_object_types) else None for t in object_types]
+        orients: list[bmp.loc.Orient] = [bmp.loc.Orient[n] for n in self.orient_list]
+        space_id_list = self.space_id_list
+        level_id_list = self.level_id_list
+        object_list: list[bmp.obj.Object] = []
+        for index, (t, x, y, o, s, l) in enumerate(zip(*self.array_list)):
+            object_type = object_types[t]
+            if object_type is None:
+                obj = bmp.obj.json_to_object(self.object_to_json(index))
+            else:
+                obj = object_type(
+                    (x, y), orients[o],
+                    space_id = space_id_list[s] if s != -1 else None,
+                    level_id = level_id_list[l] if l != -1 else None,
+                )
+            obj.located_space_id = self.space_id
+            object_list.append(obj)
+        return Space(self.space_id, self.size, self.color, object_list)
+
+type PendingSpace = SpaceJson | PackedSpace
+
+def get_pending_space_id(pending_space: PendingSpace) -> bmp.ref.SpaceID:
+    if isinstance(pending_space, PackedSpace):
+        return pending_space.space_id
+    return bmp.ref.SpaceID(**pending_space["id"])
+
+def pending_to_json(pending_space: PendingSpace) -> SpaceJson:
+    if isinstance(pending_space, PackedSpace):
+        return pending_space.to_json()
+    return pending_space
+
+def pending_to_space(pending_space: PendingSpace) -> Space:
+    if isinstance(pending_space, PackedSpace):
+        return pending_space.to_space()
+    return json_to_space(pending_space)